@@ -0,0 +1,135 @@
+"""Measures import times and the time it takes a fresh process to parse its first game.
+
+Importing lol_esports_parser only sets up lazy attributes, so the parsers modules, which are what the first access to a
+public function imports, are timed on their own.
+
+Every run is a new Python process with an empty home folder, and the games are served by a local stub server,
+so no network access nor configuration files are needed.
+
+Results are compared to the cold_start section of benchmarks/baseline.json, and the command fails if a measure
+regressed by more than the tolerance.
+
+Usage:
+    python -m benchmarks.cold_start --runs 5
+    python -m benchmarks.cold_start --update-baseline
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+from benchmarks import payloads
+from benchmarks.stub_server import StubServer
+from benchmarks.suite import baseline_location
+
+# Importing must not open any connection nor create any file
+import_script = """
+import os, socket, sys, time
+
+def forbidden_connect(*args):
+    raise AssertionError("The package opened a connection at import time")
+
+socket.socket.connect = forbidden_connect
+
+start = time.perf_counter()
+{statement}
+duration = time.perf_counter() - start
+
+assert not os.path.exists(os.path.join(os.path.expanduser("~"), ".config")), "The package wrote files at import time"
+print(duration)
+"""
+
+# {measure: statement timed in a fresh process}
+import_statements = {
+    "import_seconds": "import lol_esports_parser",
+    "qq_parser_import_seconds": "import lol_esports_parser.parsers.qq.qq_parser",
+    "riot_parser_import_seconds": "import lol_esports_parser.parsers.riot.riot_parser",
+    "first_attribute_seconds": "import lol_esports_parser; lol_esports_parser.get_riot_game",
+}
+
+first_game_script = """
+import json, sys, time
+
+start = time.perf_counter()
+import lol_esports_parser
+from lol_esports_parser import config
+
+config.set_endpoints(json.loads(sys.argv[1]))
+lol_esports_parser.parse_qq_game(int(sys.argv[2]), add_names=False)
+print(time.perf_counter() - start)
+"""
+
+
+def run_script(script: str, *args) -> float:
+    with tempfile.TemporaryDirectory() as home:
+        environment = {**os.environ, "HOME": home, "PYTHONPATH": os.getcwd()}
+        environment.pop("RIOT_API_KEY", None)
+
+        output = subprocess.run(
+            [sys.executable, "-c", script, *args],
+            env=environment,
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+
+    return float(output.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--tolerance", type=float, default=0.3, help="relative regression allowed on every measure")
+    parser.add_argument("--baseline", default=baseline_location)
+    parser.add_argument("--update-baseline", action="store_true", help="record the results as the new baseline")
+    args = parser.parse_args()
+
+    game_id = payloads.qq_example_raw_games()[0]["game_id"]
+
+    results = {
+        measure: statistics.median(run_script(import_script.format(statement=statement)) for _ in range(args.runs))
+        for measure, statement in import_statements.items()
+    }
+
+    with StubServer({**payloads.qq_routes(), **payloads.ddragon_routes()}) as stub:
+        results["time_to_first_game_seconds"] = statistics.median(
+            run_script(first_game_script, json.dumps(stub.endpoints()), str(game_id)) for _ in range(args.runs)
+        )
+
+    print(json.dumps({**results, "runs": args.runs}, indent=4))
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+
+    if args.update_baseline:
+        # The baseline file is shared with the suite, so only the cold start section is replaced
+        with open(args.baseline, "w") as file:
+            json.dump({**baseline, "cold_start": results}, file, indent=4)
+        print(f"Baseline written to {args.baseline}")
+        return
+
+    if "cold_start" not in baseline:
+        print(f"No cold start baseline in {args.baseline}, record one with --update-baseline")
+        return
+
+    # Every measure is a duration, so higher is a regression
+    regressions = [
+        f"{measure}: {value:.3f} against {baseline['cold_start'][measure]:.3f} in the baseline"
+        for measure, value in results.items()
+        if measure in baseline["cold_start"] and value > baseline["cold_start"][measure] * (1 + args.tolerance)
+    ]
+
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
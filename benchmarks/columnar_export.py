@@ -0,0 +1,45 @@
+"""Measures the time it takes to flatten a season of games into columnar tables and write them to disk.
+
+The season is made of copies of the example games, so no network access is needed.
+
+Usage:
+    python -m benchmarks.columnar_export --games 2000
+"""
+import argparse
+import tempfile
+import time
+
+from lol_esports_parser.dto.columnar import GameTables
+
+from benchmarks import payloads
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--games", type=int, default=2000, help="number of games in the season")
+    parser.add_argument("--format", default="parquet", choices=["parquet", "feather"])
+    args = parser.parse_args()
+
+    example_games = [*payloads.qq_example_series()["games"], payloads.load_example("lck_game.json")]
+    games = [example_games[i % len(example_games)] for i in range(args.games)]
+
+    start = time.perf_counter()
+    game_tables = GameTables(games)
+    flatten_duration = time.perf_counter() - start
+
+    start = time.perf_counter()
+    game_tables.to_numpy()
+    numpy_duration = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as folder:
+        start = time.perf_counter()
+        game_tables.write(folder, args.format)
+        write_duration = time.perf_counter() - start
+
+    print(f"Flattening {args.games} games: {flatten_duration:.3f}s")
+    print(f"Conversion to NumPy: {numpy_duration:.3f}s")
+    print(f"Conversion to Arrow and {args.format} output: {write_duration:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Compares the memory held by LolGame dicts and by CompactGames for a corpus of example games.
+
+The corpus is made of independent copies of the example QQ games and Riot games with timelines, decoded from JSON
+like games loaded from disk, so no object is shared between copies unless CompactGames shares it.
+
+Usage:
+    python -m benchmarks.compact_memory --copies 50
+"""
+import argparse
+import json
+import time
+import tracemalloc
+from typing import Callable, Tuple, TypeVar
+
+from lol_esports_parser.dto.compact import CompactGames
+
+from benchmarks import payloads
+
+T = TypeVar("T")
+
+
+def traced_memory(build: Callable[[], T]) -> Tuple[float, T]:
+    """Returns the memory in MB held by what build returns, and what it returns.
+    """
+    tracemalloc.start()
+    try:
+        result = build()
+        return tracemalloc.get_traced_memory()[0] / 2**20, result
+    finally:
+        tracemalloc.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--copies", type=int, default=50, help="number of copies of the example games")
+    args = parser.parse_args()
+
+    games_json = json.dumps(payloads.qq_example_series()["games"] + payloads.riot_example_games())
+    games_count = len(json.loads(games_json)) * args.copies
+
+    dicts_memory, games = traced_memory(lambda: [g for _ in range(args.copies) for g in json.loads(games_json)])
+
+    compact_memory, compact_games = traced_memory(lambda: CompactGames(games))
+
+    # Timings are measured without tracemalloc, which slows allocations down
+    start = time.perf_counter()
+    CompactGames(games)
+    encode_duration = time.perf_counter() - start
+
+    start = time.perf_counter()
+    assert list(compact_games.to_games()) == games
+    decode_duration = time.perf_counter() - start
+
+    del games
+
+    print(f"{games_count} games")
+    print(f"dicts: {dicts_memory:.1f}MB")
+    print(f"CompactGames: {compact_memory:.1f}MB, {dicts_memory / compact_memory:.1f}x smaller")
+    print(f"encoding: {encode_duration / games_count * 1000:.2f}ms per game")
+    print(f"materializing: {decode_duration / games_count * 1000:.2f}ms per game")
+
+
+if __name__ == "__main__":
+    main()
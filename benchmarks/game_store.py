@@ -0,0 +1,64 @@
+"""Measures GameStore bulk upserts and indexed queries on copies of the example QQ games.
+
+Copies get their own QQ ids, and team names and patches are spread over a few values, so a team and patch query
+matches a small part of the store like it would on real data.
+
+Usage:
+    python -m benchmarks.game_store --games 20000
+"""
+import argparse
+import copy
+import os
+import tempfile
+import time
+
+from lol_esports_parser.game_store import GameStore
+
+from benchmarks import payloads
+
+
+def synthetic_games(games_count: int, teams_count: int = 100, patches_count: int = 20):
+    examples = payloads.qq_example_series()["games"]
+
+    for index in range(games_count):
+        game = copy.deepcopy(examples[index % len(examples)])
+
+        game["sources"]["qq"]["id"] = index
+        game["patch"] = f"10.{index % patches_count}"
+        for side_index, team in enumerate(game["teams"].values()):
+            team["name"] = f"Team {(index + side_index) % teams_count}"
+
+        yield game
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--games", type=int, default=20000, help="number of games in the store")
+    parser.add_argument("--queries", type=int, default=200, help="number of team and patch queries")
+    args = parser.parse_args()
+
+    games = list(synthetic_games(args.games))
+
+    with tempfile.TemporaryDirectory() as folder:
+        location = os.path.join(folder, "games.sqlite")
+
+        with GameStore(location) as store:
+            start = time.perf_counter()
+            store.upsert_games(games)
+            duration = time.perf_counter() - start
+            print(f"upsert: {args.games / duration:.0f} games/s, {os.path.getsize(location) / 2**20:.0f}MB")
+
+            start = time.perf_counter()
+            games_count = 0
+            for index in range(args.queries):
+                games_count += len(store.find_games(team=f"Team {index % 100}", patch=f"10.{index % 20}"))
+            duration = time.perf_counter() - start
+
+            print(
+                f"team and patch query: {duration / args.queries * 1000:.2f}ms, "
+                f"{games_count / args.queries:.0f} games per query"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Compares the installed JSON backends on the documents the parser decodes and writes.
+
+Decoding is measured on ACS timeline payloads built from the example Riot games, the largest documents the parser
+downloads, and encoding on the example QQ series as written by the command line interface.
+
+Usage:
+    python -m benchmarks.json_codec --repeat 200
+"""
+import argparse
+import importlib.util
+import io
+import json
+import time
+
+from lol_esports_parser import json_codec
+
+from benchmarks import payloads
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=200, help="number of times each document is processed")
+    args = parser.parse_args()
+
+    timelines = [
+        json.dumps(payloads.riot_match_timeline(game)).encode("utf-8") for game in payloads.riot_example_games()
+    ]
+    series = payloads.qq_example_series()
+
+    timelines_size = sum(len(timeline) for timeline in timelines)
+    print(f"{len(timelines)} timelines, {timelines_size / 2**10:.0f}kB")
+
+    for backend in json_codec.backends:
+        if not importlib.util.find_spec(backend):
+            print(f"{backend}: not installed")
+            continue
+
+        json_codec.set_backend(backend)
+
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            for timeline in timelines:
+                json_codec.loads(timeline)
+        decode_duration = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            json_codec.write_series(series, io.BytesIO())
+        encode_duration = time.perf_counter() - start
+
+        print(
+            f"{backend}: decoding {timelines_size * args.repeat / decode_duration / 2**20:.0f}MB/s, "
+            f"writing a series {encode_duration / args.repeat * 1000:.2f}ms"
+        )
+
+    json_codec.set_backend()
+
+
+if __name__ == "__main__":
+    main()
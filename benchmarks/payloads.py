@@ -0,0 +1,552 @@
+"""Raw endpoint payloads rebuilt from the parsed examples in json_examples.
+
+The examples were produced by the parser from live QQ and ACS servers, so they contain every field the endpoints
+returned. Rebuilding the raw payloads from them lets the benchmarks and tests run the full retrieval and parsing code
+offline.
+"""
+import copy
+import datetime
+import json
+import os
+from typing import Dict, List
+
+examples_folder = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "json_examples")
+
+# Example series bmid, as the match list endpoint is queried with it
+qq_example_bmid = 6131
+
+places = {"TOP": "1", "JGL": "5", "MID": "2", "BOT": "3", "SUP": "4"}
+
+# sMatchMember field: endOfGameStats field
+member_fields = {"Game_K": "kills", "Game_D": "deaths", "Game_A": "assists", "Game_M": "gold"}
+
+# BattleData field: endOfGameStats field, for fields that are always present
+battle_data_fields = {
+    "kill": "kills",
+    "death": "deaths",
+    "assist": "assists",
+    "gold": "gold",
+    "lasthit": "cs",
+    "level": "level",
+    "firstBlood": "firstBlood",
+    "firstTower": "firstTower",
+    "killingSprees": "killingSprees",
+    "dKills": "doubleKills",
+    "tKills": "tripleKills",
+    "qKills": "quadraKills",
+    "pKills": "pentaKills",
+    "towerKills": "towerKills",
+    "neutralKilled": "monsterKills",
+    "neutralKilledTJungle": "monsterKillsInAlliedJungle",
+    "neutralKilledEJungle": "monsterKillsInEnemyJungle",
+    "wardsPlaced": "wardsPlaced",
+    "wardsKilled": "wardsKilled",
+    "visionWardsBought": "visionWardsBought",
+    "totalDamage": "totalDamageDealt",
+    "totalDamageToChamp": "totalDamageDealtToChampions",
+    "pDamageToChamp": "physicalDamageDealtToChampions",
+    "mDamageDealtToChamp": "magicDamageDealtToChampions",
+    "totalDamageTaken": "totalDamageTaken",
+    "pDamageTaken": "physicalDamageTaken",
+    "mDamageTaken": "magicDamageTaken",
+}
+
+# BattleData field: endOfGameStats field, for fields that are regularly missing
+optional_battle_data_fields = {
+    "largestCriticalStrike": "largestCriticalStrike",
+    "largestKillingSpree": "largestKillingSpree",
+    "inhibitorKills": "inhibitorKills",
+    "totalHeal": "totalHeal",
+    "pDamageDealt": "physicalDamageDealt",
+    "mDamageDealt": "magicDamageDealt",
+}
+
+
+def load_example(file_name: str) -> dict:
+    with open(os.path.join(examples_folder, file_name), encoding="utf-8") as file:
+        return json.load(file)
+
+
+def qq_raw_game(game: dict, bmid: int, match_name: str) -> dict:
+    """Rebuilds the raw QQ payloads of a parsed game.
+
+    Returns:
+        {"game_info": ..., "team_info": ..., "runes_info": ...} as returned by the qq_access functions.
+    """
+    blue_team, red_team = game["teams"]["BLUE"], game["teams"]["RED"]
+    blue_team_id = blue_team["uniqueIdentifiers"]["qq"]["id"]
+    red_team_id = red_team["uniqueIdentifiers"]["qq"]["id"]
+
+    date, time = game["start"][:19].split("T")
+
+    members = []
+    for team_id, team in (blue_team_id, blue_team), (red_team_id, red_team):
+        for player in team["players"]:
+            member = {
+                "TeamId": str(team_id),
+                "GameName": player["inGameName"],
+                "Place": places[player["role"]],
+                "ChampionId": str(player["championId"]),
+                "AccountId": str(player["uniqueIdentifiers"]["qq"]["accountId"]),
+                "MemberId": str(player["uniqueIdentifiers"]["qq"]["memberId"]),
+            }
+            member.update({field: str(player["endOfGameStats"][key]) for field, key in member_fields.items()})
+            members.append(member)
+
+    battle_data = {
+        "game-period": str(game["duration"]),
+        "left": _qq_battle_data_side(blue_team),
+        "right": _qq_battle_data_side(red_team),
+    }
+
+    game_info = {
+        "sMatchInfo": {
+            "bMatchId": str(bmid),
+            "bMatchName": match_name,
+            "MatchNum": str(game["gameInSeries"]),
+            "AreaId": str(game["sources"]["qq"]["serverId"]),
+            "BattleId": str(game["sources"]["qq"]["battleId"]),
+            "BlueTeam": str(blue_team_id),
+            "TeamA": str(blue_team_id),
+            "TeamB": str(red_team_id),
+            "MatchWin": "1" if game["winner"] == "BLUE" else "2",
+        },
+        "battleInfo": {"BattleDate": date, "BattleTime": f"{time}.000", "BattleData": json.dumps(battle_data)},
+        "sMatchMember": members,
+    }
+
+    team_info = {
+        "world_": game["sources"]["qq"]["serverId"],
+        "room_id_": game["sources"]["qq"]["battleId"],
+        "blue_clan_id_": blue_team_id,
+        "blue_clan_name_": blue_team["name"],
+        "red_clan_id_": red_team_id,
+        "red_clan_name_": red_team["name"],
+        "win_clan_id_": blue_team_id if game["winner"] == "BLUE" else red_team_id,
+    }
+
+    runes_info = [
+        {
+            "hero_id_": player["championId"],
+            "runes_info_": {
+                "runes_list_": [{"runes_id_": rune["id"], "runes_num_": rune["rank"]} for rune in player["runes"]]
+            },
+        }
+        for team in (blue_team, red_team)
+        for player in team["players"]
+    ]
+
+    return {"game_info": game_info, "team_info": team_info, "runes_info": runes_info}
+
+
+def _qq_battle_data_side(team: dict) -> dict:
+    side = {
+        "players": [],
+        "firstTower": int(team["endOfGameStats"]["firstTower"]),
+        "tower": str(team["endOfGameStats"]["towerKills"]),
+        "b-dragon": str(team["endOfGameStats"]["baronKills"]),
+        "s-dragon": str(team["endOfGameStats"]["dragonKills"]),
+    }
+
+    for ban_index, ban in enumerate(team["bans"]):
+        side[f"ban-hero-{ban_index + 1}"] = str(ban)
+
+    for player in team["players"]:
+        stats = player["endOfGameStats"]
+
+        player_battle_data = {"name": player["inGameName"], "hero": str(player["championId"])}
+        # Boolean fields are 0 or 1 integers in BattleData
+        player_battle_data.update({field: int(stats[key]) for field, key in battle_data_fields.items()})
+        player_battle_data.update(
+            {field: int(stats[key]) for field, key in optional_battle_data_fields.items() if key in stats}
+        )
+
+        player_battle_data["equip"] = {f"game-equip-{item['slot']}": str(item["id"]) for item in stats["items"]}
+
+        for summoner_spell in player["summonerSpells"]:
+            player_battle_data[f"skill-{summoner_spell['slot']}"] = str(summoner_spell["id"])
+
+        side["players"].append(player_battle_data)
+
+    return side
+
+
+def qq_example_series() -> dict:
+    return load_example("qq_series.json")
+
+
+def qq_example_raw_games() -> List[dict]:
+    """Returns the raw payloads of every game of the example QQ series, with their game ids.
+    """
+    series = qq_example_series()
+    match_name = " vs ".join(series["score"])
+
+    raw_games = []
+    for game in series["games"]:
+        raw_game = qq_raw_game(game, qq_example_bmid, match_name)
+        raw_game["game_id"] = game["sources"]["qq"]["id"]
+        raw_games.append(raw_game)
+
+    return raw_games
+
+
+def qq_routes(bmid: int = qq_example_bmid) -> Dict[str, bytes]:
+    """Returns {path with query: response body} for every QQ endpoint queried to get the example series.
+
+    Params:
+        bmid: the bmid the match list is served under.
+    """
+    raw_games = qq_example_raw_games()
+
+    routes = {f"/qq/match_list?bmid={bmid}": json.dumps({"msg": [{"sMatchId": str(g["game_id"])} for g in raw_games]})}
+
+    for raw_game in raw_games:
+        team_info = raw_game["team_info"]
+
+        routes[f"/qq/match_info?p0={raw_game['game_id']}"] = json.dumps({"msg": raw_game["game_info"]})
+        routes[f"/qq/battle_info?battleid={team_info['room_id_']}&worldid={team_info['world_']}"] = json.dumps(
+            {"msg": json.dumps({"battle_list_": [team_info]})}
+        )
+        routes[f"/qq/runes?worldid={team_info['world_']}&roomid={team_info['room_id_']}"] = json.dumps(
+            {"msg": json.dumps({"hero_list_": raw_game["runes_info"]})}
+        )
+
+    return {path: body.encode() for path, body in routes.items()}
+
+# Riot MatchDto participant stats field: endOfGameStats field
+riot_stats_fields = {
+    "firstBloodKill": "firstBlood",
+    "firstBloodAssist": "firstBloodAssist",
+    "kills": "kills",
+    "deaths": "deaths",
+    "assists": "assists",
+    "goldEarned": "gold",
+    "champLevel": "level",
+    "wardsPlaced": "wardsPlaced",
+    "wardsKilled": "wardsKilled",
+    "visionWardsBoughtInGame": "visionWardsBought",
+    "visionScore": "visionScore",
+    "killingSprees": "killingSprees",
+    "largestKillingSpree": "largestKillingSpree",
+    "doubleKills": "doubleKills",
+    "tripleKills": "tripleKills",
+    "quadraKills": "quadraKills",
+    "pentaKills": "pentaKills",
+    "neutralMinionsKilled": "monsterKills",
+    "neutralMinionsKilledTeamJungle": "monsterKillsInAlliedJungle",
+    "neutralMinionsKilledEnemyJungle": "monsterKillsInEnemyJungle",
+    "totalDamageDealt": "totalDamageDealt",
+    "physicalDamageDealt": "physicalDamageDealt",
+    "magicDamageDealt": "magicDamageDealt",
+    "totalDamageDealtToChampions": "totalDamageDealtToChampions",
+    "physicalDamageDealtToChampions": "physicalDamageDealtToChampions",
+    "magicDamageDealtToChampions": "magicDamageDealtToChampions",
+    "damageDealtToObjectives": "damageDealtToObjectives",
+    "damageDealtToTurrets": "damageDealtToTurrets",
+    "totalDamageTaken": "totalDamageTaken",
+    "physicalDamageTaken": "physicalDamageTaken",
+    "magicalDamageTaken": "magicDamageTaken",
+    "longestTimeSpentLiving": "longestTimeSpentLiving",
+    "largestCriticalStrike": "largestCriticalStrike",
+    "goldSpent": "goldSpent",
+    "totalHeal": "totalHeal",
+    "totalUnitsHealed": "totalUnitsHealed",
+    "damageSelfMitigated": "damageSelfMitigated",
+    "totalTimeCrowdControlDealt": "totalTimeCCDealt",
+    "timeCCingOthers": "timeCCingOthers",
+    "firstTowerKill": "firstTower",
+    "firstTowerAssist": "firstTowerAssist",
+    "firstInhibitorKill": "firstInhibitor",
+    "firstInhibitorAssist": "firstInhibitorAssist",
+}
+
+# LolGame fields only filled from the timeline
+riot_timeline_fields = {
+    "game": ["kills"],
+    "team": ["monstersKills", "buildingsKills"],
+    "player": ["snapshots", "itemsEvents", "wardsEvents", "skillsLevelUpEvents"],
+}
+
+# Match history URLs are only parsed for their platform, game id and game hash
+riot_game_hash = "0123456789abcdef"
+
+
+def riot_match(game: dict) -> dict:
+    """Rebuilds the Riot MatchDto of a parsed example game.
+    """
+    start = datetime.datetime.fromisoformat(game["start"])
+
+    match = {
+        "gameId": game["sources"]["riotLolApi"]["gameId"],
+        "platformId": game["sources"]["riotLolApi"]["platformId"],
+        "gameCreation": int(start.timestamp() * 1000),
+        "gameDuration": game["duration"],
+        "gameVersion": game["gameVersion"],
+        "teams": [],
+        "participants": [],
+        "participantIdentities": [],
+    }
+
+    for side, team_id in ("BLUE", 100), ("RED", 200):
+        team = game["teams"][side]
+
+        match["teams"].append(
+            {
+                "teamId": team_id,
+                "win": "Win" if game["winner"] == side else "Fail",
+                "bans": [{"championId": champion_id, "pickTurn": i + 1} for i, champion_id in enumerate(team["bans"])],
+                **team["endOfGameStats"],
+            }
+        )
+
+        for player in team["players"]:
+            end_of_game_stats = player["endOfGameStats"]
+
+            stats = {field: end_of_game_stats[key] for field, key in riot_stats_fields.items() if key in end_of_game_stats}
+            stats["totalMinionsKilled"] = end_of_game_stats["cs"] - end_of_game_stats["monsterKills"]
+            stats["perkPrimaryStyle"] = player["primaryRuneTreeId"]
+            stats["perkSubStyle"] = player["secondaryRuneTreeId"]
+
+            for item in end_of_game_stats["items"]:
+                stats[f"item{item['slot']}"] = item["id"]
+
+            for rune in player["runes"][:6]:
+                stats[f"perk{rune['slot']}"] = rune["id"]
+                for i, value in enumerate(rune["stats"]):
+                    stats[f"perk{rune['slot']}Var{i + 1}"] = value
+
+            participant = {
+                "participantId": player["id"],
+                "teamId": team_id,
+                "championId": player["championId"],
+                "stats": stats,
+            }
+            for summoner_spell in player["summonerSpells"]:
+                participant[f"spell{summoner_spell['slot'] + 1}Id"] = summoner_spell["id"]
+
+            match["participants"].append(participant)
+            match["participantIdentities"].append(
+                {
+                    "participantId": player["id"],
+                    "player": {"summonerName": player["inGameName"], "profileIcon": player["profileIconId"]},
+                }
+            )
+
+    return match
+
+
+def riot_match_timeline(game: dict) -> dict:
+    """Rebuilds the frames of the Riot MatchTimelineDto of a parsed example game.
+
+    Only participant frames and champion kills are rebuilt, which are the bulk of a timeline.
+    """
+    frames = {}
+
+    for team in game["teams"].values():
+        for player in team["players"]:
+            for snapshot in player["snapshots"]:
+                frame = frames.setdefault(
+                    snapshot["timestamp"],
+                    {"timestamp": int(snapshot["timestamp"] * 1000), "participantFrames": {}, "events": []},
+                )
+
+                participant_frame = {
+                    "participantId": player["id"],
+                    "currentGold": snapshot["currentGold"],
+                    "totalGold": snapshot["totalGold"],
+                    "level": snapshot["level"],
+                    "xp": snapshot["xp"],
+                    "minionsKilled": snapshot["cs"] - snapshot["monstersKilled"],
+                    "jungleMinionsKilled": snapshot["monstersKilled"],
+                }
+                if snapshot.get("position"):
+                    participant_frame["position"] = snapshot["position"]
+
+                frame["participantFrames"][str(player["id"])] = participant_frame
+
+    timestamps = sorted(frames)
+
+    for kill in game.get("kills", []):
+        # Events are stored in the frame preceding them
+        frame_timestamp = max(t for t in timestamps if t <= kill["timestamp"])
+        frames[frame_timestamp]["events"].append(
+            {
+                "type": "CHAMPION_KILL",
+                "timestamp": int(kill["timestamp"] * 1000),
+                "position": kill["position"],
+                "killerId": kill["killerId"],
+                "victimId": kill["victimId"],
+                "assistingParticipantIds": kill["assistsIds"],
+            }
+        )
+
+    return {"frames": [frames[timestamp] for timestamp in timestamps], "frameInterval": 60000}
+
+
+def riot_example_games() -> List[dict]:
+    """Returns the parsed example Riot games, the games of the example series then the single example game.
+    """
+    return [*load_example("lck_series.json")["games"], load_example("lck_game.json")]
+
+
+def riot_mh_url(game: dict) -> str:
+    """Returns a match history URL pointing to a parsed example game.
+    """
+    source = game["sources"]["riotLolApi"]
+    return (
+        f"https://matchhistory.na.leagueoflegends.com/en/#match-details/{source['platformId']}/{source['gameId']}"
+        f"?gameHash={riot_game_hash}&tab=overview"
+    )
+
+
+def riot_routes(token: str = "header.e30.signature") -> Dict[str, bytes]:
+    """Returns {path with query: response body} for the ACS token and every example Riot game and timeline.
+
+    Params:
+        token: the id_token returned by the auth endpoint.
+    """
+    routes = {"/auth/token": json.dumps({"id_token": token})}
+
+    for game in riot_example_games():
+        source = game["sources"]["riotLolApi"]
+        game_path = f"/acs/{source['platformId']}/{source['gameId']}"
+
+        routes[f"{game_path}?gameHash={riot_game_hash}"] = json.dumps(riot_match(game))
+        routes[f"{game_path}/timeline?gameHash={riot_game_hash}"] = json.dumps(riot_match_timeline(game))
+
+    return {path: body.encode() for path, body in routes.items()}
+
+
+def expected_riot_game(game: dict, add_names: bool = False, get_timeline: bool = False) -> dict:
+    """Returns a parsed example Riot game as the parser outputs it from the rebuilt payloads with the given options.
+    """
+    game = copy.deepcopy(game)
+
+    if not get_timeline:
+        for key in riot_timeline_fields["game"]:
+            game.pop(key, None)
+
+    for team in game["teams"].values():
+        if not add_names:
+            team.pop("bansNames", None)
+
+        # Only champion kills and participant frames are rebuilt in the timeline payloads
+        for key in riot_timeline_fields["team"]:
+            if get_timeline:
+                team[key] = []
+            else:
+                team.pop(key, None)
+
+        for player in team["players"]:
+            if not add_names:
+                for key in "championName", "primaryRuneTreeName", "secondaryRuneTreeName":
+                    player.pop(key, None)
+
+                for objects in player["endOfGameStats"]["items"], player["summonerSpells"], player["runes"]:
+                    for riot_object in objects:
+                        riot_object.pop("name", None)
+
+            for key in riot_timeline_fields["player"]:
+                if not get_timeline:
+                    player.pop(key, None)
+                elif key != "snapshots":
+                    player[key] = []
+
+    return game
+
+
+def example_name_tables(games: List[dict]) -> Dict[str, Dict[int, str]]:
+    """Returns NameTables tables holding the names of the objects of parsed games.
+    """
+    # The example games were parsed with names, so they hold every name we need
+    tables = {object_type: {} for object_type in ("champion", "item", "rune", "summoner_spell")}
+
+    for game in games:
+        for team in game["teams"].values():
+            tables["champion"].update(zip(team["bans"], team["bansNames"]))
+
+            for player in team["players"]:
+                tables["champion"][player["championId"]] = player["championName"]
+
+                for tree_field in "primaryRuneTree", "secondaryRuneTree":
+                    if f"{tree_field}Id" in player:
+                        tables["rune"][player[f"{tree_field}Id"]] = player[f"{tree_field}Name"]
+
+                for object_type, objects in (
+                    ("item", player["endOfGameStats"]["items"]),
+                    ("summoner_spell", player["summonerSpells"]),
+                    ("rune", player.get("runes", [])),
+                ):
+                    tables[object_type].update((riot_object["id"], riot_object["name"]) for riot_object in objects)
+
+    return tables
+
+
+def ddragon_runes_reforged(games: List[dict]) -> list:
+    """Rebuilds a partial runesReforged.json from the rune trees of parsed games.
+    """
+    trees = {}
+
+    for game in games:
+        for team in game["teams"].values():
+            for player in team["players"]:
+                if "primaryRuneTreeId" not in player:
+                    continue
+
+                for tree_key, runes in ("primary", player["runes"][:4]), ("secondary", player["runes"][4:6]):
+                    tree = trees.setdefault(
+                        player[f"{tree_key}RuneTreeId"],
+                        {"id": player[f"{tree_key}RuneTreeId"], "name": player[f"{tree_key}RuneTreeName"], "runes": {}},
+                    )
+                    tree["runes"].update({rune["id"]: rune.get("name", "") for rune in runes})
+
+    return [
+        {
+            "id": tree["id"],
+            "name": tree["name"],
+            "slots": [{"runes": [{"id": rune_id, "name": name} for rune_id, name in tree["runes"].items()]}],
+        }
+        for tree in trees.values()
+    ]
+
+
+def ddragon_routes(patches=("10.7",)) -> Dict[str, bytes]:
+    """Returns {path: response body} for the ddragon versions list and the rune trees of the given patches.
+    """
+    runes_reforged = json.dumps(ddragon_runes_reforged(qq_example_series()["games"])).encode()
+
+    routes = {"/ddragon/api/versions.json": json.dumps([f"{patch}.1" for patch in patches]).encode()}
+
+    for patch in patches:
+        routes[f"/ddragon/cdn/{patch}.1/data/en_US/runesReforged.json"] = runes_reforged
+
+    return routes
+
+
+def expected_qq_game(game: dict, add_names: bool = False, patch: str = None) -> dict:
+    """Returns a parsed example game as the parser outputs it with the given options.
+    """
+    game = copy.deepcopy(game)
+
+    if not patch:
+        game.pop("patch", None)
+
+    for team in game["teams"].values():
+        if not add_names:
+            team.pop("bansNames", None)
+
+        for player in team["players"]:
+            if not add_names:
+                player.pop("championName", None)
+
+                for item in player["endOfGameStats"]["items"]:
+                    item.pop("name", None)
+                for objects in player["summonerSpells"], player["runes"]:
+                    for riot_object in objects:
+                        riot_object.pop("name", None)
+
+            if not patch:
+                for key in "primaryRuneTreeId", "primaryRuneTreeName", "secondaryRuneTreeId", "secondaryRuneTreeName":
+                    player.pop(key, None)
+
+    return game
@@ -0,0 +1,66 @@
+"""Compares parse_qq_datetime with dateparser, the QQ parser's previous way of reading game start times.
+
+Import times are measured in fresh Python processes, and parsing times on the BattleDate and BattleTime fields of
+the payloads rebuilt from json_examples/qq_series.json.
+
+Usage:
+    python -m benchmarks.qq_timestamps --repeat 2000
+"""
+import argparse
+import subprocess
+import sys
+import time
+
+from lol_esports_parser.parsers.qq.qq_parser import parse_qq_datetime, qq_timezone
+
+from benchmarks import payloads
+
+
+def import_time(module: str) -> float:
+    """Returns the time it takes to import a module in a fresh process, in seconds.
+    """
+    code = (
+        "import sys, time\n"
+        "start = time.perf_counter()\n"
+        f"import {module}\n"
+        "print(time.perf_counter() - start, 'dateparser' in sys.modules)\n"
+    )
+    output = subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True).stdout.split()
+
+    if output[1] == "True" and module != "dateparser":
+        print(f"Warning: importing {module} imports dateparser")
+
+    return float(output[0])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=2000, help="number of times every example date is parsed")
+    args = parser.parse_args()
+
+    print(f"import dateparser: {import_time('dateparser') * 1000:.0f}ms")
+    print(f"import qq_parser: {import_time('lol_esports_parser.parsers.qq.qq_parser') * 1000:.0f}ms")
+
+    import dateparser
+
+    battle_infos = [raw_game["game_info"]["battleInfo"] for raw_game in payloads.qq_example_raw_games()]
+    dates = [(info["BattleDate"], info["BattleTime"]) for info in battle_infos]
+
+    def parse_with_dateparser(battle_date, battle_time):
+        return dateparser.parse(f"{battle_date}T{battle_time[:8]}").replace(tzinfo=qq_timezone)
+
+    for name, parse in (("dateparser", parse_with_dateparser), ("parse_qq_datetime", parse_qq_datetime)):
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            for battle_date, battle_time in dates:
+                parse(battle_date, battle_time)
+        duration = time.perf_counter() - start
+
+        print(f"{name}: {duration / (args.repeat * len(dates)) * 1e6:.1f}µs per game")
+
+    # Both have to give the same results for the comparison to make sense
+    assert all(parse_qq_datetime(*date) == parse_with_dateparser(*date) for date in dates)
+
+
+if __name__ == "__main__":
+    main()
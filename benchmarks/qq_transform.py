@@ -0,0 +1,53 @@
+"""Measures the time it takes to transform raw QQ payloads into LolGame objects, without any query.
+
+The payloads are rebuilt from json_examples/qq_series.json and transformed without names nor rune trees, so
+neither lol_id_tools nor ddragon are involved.
+
+Usage:
+    python -m benchmarks.qq_transform --repeat 2000
+"""
+import argparse
+import logging
+import time
+
+from lol_esports_parser.parsers.qq.qq_parser import transform_qq_game
+
+from benchmarks import payloads
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=2000, help="number of times every example game is transformed")
+    args = parser.parse_args()
+
+    # The example games log missing fields, which would dominate the measure
+    logging.disable(logging.WARNING)
+
+    raw_games = payloads.qq_example_raw_games()
+    games = payloads.qq_example_series()["games"]
+
+    arguments = [
+        (
+            raw_game["game_id"],
+            raw_game["game_info"],
+            raw_game["team_info"],
+            raw_game["runes_info"],
+            game["sources"]["qq"]["serverId"],
+            game["sources"]["qq"]["battleId"],
+        )
+        for raw_game, game in zip(raw_games, games)
+    ]
+
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        for game_arguments in arguments:
+            transform_qq_game(*game_arguments, add_names=False)
+    duration = time.perf_counter() - start
+
+    games_count = args.repeat * len(arguments)
+    print(f"{games_count} games transformed in {duration:.3f}s")
+    print(f"{games_count / duration:.0f} games/s, {duration / games_count * 1e6:.0f}µs per game")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Measures the throughput of processes sharing a RateLimiter bucket, and checks they stay under its limits.
+
+Each worker process takes tokens from the same bucket through a shared state file, like parsers of a host using the
+same account, and records when it got them. The achieved rate should be just under the limit, and no window of the
+limit duration should hold more requests than it allows.
+
+Usage:
+    python -m benchmarks.rate_limiter --processes 4 --limits 50:1,200:5 --duration 10
+"""
+import argparse
+import multiprocessing
+import os
+import tempfile
+import time
+from typing import List
+
+from lol_esports_parser.parsers.rate_limiter import RateLimiter, parse_limits
+
+
+def worker(location: str, limits: str, duration: float) -> List[float]:
+    limiter = RateLimiter({"host": limits}, state_location=location)
+    timestamps = []
+
+    end = time.time() + duration
+    while time.time() < end:
+        limiter.acquire(("host", "example.com"))
+        timestamps.append(time.time())
+
+    return timestamps
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--processes", type=int, default=4, help="number of worker processes")
+    parser.add_argument("--limits", default="50:1,200:5", help="limits of the bucket, in Riot's format")
+    parser.add_argument("--duration", type=float, default=10, help="number of seconds each worker runs")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as folder:
+        location = os.path.join(folder, "rate_limits.json")
+
+        with multiprocessing.get_context("spawn").Pool(args.processes) as pool:
+            results = pool.starmap(worker, [(location, args.limits, args.duration)] * args.processes)
+
+    timestamps = sorted(t for result in results for t in result)
+    duration = timestamps[-1] - timestamps[0]
+    print(f"{len(timestamps)} requests from {args.processes} processes, {len(timestamps) / duration:.1f} requests/s")
+
+    for limit in parse_limits(args.limits):
+        start, busiest = 0, 0
+        for end, timestamp in enumerate(timestamps):
+            while timestamps[start] <= timestamp - limit.seconds:
+                start += 1
+            busiest = max(busiest, end - start + 1)
+
+        print(f"limit {limit.requests}:{limit.seconds:g}, at most {busiest} requests in a {limit.seconds:g}s window")
+
+
+if __name__ == "__main__":
+    main()
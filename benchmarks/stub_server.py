@@ -0,0 +1,160 @@
+"""A local HTTP server answering in place of the QQ, ACS and ddragon endpoints.
+"""
+import hashlib
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Tuple
+
+
+class _Server(ThreadingHTTPServer):
+    # The default backlog of 5 drops connections opened in bursts by concurrent games, which then wait for a SYN retry
+    request_queue_size = 128
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients closing idle keep-alive connections, or cancelling requests, are expected and not worth a traceback
+        if not isinstance(sys.exc_info()[1], (ConnectionResetError, BrokenPipeError)):
+            super().handle_error(request, client_address)
+
+
+class StubServer:
+    """Serves recorded payloads on localhost.
+
+    Routes are matched on the full path, query string included. Responses can be delayed and fail randomly to mimic
+    slow and flaky endpoints.
+    """
+
+    def __init__(
+        self,
+        routes: Dict[str, bytes],
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        flaky_prefixes: Tuple[str, ...] = ("/qq/", "/acs/"),
+        seed: int = None,
+        etags: bool = False,
+    ):
+        """
+        Params:
+            routes: {path with query: response body}.
+            latency: minimum delay before answering, in seconds.
+            jitter: maximum random delay added to the latency, in seconds.
+            error_rate: probability to answer a 503 instead of the payload.
+            flaky_prefixes: paths affected by the error rate, the token and ddragon routes always answer by default.
+            seed: seed of the random delays and errors, for reproducible runs.
+            etags: whether or not to send ETag headers and answer 304 Not Modified to matching If-None-Match.
+        """
+        self.routes = dict(routes)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.flaky_prefixes = flaky_prefixes
+        self.etags = etags
+
+        self.requests_count = 0
+        self.errors_count = 0
+
+        # Requests being answered, and the most answered at the same time
+        self.active_requests = 0
+        self.max_active_requests = 0
+
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = _Server(("127.0.0.1", 0), self._handler_class())
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_port}"
+
+    def endpoints(self) -> dict:
+        """Returns an endpoints configuration pointing to this server.
+        """
+        return {
+            "acs": {"game": f"{self.url}/acs/", "auth": f"{self.url}/auth/token"},
+            "qq": {
+                "match_list": f"{self.url}/qq/match_list?bmid=",
+                "match_info": f"{self.url}/qq/match_info?p0=",
+                "battle_info": f"{self.url}/qq/battle_info?battleid=BATTLE_ID&worldid=WORLD_ID",
+                "runes": f"{self.url}/qq/runes?worldid=WORLD_ID&roomid=ROOM_ID",
+            },
+            "ddragon": {"base": f"{self.url}/ddragon"},
+        }
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def respond(self, path: str):
+        """Returns the status and body answered for the given path, after the simulated latency.
+        """
+        with self._lock:
+            self.requests_count += 1
+            self.active_requests += 1
+            self.max_active_requests = max(self.max_active_requests, self.active_requests)
+
+            delay = self.latency + self._random.uniform(0, self.jitter)
+            error = path.startswith(self.flaky_prefixes) and self._random.random() < self.error_rate
+
+            if error:
+                self.errors_count += 1
+
+        if delay:
+            time.sleep(delay)
+
+        with self._lock:
+            self.active_requests -= 1
+
+        if error:
+            return 503, b"Service Unavailable"
+
+        if path in self.routes:
+            return 200, self.routes[path]
+
+        return 404, b'{"msg": "not found"}'
+
+    def _handler_class(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                status, body = stub.respond(self.path)
+                headers = {"Content-Type": "application/json"}
+
+                if stub.etags and status == 200:
+                    headers["ETag"] = f'"{hashlib.sha1(body).hexdigest()}"'
+
+                    if self.headers.get("If-None-Match") == headers["ETag"]:
+                        status, body = 304, b""
+
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                self.do_GET()
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
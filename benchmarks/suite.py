@@ -0,0 +1,240 @@
+"""Offline end-to-end benchmarks of get_qq_series, get_riot_series and get_riot_game.
+
+Payloads rebuilt from json_examples are served by a local stub server with the given latency, jitter and error rate,
+and every scenario runs in a fresh Python process pointed at it, so no network access nor configuration is needed.
+Each scenario reports games per second, p50/p99 call latency, the highest thread count and the peak RSS.
+
+Results are compared to benchmarks/baseline.json, and the command fails if a scenario regressed by more than the
+tolerance. Baselines depend on the machine, so they should be recorded again with --update-baseline on a new one.
+
+Usage:
+    python -m benchmarks.suite
+    python -m benchmarks.suite --latency 0.05 --jitter 0.05 --error-rate 0.02
+    python -m benchmarks.suite --update-baseline
+"""
+import argparse
+import json
+import math
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures.thread import ThreadPoolExecutor
+from typing import Dict, List
+
+from benchmarks import payloads
+from benchmarks.stub_server import StubServer
+
+baseline_location = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+scenarios = ("get_qq_series", "get_riot_series", "get_riot_game")
+
+# Metrics where a higher value is a regression, the other ones being better when higher
+lower_is_better = {"p50": True, "p99": True, "max_threads": True, "peak_rss_mb": True, "games_per_second": False}
+
+
+def percentile(values: List[float], percentage: float) -> float:
+    # Nearest-rank percentile, which is exact for the small samples we use
+    values = sorted(values)
+    return values[max(0, math.ceil(len(values) * percentage / 100) - 1)]
+
+
+def run_scenario(scenario: str, endpoints: dict, calls: int, concurrency: int) -> Dict[str, float]:
+    """Runs a scenario in the current process and returns its metrics.
+    """
+    import resource
+
+    import lol_esports_parser
+    from lol_esports_parser import config
+    from lol_esports_parser.parsers.response_cache import response_cache
+
+    config.set_endpoints(endpoints)
+
+    # Every call has to go through the stub server
+    response_cache.enabled = False
+
+    acs = lol_esports_parser.ACS(
+        credentials={"account_name": "benchmark", "password": "benchmark"},
+        token_location=os.path.join(tempfile.mkdtemp(), "acs_token.json"),
+    )
+
+    riot_games = payloads.riot_example_games()
+    riot_series_urls = [payloads.riot_mh_url(game) for game in riot_games[:-1]]
+    riot_game_url = payloads.riot_mh_url(riot_games[-1])
+    qq_match_url = f"https://lpl.qq.com/es/stats.shtml?bmid={payloads.qq_example_bmid}"
+
+    def call() -> int:
+        if scenario == "get_qq_series":
+            return len(lol_esports_parser.get_qq_series(qq_match_url, add_names=False)["games"])
+        if scenario == "get_riot_series":
+            return len(lol_esports_parser.get_riot_series(riot_series_urls, add_names=False, acs=acs)["games"])
+
+        lol_esports_parser.get_riot_game(riot_game_url, get_timeline=True, acs=acs)
+        return 1
+
+    # The first call pays for lazy imports and the ACS token, which are not measured
+    call()
+
+    max_threads = threading.active_count()
+    sampling = True
+
+    def sample_threads():
+        nonlocal max_threads
+        while sampling:
+            # The sampling thread itself is not counted
+            max_threads = max(max_threads, threading.active_count() - 1)
+            time.sleep(0.005)
+
+    sampler = threading.Thread(target=sample_threads, daemon=True)
+    sampler.start()
+
+    def timed_call():
+        start = time.perf_counter()
+        games_count = call()
+        return games_count, time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as executor:
+        results = list(executor.map(lambda _: timed_call(), range(calls)))
+    duration = time.perf_counter() - start
+
+    sampling = False
+    sampler.join()
+
+    latencies = [latency for _, latency in results]
+
+    return {
+        "games_per_second": sum(games_count for games_count, _ in results) / duration,
+        "p50": percentile(latencies, 50),
+        "p99": percentile(latencies, 99),
+        "max_threads": max_threads,
+        # ru_maxrss is expressed in kilobytes on Linux
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def run_scenario_process(scenario: str, endpoints: dict, calls: int, concurrency: int) -> Dict[str, float]:
+    with tempfile.TemporaryDirectory() as home:
+        environment = {**os.environ, "HOME": home, "PYTHONPATH": os.getcwd()}
+
+        output = subprocess.run(
+            [
+                sys.executable,
+                "-m",
+                "benchmarks.suite",
+                "--run-scenario",
+                scenario,
+                "--endpoints",
+                json.dumps(endpoints),
+                "--calls",
+                str(calls),
+                "--concurrency",
+                str(concurrency),
+            ],
+            env=environment,
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+
+    return json.loads(output.stdout.splitlines()[-1])
+
+
+def find_regressions(results: dict, baseline: dict, tolerance: float) -> List[str]:
+    regressions = []
+
+    for scenario, metrics in results.items():
+        for metric, value in metrics.items():
+            baseline_value = baseline.get(scenario, {}).get(metric)
+            if baseline_value is None:
+                continue
+
+            if lower_is_better[metric]:
+                regressed = value > baseline_value * (1 + tolerance)
+            else:
+                regressed = value < baseline_value * (1 - tolerance)
+
+            if regressed:
+                regressions.append(f"{scenario} {metric}: {value:.3f} against {baseline_value:.3f} in the baseline")
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--latency", type=float, default=0.02, help="stub server latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.01, help="maximum random latency added in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="probability of QQ and ACS queries to fail")
+    parser.add_argument("--calls", type=int, default=40, help="number of calls per scenario")
+    parser.add_argument("--concurrency", type=int, default=4, help="number of calls made at the same time")
+    parser.add_argument("--scenarios", nargs="+", default=scenarios, choices=scenarios)
+    parser.add_argument("--tolerance", type=float, default=0.3, help="relative regression allowed on every metric")
+    parser.add_argument("--baseline", default=baseline_location)
+    parser.add_argument("--update-baseline", action="store_true", help="record the results as the new baseline")
+    parser.add_argument("--run-scenario", help=argparse.SUPPRESS)
+    parser.add_argument("--endpoints", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    # Child process running a single scenario
+    if args.run_scenario:
+        print(json.dumps(run_scenario(args.run_scenario, json.loads(args.endpoints), args.calls, args.concurrency)))
+        return
+
+    settings = {
+        "latency": args.latency,
+        "jitter": args.jitter,
+        "error_rate": args.error_rate,
+        "calls": args.calls,
+        "concurrency": args.concurrency,
+    }
+
+    routes = {**payloads.qq_routes(), **payloads.riot_routes(), **payloads.ddragon_routes()}
+
+    results = {}
+    with StubServer(routes, args.latency, args.jitter, args.error_rate, seed=0) as stub:
+        for scenario in args.scenarios:
+            results[scenario] = run_scenario_process(scenario, stub.endpoints(), args.calls, args.concurrency)
+
+            metrics = results[scenario]
+            print(
+                f"{scenario:<16} {metrics['games_per_second']:8.1f} games/s   "
+                f"p50 {metrics['p50'] * 1000:7.1f}ms   p99 {metrics['p99'] * 1000:7.1f}ms   "
+                f"{metrics['max_threads']:3d} threads   {metrics['peak_rss_mb']:6.1f}MB peak RSS"
+            )
+
+    if args.update_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as file:
+                baseline = json.load(file)
+
+        # The cold start benchmark records its own section in the same file
+        with open(args.baseline, "w") as file:
+            json.dump({**baseline, "settings": settings, "results": results}, file, indent=4)
+        print(f"Baseline written to {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}, record one with --update-baseline")
+        return
+
+    with open(args.baseline) as file:
+        baseline = json.load(file)
+
+    if baseline["settings"] != settings:
+        print(f"The baseline was recorded with other settings: {baseline['settings']}")
+        return
+
+    regressions = find_regressions(results, baseline["results"], args.tolerance)
+
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Measures get_series_bulk throughput with transforms in the shared transform thread and in worker processes.
+
+The example QQ series is requested many times from a local stub server without latency, so parsing is the
+bottleneck and the games per second show how transforms scale with the number of processes.
+
+Usage:
+    python -m benchmarks.transform_pool --series 200 --processes 1 2 4
+"""
+import argparse
+import tempfile
+import time
+
+import lol_esports_parser
+from lol_esports_parser import config
+from lol_esports_parser.parsers.response_cache import response_cache
+
+from benchmarks import payloads
+from benchmarks.stub_server import StubServer
+
+
+def games_per_second(match_url: str, series_count: int, transform_processes: int = None) -> float:
+    start = time.perf_counter()
+
+    games_count = 0
+    for result in lol_esports_parser.get_series_bulk(
+        [match_url] * series_count, add_names=False, transform_processes=transform_processes
+    ):
+        if result.errors:
+            raise result.errors[0]
+        games_count += len(result.series["games"])
+
+    return games_count / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--series", type=int, default=200, help="number of times the example series is requested")
+    parser.add_argument("--processes", type=int, nargs="+", default=[1, 2, 4], help="transform processes to try")
+    args = parser.parse_args()
+
+    # Payloads are served once per series, not from the disk cache
+    response_cache.folder = tempfile.mkdtemp()
+    response_cache.enabled = False
+
+    match_url = f"https://lpl.qq.com/es/stats.shtml?bmid={payloads.qq_example_bmid}"
+
+    with StubServer(payloads.qq_routes()) as stub:
+        config.set_endpoints(stub.endpoints())
+
+        # The first run pays for lazy imports
+        games_per_second(match_url, 1)
+
+        print(f"transform thread: {games_per_second(match_url, args.series):.0f} games/s")
+        for processes in args.processes:
+            print(f"{processes} processes: {games_per_second(match_url, args.series, processes):.0f} games/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,2 +1,53 @@
-from lol_esports_parser.parsers.riot.riot_parser import get_riot_series, get_riot_game
-from lol_esports_parser.parsers.qq.qq_parser import get_qq_series
+import importlib
+
+# Public functions are imported on first access, so importing the package stays cheap for short-lived workers
+_lazy_attributes = {
+    "get_riot_series": "lol_esports_parser.parsers.riot.riot_parser",
+    "get_riot_game": "lol_esports_parser.parsers.riot.riot_parser",
+    "get_riot_series_async": "lol_esports_parser.parsers.riot.riot_parser",
+    "get_riot_game_async": "lol_esports_parser.parsers.riot.riot_parser",
+    "stream_riot_series": "lol_esports_parser.parsers.riot.riot_parser",
+    "stream_riot_series_async": "lol_esports_parser.parsers.riot.riot_parser",
+    "refresh_riot_series": "lol_esports_parser.parsers.riot.riot_parser",
+    "refresh_riot_series_async": "lol_esports_parser.parsers.riot.riot_parser",
+    "get_qq_series": "lol_esports_parser.parsers.qq.qq_parser",
+    "parse_qq_game": "lol_esports_parser.parsers.qq.qq_parser",
+    "get_qq_series_async": "lol_esports_parser.parsers.qq.qq_parser",
+    "parse_qq_game_async": "lol_esports_parser.parsers.qq.qq_parser",
+    "stream_qq_series": "lol_esports_parser.parsers.qq.qq_parser",
+    "stream_qq_series_async": "lol_esports_parser.parsers.qq.qq_parser",
+    "refresh_qq_series": "lol_esports_parser.parsers.qq.qq_parser",
+    "refresh_qq_series_async": "lol_esports_parser.parsers.qq.qq_parser",
+    "get_series_bulk": "lol_esports_parser.parsers.bulk",
+    "get_series_bulk_async": "lol_esports_parser.parsers.bulk",
+    "HttpClient": "lol_esports_parser.parsers.http_client",
+    "ACS": "lol_esports_parser.parsers.riot.acs_access",
+    "RuneTreeHandler": "lol_esports_parser.parsers.rune_tree_handler",
+    "NameTables": "lol_esports_parser.parsers.name_tables",
+    "GameTables": "lol_esports_parser.dto.columnar",
+    "CompactGames": "lol_esports_parser.dto.compact",
+    "SeriesState": "lol_esports_parser.parsers.incremental",
+    "GameStore": "lol_esports_parser.game_store",
+    "Backfill": "lol_esports_parser.backfill",
+    "LiveGamePoller": "lol_esports_parser.parsers.riot.live_poller",
+    "MetricsSink": "lol_esports_parser.parsers.telemetry",
+    "StatsdSink": "lol_esports_parser.parsers.telemetry",
+    "PrometheusSink": "lol_esports_parser.parsers.telemetry",
+    "set_metrics_sink": "lol_esports_parser.parsers.telemetry",
+}
+
+__all__ = list(_lazy_attributes)
+
+
+def __getattr__(name):
+    if name not in _lazy_attributes:
+        raise AttributeError(f"module {__name__} has no attribute {name}")
+
+    attribute = getattr(importlib.import_module(_lazy_attributes[name]), name)
+    globals()[name] = attribute
+
+    return attribute
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
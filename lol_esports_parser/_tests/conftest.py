@@ -0,0 +1,69 @@
+from collections import defaultdict
+
+import pytest
+
+from lol_esports_parser import config
+from lol_esports_parser.parsers import name_tables
+from lol_esports_parser.parsers.response_cache import response_cache
+
+from benchmarks import payloads
+from benchmarks.stub_server import StubServer
+
+
+@pytest.fixture
+def qq_stub(tmp_path, monkeypatch):
+    # Games are served from a local server rebuilding the raw QQ payloads from json_examples/qq_series.json
+    monkeypatch.setattr(config, "_endpoints", None)
+    monkeypatch.setattr(response_cache, "folder", str(tmp_path))
+
+    with StubServer({**payloads.qq_routes(), **payloads.ddragon_routes()}) as stub:
+        config.set_endpoints(stub.endpoints())
+        yield stub
+
+
+@pytest.fixture
+def riot_stub(tmp_path, monkeypatch):
+    # Games are served from a local server rebuilding the ACS payloads from json_examples
+    monkeypatch.setattr(config, "_endpoints", None)
+    monkeypatch.setattr(response_cache, "folder", str(tmp_path))
+
+    with StubServer(payloads.riot_routes()) as stub:
+        config.set_endpoints(stub.endpoints())
+        yield stub
+
+
+@pytest.fixture
+def acs(riot_stub, tmp_path):
+    from lol_esports_parser import ACS
+
+    return ACS(credentials={"account_name": "test", "password": "test"}, token_location=str(tmp_path / "token.json"))
+
+
+@pytest.fixture
+def lol_id_tools_stub(monkeypatch):
+    # lol_id_tools starts without data and loads the names of the examples instead of querying ddragon
+    from lol_id_tools.lol_id_tools import lod
+
+    tables = payloads.example_name_tables(payloads.qq_example_series()["games"] + payloads.riot_example_games())
+    tables["champion"][1] = "Annie"
+
+    loaded_locales = []
+
+    async def load_locale(locale, latest_version=None):
+        lod.loaded_data[locale] = defaultdict(dict)
+
+        for object_type, table in tables.items():
+            for object_id, name in table.items():
+                lod.loaded_data[locale][object_id][object_type] = name
+
+        loaded_locales.append(locale)
+
+    async def get_latest_version():
+        return "10.7.1"
+
+    monkeypatch.setattr(lod, "_loaded_data", {})
+    monkeypatch.setattr(lod, "load_locale", load_locale)
+    monkeypatch.setattr(lod, "get_latest_version", get_latest_version)
+    monkeypatch.setattr(name_tables.default_name_tables, "_tables", None)
+
+    return loaded_locales
@@ -0,0 +1,81 @@
+import base64
+import json
+import threading
+import time
+
+from lol_esports_parser.parsers.riot.acs_token import AcsTokenManager, get_token_expiration
+
+
+def make_token(expiration):
+    payload = base64.urlsafe_b64encode(json.dumps({"exp": expiration}).encode()).decode().rstrip("=")
+    return f"header.{payload}.signature"
+
+
+class TokenRequester:
+    def __init__(self, lifetime=3600):
+        self.lifetime = lifetime
+        self.count = 0
+
+    def __call__(self):
+        self.count += 1
+        # Slow enough for all threads to be waiting on the refresh
+        time.sleep(0.1)
+        return make_token(int(time.time()) + self.lifetime)
+
+
+def test_token_expiration():
+    assert get_token_expiration(make_token(1600000000)) == 1600000000
+    assert get_token_expiration("not a token") is None
+
+
+def test_single_flight_refresh(tmp_path):
+    requester = TokenRequester()
+    manager = AcsTokenManager(requester, "account", token_location=str(tmp_path / "acs_token.json"))
+
+    tokens = []
+    threads = [threading.Thread(target=lambda: tokens.append(manager.get_token())) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert requester.count == 1
+    assert len(set(tokens)) == 1
+
+
+def test_token_shared_through_file(tmp_path):
+    token_location = str(tmp_path / "acs_token.json")
+
+    first_requester = TokenRequester()
+    token = AcsTokenManager(first_requester, "account", token_location=token_location).get_token()
+
+    # A new manager, as in another process, reuses the saved token
+    second_requester = TokenRequester()
+    assert AcsTokenManager(second_requester, "account", token_location=token_location).get_token() == token
+    assert second_requester.count == 0
+
+    # But not for another account
+    AcsTokenManager(second_requester, "other_account", token_location=token_location).get_token()
+    assert second_requester.count == 1
+
+
+def test_refresh_before_expiration(tmp_path):
+    # Tokens expiring within the refresh margin are refreshed
+    requester = TokenRequester(lifetime=60)
+    manager = AcsTokenManager(requester, "account", token_location=str(tmp_path / "acs_token.json"))
+
+    manager.get_token()
+    manager.get_token()
+
+    assert requester.count == 2
+
+
+def test_invalidate(tmp_path):
+    requester = TokenRequester()
+    manager = AcsTokenManager(requester, "account", token_location=str(tmp_path / "acs_token.json"))
+
+    token = manager.get_token()
+    manager.invalidate(token)
+
+    manager.get_token()
+    assert requester.count == 2
@@ -0,0 +1,156 @@
+import pytest
+
+from lol_esports_parser import cli
+from lol_esports_parser.backfill import Backfill, read_inputs, series_key, shard_of
+from lol_esports_parser.game_store import GameStore
+from lol_esports_parser.parsers.bulk import to_job
+from lol_esports_parser.parsers.qq import qq_access
+from lol_esports_parser.parsers.retry_policy import RetryPolicy
+
+from benchmarks import payloads
+
+match_url = f"http://lol.qq.com/match/match_data.shtml?bmid={payloads.qq_example_bmid}"
+
+
+def test_backfill_retries_and_resumes(qq_stub, tmp_path, monkeypatch):
+    monkeypatch.setattr(qq_access.retry_policy, "attempts", 1)
+    expected_series = payloads.qq_example_series()
+
+    # One game fails until the end of the first run
+    failing_game_id = expected_series["games"][-1]["sources"]["qq"]["id"]
+    qq_stub.flaky_prefixes = (f"/qq/match_info?p0={failing_game_id}",)
+    qq_stub.error_rate = 1.0
+
+    journal_location = str(tmp_path / "journal.sqlite")
+    retry_policy = RetryPolicy(attempts=3, backoff=0.5, jitter=0)
+    reports = []
+
+    with GameStore(str(tmp_path / "games.sqlite")) as store:
+        with Backfill(journal_location, store, add_names=False, retry_policy=retry_policy) as backfill:
+            assert backfill.add_inputs([match_url]) == 1
+
+            progress = backfill.run(progress=reports.append, wait_for_retries=False)
+
+        assert progress.games_done == len(expected_series["games"]) - 1
+        assert progress.games_waiting == progress.games_pending == 1
+        assert progress.series_done == 0
+        assert reports[-1] == progress
+
+        qq_stub.error_rate = 0.0
+        requests_count = qq_stub.requests_count
+
+        # A new runner on the same journal only retrieves the missing game
+        with Backfill(journal_location, store, add_names=False, retry_policy=retry_policy) as backfill:
+            assert backfill.add_inputs([match_url]) == 0
+
+            progress = backfill.run()
+
+        assert progress.games_done == len(expected_series["games"])
+        assert progress.series_done == progress.series_count == 1
+        assert qq_stub.requests_count - requests_count <= 4
+
+        series = store.get_series(f"qq:{payloads.qq_example_bmid}")
+        assert series["games"] == [payloads.expected_qq_game(game) for game in expected_series["games"]]
+        assert series["score"] == expected_series["score"]
+
+
+def test_failed_games(qq_stub, tmp_path, monkeypatch):
+    monkeypatch.setattr(qq_access.retry_policy, "attempts", 1)
+    expected_series = payloads.qq_example_series()
+
+    failing_game_id = expected_series["games"][0]["sources"]["qq"]["id"]
+    qq_stub.flaky_prefixes = (f"/qq/match_info?p0={failing_game_id}",)
+    qq_stub.error_rate = 1.0
+
+    with GameStore(str(tmp_path / "games.sqlite")) as store:
+        with Backfill(
+            str(tmp_path / "journal.sqlite"), store, add_names=False, retry_policy=RetryPolicy(attempts=2, backoff=0.01)
+        ) as backfill:
+            backfill.add_inputs([match_url])
+            progress = backfill.run()
+
+            assert progress.games_failed == 1
+            assert progress.series_failed == 1
+
+            # The series is stored with the games that could be retrieved
+            series = store.get_series(f"qq:{payloads.qq_example_bmid}")
+            assert len(series["games"]) == len(expected_series["games"]) - 1
+
+            qq_stub.error_rate = 0.0
+            backfill.retry_failed()
+            progress = backfill.run()
+
+            assert progress.games_failed == progress.series_failed == 0
+            assert progress.series_done == 1
+
+
+@pytest.mark.parametrize("transform_processes", [None, 2])
+def test_backfill_with_names(qq_stub, lol_id_tools_stub, tmp_path, transform_processes):
+    expected_series = payloads.qq_example_series()
+
+    with GameStore(str(tmp_path / "games.sqlite")) as store:
+        with Backfill(str(tmp_path / "journal.sqlite"), store, transform_processes=transform_processes) as backfill:
+            backfill.add_inputs([match_url])
+            progress = backfill.run()
+
+        assert progress.games_done == len(expected_series["games"])
+        assert progress.series_done == 1
+
+        assert store.get_series(f"qq:{payloads.qq_example_bmid}")["games"] == [
+            payloads.expected_qq_game(game, add_names=True) for game in expected_series["games"]
+        ]
+
+
+def test_cli_backfill(qq_stub, lol_id_tools_stub, tmp_path, capsys):
+    inputs_location = tmp_path / "inputs.txt"
+    inputs_location.write_text(f"{payloads.qq_example_bmid}\n")
+    store_location = str(tmp_path / "games.sqlite")
+
+    cli.main(["backfill", str(inputs_location), "--store", store_location, "--attempts", "1"])
+
+    assert "1 new series" in capsys.readouterr().err
+
+    with GameStore(store_location) as store:
+        assert store.get_series(f"qq:{payloads.qq_example_bmid}")["games"] == [
+            payloads.expected_qq_game(game, add_names=True) for game in payloads.qq_example_series()["games"]
+        ]
+
+
+def test_sharding(tmp_path):
+    inputs_location = tmp_path / "inputs.txt"
+    inputs_location.write_text(
+        "# A comment\n"
+        + "\n".join(str(bmid) for bmid in range(100))
+        + "\nhttps://matchhistory.na.leagueoflegends.com/en/#match-details/ESPORTSTMNT03/1?gameHash=a "
+        "https://matchhistory.na.leagueoflegends.com/en/#match-details/ESPORTSTMNT03/2?gameHash=b\n"
+    )
+
+    items = list(read_inputs(str(inputs_location)))
+    assert len(items) == 101
+
+    keys = [series_key(to_job(item)) for item in items]
+    assert keys[0] == "qq:0"
+    assert keys[-1].startswith("riot:")
+
+    added = []
+    with GameStore(":memory:") as store:
+        # Shards share the journal, each adding its own part of the inputs
+        for shard in range(3):
+            with Backfill(str(tmp_path / "journal.sqlite"), store, shard=shard, shards=3) as backfill:
+                added.append(backfill.add_inputs(reversed(items) if shard else items))
+                assert backfill.progress().series_count == added[-1]
+
+    # Every series belongs to a single shard, whatever the order of the inputs
+    assert sum(added) == 101
+    assert added == [sum(shard_of(key, 3) == shard for key in keys) for shard in range(3)]
+
+
+def test_invalid_inputs_are_skipped(tmp_path, caplog):
+    items = [6131, "https://lpl.qq.com/es/stats.shtml", "https://lpl.qq.com/es/stats.shtml?bmid=", 6132]
+
+    with GameStore(":memory:") as store:
+        with Backfill(str(tmp_path / "journal.sqlite"), store) as backfill:
+            assert backfill.add_inputs(items) == 2
+            assert backfill.progress().series_count == 2
+
+    assert sum("Skipping invalid input" in record.message for record in caplog.records) == 2
@@ -0,0 +1,121 @@
+import asyncio
+import time
+
+import pytest
+
+import lol_esports_parser
+from lol_esports_parser.parsers.qq import qq_access
+from lol_esports_parser.parsers.retry_policy import RetryPolicy
+
+from benchmarks import payloads
+
+bmids = list(range(1, 9))
+
+
+@pytest.mark.parametrize("max_connections, max_connections_per_host", [(2, 16), (64, 3)])
+def test_connection_limits(qq_stub, monkeypatch, max_connections, max_connections_per_host):
+    # Hedged requests give their connection back when cancelled, while the stub keeps answering them
+    monkeypatch.setattr(qq_access, "retry_policy", RetryPolicy())
+
+    # Every series has its own match list, so all of them query the stub at the same time
+    for bmid in bmids:
+        qq_stub.routes.update(payloads.qq_routes(bmid))
+    qq_stub.latency = 0.05
+
+    results = list(
+        lol_esports_parser.get_series_bulk(
+            bmids,
+            add_names=False,
+            max_connections=max_connections,
+            max_connections_per_host=max_connections_per_host,
+            max_series=len(bmids),
+        )
+    )
+
+    assert len(results) == len(bmids)
+    assert not any(result.errors for result in results)
+
+    # The stub is a single host, so the lowest limit applies
+    assert qq_stub.max_active_requests == min(max_connections, max_connections_per_host)
+
+
+def test_errors_are_collected(qq_stub, monkeypatch):
+    monkeypatch.setattr(qq_access.retry_policy, "attempts", 1)
+    expected_series = payloads.qq_example_series()
+
+    failing_game_id = expected_series["games"][0]["sources"]["qq"]["id"]
+    qq_stub.flaky_prefixes = (f"/qq/match_info?p0={failing_game_id}",)
+    qq_stub.error_rate = 1.0
+
+    # The second series is not served, so it cannot even be listed
+    results = {
+        result.job.qq_match_url: result
+        for result in lol_esports_parser.get_series_bulk([payloads.qq_example_bmid, 1], add_names=False)
+    }
+
+    partial_result = results[f"https://lpl.qq.com/es/stats.shtml?bmid={payloads.qq_example_bmid}"]
+    assert len(partial_result.errors) == 1
+    assert partial_result.series["games"] == [payloads.expected_qq_game(game) for game in expected_series["games"][1:]]
+
+    failed_result = results["https://lpl.qq.com/es/stats.shtml?bmid=1"]
+    assert failed_result.series is None
+    assert len(failed_result.errors) == 1
+
+
+def test_invalid_items_only_fail_their_result(qq_stub):
+    results = list(
+        lol_esports_parser.get_series_bulk([None, payloads.qq_example_bmid, "not a series"], add_names=False)
+    )
+
+    assert len(results) == 3
+
+    failed_results = [result for result in results if result.series is None]
+    assert sorted(map(str, (result.job for result in failed_results))) == ["None", "not a series"]
+    assert all(isinstance(result.errors[0], ValueError) for result in failed_results)
+
+    valid_result = next(result for result in results if result.series is not None)
+    assert not valid_result.errors
+    assert len(valid_result.series["games"]) == len(payloads.qq_example_series()["games"])
+
+
+@pytest.fixture
+def endless_series(qq_stub, monkeypatch):
+    # The series of bmid 1 keeps retrying its match list until it is cancelled
+    monkeypatch.setattr(qq_access, "retry_policy", RetryPolicy(attempts=1000, backoff=0.01, max_backoff=0.1))
+    qq_stub.routes.update(payloads.qq_routes(1))
+    qq_stub.flaky_prefixes = ("/qq/match_list?bmid=1",)
+    qq_stub.error_rate = 1.0
+
+    return qq_stub
+
+
+def test_early_close_cancels_pending_series(endless_series):
+    results = lol_esports_parser.get_series_bulk([payloads.qq_example_bmid, 1], add_names=False)
+
+    assert next(results).job.qq_match_url.endswith(f"bmid={payloads.qq_example_bmid}")
+
+    start = time.monotonic()
+    results.close()
+    assert time.monotonic() - start < 1
+
+    # No request is made once closed
+    requests_count = endless_series.requests_count
+    time.sleep(0.3)
+    assert endless_series.requests_count == requests_count
+
+
+def test_early_close_of_async_generator(endless_series):
+    async def get_first_result():
+        results = lol_esports_parser.get_series_bulk_async([payloads.qq_example_bmid, 1], add_names=False)
+
+        async for result in results:
+            await results.aclose()
+
+            # Retries of the pending series stop with the generator, while the loop keeps running
+            requests_count = endless_series.requests_count
+            await asyncio.sleep(0.3)
+            assert endless_series.requests_count == requests_count
+
+            return result
+
+    assert asyncio.run(get_first_result()).job.qq_match_url.endswith(f"bmid={payloads.qq_example_bmid}")
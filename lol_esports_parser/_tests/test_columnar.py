@@ -0,0 +1,58 @@
+import json
+import os
+
+import pytest
+
+from lol_esports_parser.dto.columnar import GameTables
+
+examples_folder = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "json_examples")
+
+
+@pytest.fixture
+def games():
+    with open(os.path.join(examples_folder, "qq_series.json")) as file:
+        qq_games = json.load(file)["games"]
+    with open(os.path.join(examples_folder, "lck_game.json")) as file:
+        riot_game = json.load(file)
+
+    return [*qq_games, riot_game]
+
+
+def test_tables(games):
+    tables = GameTables(games).columns
+
+    assert len(tables["games"]["gameIndex"]) == len(games)
+    assert len(tables["teams"]["side"]) == 2 * len(games)
+    assert len(tables["players"]["inGameName"]) == 10 * len(games)
+    assert tables["players"]["kills"][0] == games[0]["teams"]["BLUE"]["players"][0]["endOfGameStats"]["kills"]
+    assert len(tables["items"]["id"]) == sum(
+        len(p["endOfGameStats"]["items"]) for g in games for t in g["teams"].values() for p in t["players"]
+    )
+    assert sum(tables["teams"]["win"]) == len(games)
+
+
+def test_numpy(games):
+    numpy = pytest.importorskip("numpy")
+
+    players = GameTables(games).to_numpy()["players"]
+
+    assert players["championId"].dtype == numpy.int64
+    # The Riot game has no role, the QQ games have no player id
+    assert players["role"].dtype == object
+    assert numpy.isnan(players["id"][0])
+
+
+@pytest.mark.parametrize("file_format", ["parquet", "feather"])
+def test_write(games, tmp_path, file_format):
+    pyarrow = pytest.importorskip("pyarrow")
+    pytest.importorskip(f"pyarrow.{file_format}")
+
+    GameTables(games).write(str(tmp_path), file_format)
+
+    if file_format == "parquet":
+        players = pyarrow.parquet.read_table(str(tmp_path / "players.parquet"))
+    else:
+        players = pyarrow.feather.read_table(str(tmp_path / "players.feather"))
+
+    assert players.num_rows == 10 * len(games)
+    assert players.column("championId").type == pyarrow.int64()
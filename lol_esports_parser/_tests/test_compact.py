@@ -0,0 +1,40 @@
+import json
+import pickle
+
+from lol_esports_parser.dto.compact import CompactGames
+
+from benchmarks import payloads
+
+
+def example_games() -> list:
+    return payloads.qq_example_series()["games"] + payloads.riot_example_games()
+
+
+def test_round_trip_is_lossless():
+    games = example_games()
+    compact_games = CompactGames(games)
+
+    # Dumping checks key order and number types too
+    assert [json.dumps(game) for game in compact_games.to_games()] == [json.dumps(game) for game in games]
+    assert [record.to_dict() for record in compact_games] == games
+
+
+def test_lazy_access():
+    games = example_games()
+    compact_games = CompactGames(games)
+
+    blue_team = compact_games[0]["teams"]["BLUE"]
+    assert blue_team["name"] == games[0]["teams"]["BLUE"]["name"]
+    assert blue_team["players"] == games[0]["teams"]["BLUE"]["players"]
+    assert list(compact_games[-1]) == list(games[-1])
+    assert compact_games[0].get("vod") is None
+
+
+def test_keys_are_shared():
+    compact_games = CompactGames(example_games())
+    shapes_count = len(compact_games.shapes.keys)
+
+    compact_games.extend(example_games())
+    assert len(compact_games.shapes.keys) == shapes_count
+
+    assert pickle.loads(pickle.dumps(compact_games))[-1].to_dict() == example_games()[-1]
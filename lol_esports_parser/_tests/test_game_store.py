@@ -0,0 +1,115 @@
+import copy
+
+from lol_esports_parser.game_store import GameStore
+
+from benchmarks import payloads
+
+
+def test_series_round_trip(tmp_path):
+    series = payloads.qq_example_series()
+
+    with GameStore(str(tmp_path / "games.sqlite")) as store:
+        store.upsert_series(series, key="qq:6131")
+
+    # A new connection, as in a new process
+    with GameStore(str(tmp_path / "games.sqlite")) as store:
+        assert store.get_series("qq:6131") == series
+        assert store.get_game("qq", series["games"][0]["sources"]["qq"]["id"]) == series["games"][0]
+
+
+def test_indexed_queries():
+    qq_games = payloads.qq_example_series()["games"]
+    riot_games = payloads.riot_example_games()
+
+    with GameStore(":memory:") as store:
+        store.upsert_games(qq_games + riot_games)
+
+        team_name = qq_games[0]["teams"]["BLUE"]["name"]
+        assert store.find_games(team=team_name, patch="10.7") == [
+            game for game in qq_games if team_name in (team.get("name") for team in game["teams"].values())
+        ]
+        assert store.find_games(team=team_name, patch="9.1") == []
+
+        account_id = qq_games[0]["teams"]["BLUE"]["players"][0]["uniqueIdentifiers"]["qq"]["accountId"]
+        assert qq_games[0] in store.find_games(player=("qq", "accountId", account_id))
+
+        riot_source = riot_games[0]["sources"]["riotLolApi"]
+        assert store.get_game("riotLolApi", f"{riot_source['platformId']}/{riot_source['gameId']}") == riot_games[0]
+
+        # QQ start dates are in China Standard Time, which is compared in UTC
+        start = qq_games[0]["start"]
+        assert store.find_games(start_from=start, limit=1) == [qq_games[0]]
+        assert qq_games[0] not in store.find_games(start_to=start)
+
+
+def test_upsert_replaces_games():
+    game = payloads.qq_example_series()["games"][0]
+
+    with GameStore(":memory:") as store:
+        store.upsert_games([game])
+
+        renamed_game = copy.deepcopy(game)
+        renamed_game["teams"]["BLUE"]["name"] = "Renamed"
+        store.upsert_games([renamed_game])
+
+        assert store.find_games() == [renamed_game]
+        assert store.find_games(team=game["teams"]["BLUE"]["name"]) == []
+        assert store.find_games(team="Renamed") == [renamed_game]
+
+
+def test_upsert_merges_games_from_different_sources():
+    qq_game = payloads.qq_example_series()["games"][0]
+
+    riot_game = copy.deepcopy(qq_game)
+    riot_game["sources"] = {"riotLolApi": {"gameId": 1, "platformId": "ESPORTSTMNT03"}}
+
+    merged_game = copy.deepcopy(qq_game)
+    merged_game["sources"].update(riot_game["sources"])
+
+    with GameStore(":memory:") as store:
+        store.upsert_games([qq_game, riot_game])
+        store.upsert_series({"games": [riot_game]}, key="riot:1")
+        assert len(store.find_games()) == 2
+
+        store.upsert_games([merged_game])
+
+        assert store.find_games() == [merged_game]
+        assert store.get_game("qq", qq_game["sources"]["qq"]["id"]) == merged_game
+        assert store.get_game("riotLolApi", "ESPORTSTMNT03/1") == merged_game
+        assert store.get_series("riot:1")["games"] == [merged_game]
+
+
+def test_merged_games_keep_the_sources_of_their_duplicates():
+    qq_game = payloads.qq_example_series()["games"][0]
+
+    riot_game = copy.deepcopy(qq_game)
+    riot_game["sources"] = {
+        "riotLolApi": {"gameId": 1, "platformId": "ESPORTSTMNT03"},
+        "leaguepedia": {"id": "LPL/2020 Season/Spring Season_Week 1_1_1"},
+    }
+
+    # The new game has the QQ and Riot sources, but not the Leaguepedia one only the Riot game had
+    game = copy.deepcopy(qq_game)
+    game["sources"]["riotLolApi"] = riot_game["sources"]["riotLolApi"]
+
+    with GameStore(":memory:") as store:
+        store.upsert_games([qq_game, riot_game])
+        store.upsert_games([game])
+
+        merged_game = {**game, "sources": {**riot_game["sources"], **game["sources"]}}
+
+        assert store.find_games() == [merged_game]
+        assert store.get_game("leaguepedia", riot_game["sources"]["leaguepedia"]["id"]) == merged_game
+
+        # Storing it again does not lose the merged sources
+        store.upsert_games([game])
+        assert store.find_games() == [merged_game]
+
+
+def test_series_without_score():
+    games = payloads.qq_example_series()["games"]
+
+    with GameStore(":memory:") as store:
+        store.upsert_series({"games": games}, key="live")
+
+        assert store.get_series("live") == {"games": games}
@@ -0,0 +1,78 @@
+import json
+
+import lol_esports_parser
+from lol_esports_parser import config
+from lol_esports_parser.parsers.incremental import SeriesState
+
+from benchmarks import payloads
+from benchmarks.stub_server import StubServer
+
+qq_match_url = f"http://lol.qq.com/match/match_data.shtml?bmid={payloads.qq_example_bmid}"
+match_list_path = f"/qq/match_list?bmid={payloads.qq_example_bmid}"
+
+
+def test_qq_series_refresh(qq_stub):
+    expected_series = lol_esports_parser.get_qq_series(qq_match_url, add_names=False)
+    match_list = json.loads(qq_stub.routes[match_list_path])
+
+    # Only the first game was played so far
+    qq_stub.routes[match_list_path] = json.dumps({"msg": match_list["msg"][:1]}).encode()
+
+    state = lol_esports_parser.refresh_qq_series(qq_match_url, add_names=False)
+    assert state.series["games"] == expected_series["games"][:1]
+
+    qq_stub.routes[match_list_path] = json.dumps(match_list).encode()
+
+    # States can be saved between polls as tokens
+    state = SeriesState.from_token(state.to_token())
+    state = lol_esports_parser.refresh_qq_series(qq_match_url, state, add_names=False)
+    assert state.series == expected_series
+    assert state.updated_keys == [g["sMatchId"] for g in match_list["msg"][1:]]
+    assert state.complete
+
+    # The series is over, so only the games list is queried
+    requests_count = qq_stub.requests_count
+    state = lol_esports_parser.refresh_qq_series(qq_match_url, state, add_names=False)
+
+    assert state.series == expected_series
+    assert state.updated_keys == []
+    assert qq_stub.requests_count == requests_count + 1
+
+
+def test_qq_series_refresh_with_etag(qq_stub):
+    with StubServer(qq_stub.routes, etags=True) as etag_stub:
+        config.set_endpoints(etag_stub.endpoints())
+
+        state = lol_esports_parser.refresh_qq_series(qq_match_url, add_names=False)
+        assert state.validators["etag"]
+
+        state = lol_esports_parser.refresh_qq_series(qq_match_url, state, add_names=False)
+        assert state.updated_keys == []
+        assert state.series == lol_esports_parser.get_qq_series(qq_match_url, add_names=False)
+
+
+def test_qq_series_refresh_retries_failed_games(qq_stub):
+    game_id = json.loads(qq_stub.routes[match_list_path])["msg"][-1]["sMatchId"]
+    game_info = qq_stub.routes.pop(f"/qq/match_info?p0={game_id}")
+
+    state = lol_esports_parser.refresh_qq_series(qq_match_url, add_names=False)
+    assert not state.complete
+
+    qq_stub.routes[f"/qq/match_info?p0={game_id}"] = game_info
+
+    state = lol_esports_parser.refresh_qq_series(qq_match_url, state, add_names=False)
+    assert state.updated_keys == [game_id]
+    assert state.complete
+
+
+def test_riot_series_refresh(acs):
+    games = payloads.riot_example_games()[:-1]
+    mh_urls = [payloads.riot_mh_url(game) for game in games]
+
+    series = lol_esports_parser.get_riot_series(mh_urls[:1], add_names=False, acs=acs)
+
+    # Refreshing from a LolSeries only parses the new games
+    state = lol_esports_parser.refresh_riot_series(mh_urls, series, add_names=False, acs=acs)
+
+    assert state.series["games"] == [payloads.expected_riot_game(game) for game in games]
+    assert len(state.updated_keys) == len(games) - 1
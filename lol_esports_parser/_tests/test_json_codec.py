@@ -0,0 +1,54 @@
+import importlib.util
+import io
+import json
+
+import pytest
+
+from lol_esports_parser import json_codec
+
+from benchmarks import payloads
+
+installed_backends = [name for name in json_codec.backends if importlib.util.find_spec(name)]
+
+
+@pytest.fixture(params=installed_backends)
+def backend(request):
+    json_codec.set_backend(request.param)
+    yield request.param
+    json_codec.set_backend()
+
+
+def test_round_trip(backend):
+    series = payloads.qq_example_series()
+    data = json_codec.dumps(series)
+
+    assert isinstance(data, bytes)
+    assert json_codec.loads(data) == series
+    assert json_codec.loads(data.decode("utf-8")) == series
+    assert json_codec.loads(json_codec.dumps(series, indent=True)) == series
+
+    # Non-ASCII team and player names are kept as they are
+    assert json_codec.dumps("皇族") == '"皇族"'.encode("utf-8")
+
+
+def test_write_series(backend):
+    series = payloads.qq_example_series()
+
+    file = io.BytesIO()
+    json_codec.write_series(series, file)
+
+    assert json.loads(file.getvalue()) == series
+
+
+def test_write_ndjson(backend):
+    items = payloads.qq_example_series()["games"]
+
+    file = io.BytesIO()
+    json_codec.write_ndjson(items, file)
+
+    assert [json.loads(line) for line in file.getvalue().splitlines()] == items
+
+
+def test_invalid_documents_raise_value_errors(backend):
+    with pytest.raises(ValueError):
+        json_codec.loads(b"")
@@ -0,0 +1,121 @@
+import copy
+
+import requests
+import riotwatcher
+
+import lol_esports_parser
+from lol_esports_parser.parsers.riot.live_poller import LiveGamePoller
+
+from benchmarks import payloads
+
+
+def api_error(status_code: int, headers: dict = None) -> riotwatcher.ApiError:
+    response = requests.Response()
+    response.status_code = status_code
+    response.headers.update(headers or {})
+
+    return riotwatcher.ApiError(response=response)
+
+
+class FakeMatchApi:
+    """Serves the example game timeline as it grows, one frame and its events at every query.
+    """
+
+    def __init__(self, game: dict):
+        self.match_dto = payloads.riot_match(game)
+        self.timeline = payloads.riot_match_timeline(game)
+
+        self.frames_count = 0
+        self.advance = True
+        self.errors = []
+        self.calls = []
+
+    @property
+    def over(self) -> bool:
+        return self.frames_count >= len(self.timeline["frames"])
+
+    def timeline_by_match(self, platform_id, game_id):
+        self.calls.append("timeline")
+        if self.errors:
+            raise self.errors.pop(0)
+
+        if self.advance:
+            self.frames_count = min(self.frames_count + 1, len(self.timeline["frames"]))
+        timeline = copy.deepcopy(self.timeline)
+        timeline["frames"] = timeline["frames"][: self.frames_count]
+
+        return timeline
+
+    def by_id(self, platform_id, game_id):
+        self.calls.append("match")
+        if not self.over:
+            raise api_error(404)
+
+        return copy.deepcopy(self.match_dto)
+
+
+class FakeLolWatcher:
+    def __init__(self, game: dict):
+        self.match = FakeMatchApi(game)
+
+
+def live_mh_url(game: dict) -> str:
+    return payloads.riot_mh_url(game).split("?")[0]
+
+
+def test_updates_are_timeline_deltas():
+    game = payloads.riot_example_games()[-1]
+    lol_watcher = FakeLolWatcher(game)
+
+    poller = LiveGamePoller(lol_watcher, interval=0)
+    poller.follow(live_mh_url(game))
+
+    updates = list(poller.run())
+
+    assert not poller.games
+
+    # The last update holds the game as get_riot_game returns it once over
+    over_lol_watcher = FakeLolWatcher(game)
+    over_lol_watcher.match.frames_count = len(over_lol_watcher.match.timeline["frames"])
+    assert updates[-1].game == lol_esports_parser.get_riot_game(
+        live_mh_url(game), get_timeline=True, lol_watcher=over_lol_watcher
+    )
+
+    # Every snapshot and kill is in exactly one delta
+    for side, team in updates[-1].game["teams"].items():
+        for index, player in enumerate(team["players"]):
+            snapshots = [s for u in updates for s in u.delta["teams"][side]["players"][index]["snapshots"]]
+            assert snapshots == player["snapshots"]
+
+    assert [kill for update in updates for kill in update.delta["kills"]] == updates[-1].game["kills"]
+
+
+def test_unchanged_timelines_are_skipped():
+    game = payloads.riot_example_games()[-1]
+    lol_watcher = FakeLolWatcher(game)
+
+    poller = LiveGamePoller(lol_watcher, interval=0)
+    poller.follow(live_mh_url(game))
+
+    # Two frames, the first one being complete
+    lol_watcher.match.frames_count = 1
+    assert len(poller.poll()) == 1
+
+    # The timeline did not change, so nothing is emitted and the match endpoint tells the game is still live
+    lol_watcher.match.advance = False
+    assert poller.poll() == []
+    assert lol_watcher.match.calls == ["timeline", "timeline", "match"]
+    assert poller.games == [live_mh_url(game)]
+
+
+def test_rate_limits_postpone_polls():
+    game = payloads.riot_example_games()[-1]
+    lol_watcher = FakeLolWatcher(game)
+    lol_watcher.match.errors.append(api_error(429, {"Retry-After": "60"}))
+
+    poller = LiveGamePoller(lol_watcher, interval=0)
+    poller.follow(live_mh_url(game))
+
+    assert poller.poll() == []
+    assert poller.poll() == []
+    assert lol_watcher.match.calls == ["timeline"]
@@ -0,0 +1,83 @@
+import asyncio
+import pickle
+
+import lol_esports_parser
+from lol_esports_parser.parsers import name_tables
+from lol_esports_parser.parsers.name_tables import NameTables
+
+from benchmarks import payloads
+
+
+def test_add_names():
+    games = payloads.riot_example_games()
+    tables = NameTables(payloads.example_name_tables(games))
+
+    for game in games:
+        assert tables.add_names(payloads.expected_riot_game(game)) == payloads.expected_riot_game(game, add_names=True)
+
+
+def test_no_object_has_no_name():
+    assert NameTables({"champion": {}}).get_name(-1, "champion") == ""
+
+
+def test_tables_are_shared(tmp_path):
+    tables = NameTables(payloads.example_name_tables(payloads.riot_example_games()))
+
+    assert pickle.loads(pickle.dumps(tables)).tables == tables.tables
+
+    tables.save(str(tmp_path / "names.json"))
+    assert NameTables().load(str(tmp_path / "names.json")).tables == tables.tables
+
+
+def test_riot_game_with_names(acs, monkeypatch):
+    games = payloads.riot_example_games()
+    monkeypatch.setattr(name_tables.default_name_tables, "_tables", payloads.example_name_tables(games))
+
+    riot_game = lol_esports_parser.get_riot_game(payloads.riot_mh_url(games[-1]), add_names=True, acs=acs)
+
+    assert riot_game == payloads.expected_riot_game(games[-1], add_names=True)
+
+
+def test_qq_series_with_names(qq_stub, monkeypatch):
+    series = payloads.qq_example_series()
+    monkeypatch.setattr(name_tables.default_name_tables, "_tables", payloads.example_name_tables(series["games"]))
+
+    match_url = f"http://lol.qq.com/match/match_data.shtml?bmid={payloads.qq_example_bmid}"
+
+    assert lol_esports_parser.get_qq_series(match_url)["games"] == [
+        payloads.expected_qq_game(game, add_names=True) for game in series["games"]
+    ]
+
+
+def test_qq_series_with_empty_tables(qq_stub, lol_id_tools_stub, monkeypatch):
+    # Tables are built from lol_id_tools and missing names looked up while the I/O stage event loop runs
+    from lol_id_tools.lol_id_tools import lod
+
+    series = payloads.qq_example_series()
+    missing_champion = series["games"][0]["teams"]["BLUE"]["players"][0]["championId"]
+    load_locale = lod.load_locale
+
+    async def load_locale_missing_champion(locale, latest_version=None):
+        await load_locale(locale, latest_version)
+
+        # Only the first load misses the champion, so looking it up reloads lol_id_tools data
+        if len(lol_id_tools_stub) == 1:
+            del lod.loaded_data[locale][missing_champion]["champion"]
+
+    monkeypatch.setattr(lod, "load_locale", load_locale_missing_champion)
+    match_url = f"http://lol.qq.com/match/match_data.shtml?bmid={payloads.qq_example_bmid}"
+
+    assert lol_esports_parser.get_qq_series(match_url)["games"] == [
+        payloads.expected_qq_game(game, add_names=True) for game in series["games"]
+    ]
+
+    assert lol_id_tools_stub == ["en_US", "en_US"]
+
+
+def test_name_lookup_from_event_loop(lol_id_tools_stub):
+    player = payloads.qq_example_series()["games"][0]["teams"]["BLUE"]["players"][0]
+
+    async def get_champion_name():
+        return name_tables.default_name_tables.get_name(player["championId"], "champion")
+
+    assert asyncio.run(get_champion_name()) == player["championName"]
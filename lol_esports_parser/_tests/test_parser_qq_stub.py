@@ -0,0 +1,102 @@
+import asyncio
+import time
+
+import pytest
+
+import lol_esports_parser
+from lol_esports_parser.parsers.http_client import HttpClient, HttpRequestError, HttpResponse, HttpStatusError
+from lol_esports_parser.parsers.qq import qq_access
+from lol_esports_parser.parsers.rate_limiter import RateLimiter
+from lol_esports_parser.parsers.retry_policy import RetryPolicy
+from lol_esports_parser.parsers.rune_tree_handler import RuneTreeHandler
+
+from benchmarks import payloads
+
+
+def test_qq_series_from_stub(qq_stub):
+    match_url = f"http://lol.qq.com/match/match_data.shtml?bmid={payloads.qq_example_bmid}"
+
+    series = lol_esports_parser.get_qq_series(match_url, add_names=False)
+
+    expected_series = payloads.qq_example_series()
+
+    assert series["winner"] == expected_series["winner"]
+    assert series["score"] == expected_series["score"]
+    assert series["games"] == [payloads.expected_qq_game(game) for game in expected_series["games"]]
+
+
+def test_qq_series_is_read_from_cache(qq_stub):
+    match_url = f"http://lol.qq.com/match/match_data.shtml?bmid={payloads.qq_example_bmid}"
+
+    first_series = lol_esports_parser.get_qq_series(match_url, add_names=False)
+    requests_count = qq_stub.requests_count
+
+    assert lol_esports_parser.get_qq_series(match_url, add_names=False) == first_series
+    assert qq_stub.requests_count == requests_count
+
+
+def test_qq_series_with_rune_trees(qq_stub, tmp_path):
+    match_url = f"http://lol.qq.com/match/match_data.shtml?bmid={payloads.qq_example_bmid}"
+    rune_tree_handler = RuneTreeHandler(static_data_folder=str(tmp_path / "static_data"))
+
+    series = lol_esports_parser.get_qq_series(match_url, "10.7", add_names=False, rune_tree_handler=rune_tree_handler)
+
+    expected_series = payloads.qq_example_series()
+
+    assert series["games"] == [payloads.expected_qq_game(game, patch="10.7") for game in expected_series["games"]]
+
+
+def test_qq_errors_are_not_cached(qq_stub, tmp_path, monkeypatch):
+    monkeypatch.setattr(qq_access.retry_policy, "attempts", 1)
+
+    async def get_game_info(qq_game_id):
+        async with HttpClient() as client:
+            return await qq_access.get_basic_qq_game_info(client, qq_game_id)
+
+    # The stub answers a 404 with a JSON message for unknown games
+    with pytest.raises(HttpRequestError):
+        asyncio.run(get_game_info(1))
+
+    # QQ also answers errors as messages with a 200 status
+    qq_stub.routes["/qq/match_info?p0=2"] = b'{"msg": "not found"}'
+    with pytest.raises(FileNotFoundError):
+        asyncio.run(get_game_info(2))
+
+    assert not list(tmp_path.rglob("*.zlib"))
+
+
+class ScriptedClient:
+    """Answers the given responses in order, then the payload.
+    """
+
+    def __init__(self, *responses: HttpResponse):
+        self.responses = list(responses)
+        self.calls = []
+
+    async def get(self, url, headers=None):
+        self.calls.append(time.monotonic())
+        return self.responses.pop(0) if self.responses else HttpResponse(200, {}, b'{"msg": {}}')
+
+
+def test_qq_server_errors_are_retried(qq_stub, monkeypatch):
+    # The stub is only used for the endpoints, responses coming from the scripted client
+    monkeypatch.setattr(qq_access, "retry_policy", RetryPolicy(attempts=3, backoff=0.01, jitter=0))
+    monkeypatch.setattr(qq_access, "rate_limiter", RateLimiter({"host": "100:1"}, state_location=None))
+
+    # A 503 is retried after the backoff, and a 429 once its Retry-After is over
+    client = ScriptedClient(HttpResponse(503, {}, b""), HttpResponse(429, {"Retry-After": "0.2"}, b""))
+    assert asyncio.run(qq_access.get_basic_qq_game_info(client, 1)) == {}
+    assert len(client.calls) == 3
+    assert client.calls[2] - client.calls[1] >= 0.15
+
+    # The error is raised once all attempts failed
+    client = ScriptedClient(*[HttpResponse(503, {}, b"")] * 3)
+    with pytest.raises(HttpStatusError):
+        asyncio.run(qq_access.get_basic_qq_game_info(client, 2))
+    assert len(client.calls) == 3
+
+    # Other errors would fail again and are not retried
+    client = ScriptedClient(HttpResponse(404, {}, b'{"msg": "not found"}'))
+    with pytest.raises(HttpRequestError):
+        asyncio.run(qq_access.get_basic_qq_game_info(client, 3))
+    assert len(client.calls) == 1
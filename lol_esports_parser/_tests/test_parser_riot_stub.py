@@ -0,0 +1,70 @@
+import pytest
+
+import lol_esports_parser
+from lol_esports_parser import config
+from lol_esports_parser.parsers.response_cache import response_cache
+
+from benchmarks import payloads
+from benchmarks.stub_server import StubServer
+
+
+def test_riot_game_from_stub(acs):
+    game = payloads.riot_example_games()[-1]
+
+    assert lol_esports_parser.get_riot_game(payloads.riot_mh_url(game), acs=acs) == payloads.expected_riot_game(game)
+
+
+def test_riot_game_with_timeline_from_stub(acs):
+    game = payloads.riot_example_games()[-1]
+
+    riot_game = lol_esports_parser.get_riot_game(payloads.riot_mh_url(game), get_timeline=True, acs=acs)
+
+    assert riot_game == payloads.expected_riot_game(game, get_timeline=True)
+
+
+def test_riot_game_with_timeline_frames_from_stub(acs):
+    numpy = pytest.importorskip("numpy")
+    from lol_esports_parser.dto.timeline_frames import TimelineFrames
+
+    game = payloads.riot_example_games()[-1]
+
+    riot_game, frames = lol_esports_parser.get_riot_game(
+        payloads.riot_mh_url(game), get_timeline=True, acs=acs, timeline_frames=True
+    )
+
+    # Events are merged in the game, while snapshots only are in the frames
+    expected_game = payloads.expected_riot_game(game, get_timeline=True)
+    expected_frames = TimelineFrames.from_game(expected_game)
+    for team in expected_game["teams"].values():
+        for player in team["players"]:
+            del player["snapshots"]
+
+    assert riot_game["kills"]
+    assert riot_game == expected_game
+
+    numpy.testing.assert_array_equal(frames.timestamps, expected_frames.timestamps)
+    numpy.testing.assert_array_equal(frames.values, expected_frames.values)
+
+
+def test_riot_series_from_stub(acs):
+    games = payloads.riot_example_games()[:-1]
+
+    mh_urls = [payloads.riot_mh_url(game) for game in games]
+
+    series = lol_esports_parser.get_riot_series(mh_urls, add_names=False, acs=acs)
+
+    assert series["games"] == [payloads.expected_riot_game(game) for game in games]
+
+
+def test_server_errors_are_retried(qq_stub, monkeypatch):
+    monkeypatch.setattr(response_cache, "enabled", False)
+
+    match_url = f"http://lol.qq.com/match/match_data.shtml?bmid={payloads.qq_example_bmid}"
+    expected_series = lol_esports_parser.get_qq_series(match_url, add_names=False)
+
+    # A fifth of the QQ queries answer a 503, which only goes through if server errors are retried
+    with StubServer(qq_stub.routes, error_rate=0.2, seed=0) as flaky_stub:
+        config.set_endpoints(flaky_stub.endpoints())
+
+        assert lol_esports_parser.get_qq_series(match_url, add_names=False) == expected_series
+        assert flaky_stub.errors_count > 0
@@ -0,0 +1,62 @@
+import copy
+import json
+import subprocess
+import sys
+
+from lol_esports_parser.parsers.qq.qq_parser import parse_qq_datetime, transform_qq_game
+
+from benchmarks import payloads
+
+
+def transform(raw_game, game):
+    return transform_qq_game(
+        raw_game["game_id"],
+        raw_game["game_info"],
+        raw_game["team_info"],
+        raw_game["runes_info"],
+        game["sources"]["qq"]["serverId"],
+        game["sources"]["qq"]["battleId"],
+        add_names=False,
+    )
+
+
+def test_transform_qq_game():
+    games = payloads.qq_example_series()["games"]
+
+    for raw_game, game in zip(payloads.qq_example_raw_games(), games):
+        assert transform(raw_game, game) == payloads.expected_qq_game(game)
+
+
+def test_transform_shuffled_payloads():
+    # Players are matched on names and champions, not on their positions in the payloads
+    game = payloads.qq_example_series()["games"][0]
+    raw_game = payloads.qq_example_raw_games()[0]
+
+    shuffled_game = copy.deepcopy(raw_game)
+    shuffled_game["game_info"]["sMatchMember"].reverse()
+    shuffled_game["runes_info"].reverse()
+
+    battle_data = json.loads(shuffled_game["game_info"]["battleInfo"]["BattleData"])
+    battle_data["left"]["players"].reverse()
+    battle_data["right"]["players"].reverse()
+    shuffled_game["game_info"]["battleInfo"]["BattleData"] = json.dumps(battle_data)
+
+    expected_game = payloads.expected_qq_game(game)
+    for team in expected_game["teams"].values():
+        team["players"].reverse()
+
+    assert transform(shuffled_game, game) == expected_game
+
+
+def test_parse_qq_datetime():
+    assert parse_qq_datetime("2020-03-28", "17:10:58.0000").isoformat() == "2020-03-28T17:10:58+08:00"
+
+    # Unexpected formats go through dateparser
+    assert parse_qq_datetime("2020/3/28", "7:10:58").isoformat() == "2020-03-28T07:10:58+08:00"
+
+
+def test_qq_parser_does_not_import_dateparser():
+    code = "import sys, lol_esports_parser.parsers.qq.qq_parser; print('dateparser' in sys.modules)"
+    output = subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True).stdout
+
+    assert output.strip() == "False"
@@ -0,0 +1,61 @@
+import asyncio
+import time
+
+from lol_esports_parser.parsers.rate_limiter import Limit, RateLimiter, parse_limits, retry_after
+from lol_esports_parser.parsers.riot.riot_api_rate_limiter import RiotApiRateLimiter
+
+
+def test_limits_are_never_exceeded():
+    limiter = RateLimiter({"host": "10:0.2,15:0.5"}, state_location=None, burst=0.3)
+    bucket = ("host", "example.com")
+
+    timestamps = []
+    for _ in range(40):
+        limiter.acquire(bucket)
+        timestamps.append(time.monotonic())
+
+    for limit in parse_limits("10:0.2,15:0.5"):
+        for index, start in enumerate(timestamps):
+            assert sum(start <= t < start + limit.seconds for t in timestamps[index:]) <= limit.requests
+
+    # Buckets without limits are never waited on
+    assert limiter.acquire(("host", "unlimited.com"), ("acs", "account")) == 0
+
+
+def test_buckets_are_shared_through_the_state_file(tmp_path):
+    location = str(tmp_path / "rate_limits.json")
+    first_limiter = RateLimiter({"acs": [Limit(2, 60)]}, state_location=location, burst=0.5)
+    second_limiter = RateLimiter({"acs": [Limit(2, 60)]}, state_location=location, burst=0.5)
+
+    assert first_limiter.try_acquire(("acs", "account")) == 0
+    assert second_limiter.try_acquire(("acs", "account")) > 0
+    assert second_limiter.try_acquire(("acs", "other_account")) == 0
+
+
+def test_block(tmp_path):
+    limiter = RateLimiter({"host": "100:1"}, state_location=str(tmp_path / "rate_limits.json"))
+    bucket = ("host", "example.com")
+
+    limiter.block(retry_after({"Retry-After": "0.2"}), bucket)
+    assert 0.1 < limiter.try_acquire(bucket) <= 0.2
+
+    waited = asyncio.run(limiter.acquire_async(bucket))
+    assert 0.1 < waited < 0.5
+
+    assert retry_after({}, default=3) == 3
+
+
+def test_riot_api_rate_limiter(tmp_path):
+    limiter = RateLimiter(
+        {"riot_api": "2:60", "riot_api_method": "100:1"}, state_location=str(tmp_path / "rate_limits.json")
+    )
+    riot_api_limiter = RiotApiRateLimiter("RGAPI-key", limiter)
+
+    assert riot_api_limiter.wait_until("EUW1", "MatchApiV4", "by_id") is None
+
+    # The app limit is shared by all the methods of the region and key
+    assert limiter.try_acquire(("riot_api", f"EUW1/{riot_api_limiter.key_id}")) > 0
+    assert limiter.try_acquire(("riot_api", f"KR/{riot_api_limiter.key_id}")) == 0
+
+    riot_api_limiter.record_response("KR", "MatchApiV4", "by_id", 429, {"Retry-After": "10"})
+    assert limiter.try_acquire(("riot_api", f"KR/{riot_api_limiter.key_id}")) > 9
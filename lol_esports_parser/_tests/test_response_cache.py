@@ -0,0 +1,110 @@
+import asyncio
+import json
+import os
+import time
+
+import pytest
+
+from lol_esports_parser.parsers.response_cache import ResponseCache
+
+
+def test_fetch_hits_after_first_query(tmp_path):
+    cache = ResponseCache(str(tmp_path))
+    queries = []
+
+    async def query():
+        queries.append(1)
+        return b'{"msg": {"sMatchId": "7802"}}'
+
+    for _ in range(3):
+        result = asyncio.run(cache.fetch("qq_match_info", (7802,), query, lambda p: json.loads(p)["msg"]))
+        assert result == {"sMatchId": "7802"}
+
+    assert len(queries) == 1
+    assert cache.stats()["hits"] == {"qq_match_info": 2}
+    assert cache.stats()["misses"] == {"qq_match_info": 1}
+
+
+def test_faulty_payloads_are_not_cached(tmp_path):
+    cache = ResponseCache(str(tmp_path))
+
+    async def query():
+        return b'{"msg": "error"}'
+
+    with pytest.raises(TypeError):
+        asyncio.run(cache.fetch("qq_match_info", (1,), query, lambda p: json.loads(p)["msg"]["sMatchInfo"]))
+
+    assert cache.get("qq_match_info", (1,)) is None
+
+
+def test_ttl_expiration(tmp_path):
+    cache = ResponseCache(str(tmp_path), ttl={"qq_match_list": 60})
+
+    cache.set("qq_match_list", (6131,), b"[]")
+    cache.set("acs_game", ("ESPORTSTMNT03", 1353193, "63e4e6e5d695f410"), b"{}")
+
+    old = time.time() - 3600
+    for root, _, files in os.walk(tmp_path):
+        for file_name in files:
+            os.utime(os.path.join(root, file_name), (old, old))
+
+    assert cache.get("qq_match_list", (6131,)) is None
+    assert cache.get("acs_game", ("ESPORTSTMNT03", 1353193, "63e4e6e5d695f410")) == b"{}"
+
+
+def test_size_bounded_eviction(tmp_path):
+    cache = ResponseCache(str(tmp_path), max_size=10_000, compression_level=0)
+
+    for game_id in range(20):
+        cache.set("acs_game", ("ESPORTSTMNT03", game_id), os.urandom(1_000))
+        # Reading the first entry makes it the most recently used one
+        assert cache.get("acs_game", ("ESPORTSTMNT03", 0)) is not None
+
+    assert cache.evictions > 0
+    assert cache._compute_size() <= 10_000
+    assert cache.get("acs_game", ("ESPORTSTMNT03", 1)) is None
+
+
+def test_concurrent_fetches_share_one_query(tmp_path):
+    cache = ResponseCache(str(tmp_path), enabled=False)
+    queries = []
+
+    async def query():
+        queries.append(1)
+        await asyncio.sleep(0.05)
+        return b'{"msg": {"sMatchId": "7802"}}'
+
+    async def fetch_all():
+        return await asyncio.gather(
+            *(cache.fetch("qq_match_info", (7802,), query, lambda p: json.loads(p)["msg"]) for _ in range(5))
+        )
+
+    assert asyncio.run(fetch_all()) == [{"sMatchId": "7802"}] * 5
+    assert len(queries) == 1
+    assert cache.stats()["coalesced"] == {"qq_match_info": 4}
+
+    # Once the query is over, the next fetch queries again as the cache is disabled
+    asyncio.run(fetch_all())
+    assert len(queries) == 2
+
+
+def test_refreshing_fetches_do_not_join_cached_ones(tmp_path):
+    cache = ResponseCache(str(tmp_path))
+    queries = []
+
+    async def query():
+        queries.append(1)
+        await asyncio.sleep(0.05)
+        return b'{"msg": []}'
+
+    async def refreshing_fetch():
+        with cache.refreshing():
+            return await cache.fetch("qq_match_list", (6131,), query, lambda p: json.loads(p)["msg"])
+
+    async def fetch_both():
+        return await asyncio.gather(
+            cache.fetch("qq_match_list", (6131,), query, lambda p: json.loads(p)["msg"]), refreshing_fetch()
+        )
+
+    asyncio.run(fetch_both())
+    assert len(queries) == 2
@@ -0,0 +1,58 @@
+import asyncio
+
+import pytest
+
+from lol_esports_parser.parsers.retry_policy import RetryPolicy
+
+
+class FlakyEndpoint:
+    def __init__(self, delays, failures=0):
+        self.delays = list(delays)
+        self.failures = failures
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.delays.pop(0) if self.delays else 0)
+
+        if self.calls <= self.failures:
+            raise TypeError
+
+        return self.calls
+
+
+def test_retry_with_backoff():
+    retry_policy = RetryPolicy(attempts=3, backoff=0.01)
+    endpoint = FlakyEndpoint([], failures=2)
+
+    assert asyncio.run(retry_policy.call(endpoint, retry_on=(TypeError,))) == 3
+
+    with pytest.raises(TypeError):
+        asyncio.run(retry_policy.call(FlakyEndpoint([], failures=3), retry_on=(TypeError,)))
+
+
+def test_backoff_delay():
+    retry_policy = RetryPolicy(backoff=1, max_backoff=5, jitter=0.5)
+
+    assert 0.5 <= retry_policy.backoff_delay(1) <= 1
+    assert 2 <= retry_policy.backoff_delay(3) <= 4
+    assert 2.5 <= retry_policy.backoff_delay(10) <= 5
+
+
+def test_request_deadline():
+    retry_policy = RetryPolicy(attempts=2, backoff=0.01, timeout=0.05)
+    endpoint = FlakyEndpoint([1, 0])
+
+    # The first request is abandoned at its deadline and the second one succeeds
+    assert asyncio.run(retry_policy.call(lambda: retry_policy.request(endpoint))) == 2
+
+
+def test_hedged_request():
+    retry_policy = RetryPolicy(timeout=1, hedge_percentile=90, hedge_min_samples=5)
+    retry_policy.latencies.extend([0.01] * 5)
+
+    # The first request stalls, so the hedged one answers first
+    endpoint = FlakyEndpoint([0.5, 0])
+
+    assert asyncio.run(retry_policy.request(endpoint)) == 2
+    assert retry_policy.hedges == 1
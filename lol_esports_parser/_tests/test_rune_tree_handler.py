@@ -0,0 +1,56 @@
+from concurrent.futures.thread import ThreadPoolExecutor
+
+import pytest
+
+from lol_esports_parser.parsers.rune_tree_handler import RuneTreeHandler
+
+from benchmarks import payloads
+from benchmarks.stub_server import StubServer
+
+
+@pytest.fixture
+def stub():
+    with StubServer(payloads.ddragon_routes(("10.7", "10.6"))) as stub:
+        yield stub
+
+
+def test_get_tree(stub, tmp_path):
+    handler = RuneTreeHandler(f"{stub.url}/ddragon", str(tmp_path))
+
+    runes = [{"id": rune_id} for rune_id in (8437, 8446, 8473, 8451, 8304, 8345)]
+
+    assert handler.get_version("10.7") == "10.7.1"
+    assert handler.get_primary_tree(runes, "10.7") == (8400, "Resolve")
+    assert handler.get_secondary_tree(runes, "10.7") == (8300, "Inspiration")
+
+
+def test_static_data_is_persisted(stub, tmp_path):
+    RuneTreeHandler(f"{stub.url}/ddragon", str(tmp_path)).prefetch(["10.7", "10.6"])
+    requests_count = stub.requests_count
+
+    # A new handler, as in a new process, reads everything from the static data folder
+    handler = RuneTreeHandler(f"{stub.url}/ddragon", str(tmp_path))
+
+    assert handler.get_tree({"id": 8437}, "10.6") == (8400, "Resolve")
+    assert handler.get_tree({"id": 8437}, "10.7") == (8400, "Resolve")
+    assert stub.requests_count == requests_count
+
+
+def test_unknown_patch(stub, tmp_path):
+    handler = RuneTreeHandler(f"{stub.url}/ddragon", str(tmp_path))
+
+    with pytest.raises(KeyError):
+        handler.get_version("9.1")
+
+
+def test_concurrent_loads_share_one_download(tmp_path):
+    with StubServer(payloads.ddragon_routes(("10.7",)), latency=0.05) as stub:
+        handler = RuneTreeHandler(f"{stub.url}/ddragon", str(tmp_path))
+        handler.get_version("10.7")
+
+        with ThreadPoolExecutor(8) as executor:
+            results = list(executor.map(lambda _: handler.get_tree({"id": 8437}, "10.7"), range(8)))
+
+        assert results == [(8400, "Resolve")] * 8
+        # The versions list then a single runesReforged.json
+        assert stub.requests_count == 2
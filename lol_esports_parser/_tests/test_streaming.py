@@ -0,0 +1,63 @@
+import asyncio
+import json
+import time
+
+from lol_esports_parser import cli
+from lol_esports_parser.dto.series_dto import create_series
+from lol_esports_parser.parsers.qq.qq_parser import stream_qq_series
+from lol_esports_parser.parsers.streaming import iterate_sync
+
+from benchmarks import payloads
+
+match_url = f"http://lol.qq.com/match/match_data.shtml?bmid={payloads.qq_example_bmid}"
+
+
+def test_stream_qq_series(qq_stub):
+    items = list(stream_qq_series(match_url, add_names=False))
+
+    expected_series = payloads.qq_example_series()
+    expected_games = [payloads.expected_qq_game(game) for game in expected_series["games"]]
+
+    # Games come in order of completion and the summary comes last
+    assert sorted(items[:-1], key=lambda game: game["start"]) == expected_games
+    assert items[-1] == {"score": expected_series["score"], "winner": expected_series["winner"]}
+
+
+def test_summary_matches_create_series(qq_stub):
+    items = list(stream_qq_series(match_url, add_names=False))
+    series = create_series(sorted(items[:-1], key=lambda game: game["start"]))
+
+    assert items[-1] == {"score": series["score"], "winner": series["winner"]}
+
+
+def test_cli_ndjson(qq_stub, capsys):
+    cli.main(["qq", match_url, "--no-names"])
+
+    lines = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+
+    assert len(lines) == len(payloads.qq_example_series()["games"]) + 1
+    assert "winner" in lines[-1]
+
+
+def test_close_while_waiting_for_next_item():
+    cancelled = []
+
+    async def slow_iterator():
+        yield 1
+
+        try:
+            await asyncio.sleep(60)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+        yield 2
+
+    items = iterate_sync(slow_iterator)
+    assert next(items) == 1
+
+    start = time.monotonic()
+    items.close()
+
+    assert time.monotonic() - start < 5
+    assert cancelled
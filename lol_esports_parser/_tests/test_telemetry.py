@@ -0,0 +1,115 @@
+import asyncio
+import socket
+from collections import Counter
+
+import pytest
+
+import lol_esports_parser
+from lol_esports_parser.parsers import telemetry
+from lol_esports_parser.parsers.retry_policy import RetryPolicy
+
+from benchmarks import payloads
+
+
+class RecordingSink(telemetry.MetricsSink):
+    def __init__(self):
+        self.requests = []
+        self.events = Counter()
+
+    def observe_request(self, endpoint, duration, status, size):
+        self.requests.append((endpoint, status, size))
+
+    def increment(self, endpoint, event):
+        self.events[endpoint, event] += 1
+
+
+@pytest.fixture
+def sink():
+    recording_sink = RecordingSink()
+    telemetry.set_metrics_sink(recording_sink)
+
+    yield recording_sink
+
+    telemetry.set_metrics_sink(None)
+
+
+def test_qq_series_telemetry(qq_stub, sink):
+    match_url = f"http://lol.qq.com/match/match_data.shtml?bmid={payloads.qq_example_bmid}"
+    games_count = len(payloads.qq_example_series()["games"])
+
+    lol_esports_parser.get_qq_series(match_url, add_names=False)
+
+    endpoints = Counter(endpoint for endpoint, _, _ in sink.requests)
+    assert endpoints == {
+        "qq_match_list": 1,
+        "qq_match_info": games_count,
+        "qq_battle_info": games_count,
+        "qq_runes": games_count,
+    }
+    assert all(status == 200 and size > 0 for _, status, size in sink.requests)
+    assert sink.events["qq_match_info", "cache_miss"] == games_count
+
+    lol_esports_parser.get_qq_series(match_url, add_names=False)
+
+    assert len(sink.requests) == sum(endpoints.values())
+    assert sink.events["qq_match_info", "cache_hit"] == games_count
+
+
+def test_retries_are_counted(sink):
+    calls = []
+
+    async def flaky():
+        calls.append(None)
+        if len(calls) == 1:
+            raise asyncio.TimeoutError
+
+        return "ok"
+
+    assert asyncio.run(RetryPolicy(backoff=0).call(flaky, endpoint="acs_game")) == "ok"
+    assert sink.events == {("acs_game", "retry"): 1}
+
+
+def test_statsd_sink():
+    server = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    server.bind(("127.0.0.1", 0))
+    server.settimeout(5)
+
+    statsd_sink = telemetry.StatsdSink(*server.getsockname(), prefix="test")
+
+    statsd_sink.observe_request("qq_runes", 0.25, 200, 1024)
+    assert server.recv(1024).decode().splitlines() == [
+        "test.qq_runes.request:250.000|ms",
+        "test.qq_runes.status.200:1|c",
+        "test.qq_runes.bytes:1024|c",
+    ]
+
+    statsd_sink.increment("qq_runes", "cache_hit")
+    assert server.recv(1024) == b"test.qq_runes.cache_hit:1|c"
+
+    server.close()
+
+
+def test_prometheus_sink():
+    prometheus_client = pytest.importorskip("prometheus_client")
+
+    registry = prometheus_client.CollectorRegistry()
+    prometheus_sink = telemetry.PrometheusSink(namespace="test", registry=registry, buckets=(0.1, 1))
+
+    prometheus_sink.observe_request("qq_runes", 0.25, 200, 1024)
+    prometheus_sink.observe_request("qq_runes", 0.05, None, 0)
+    prometheus_sink.increment("qq_runes", "cache_hit")
+    prometheus_sink.increment("host", "throttled")
+
+    def sample(name, **labels):
+        return registry.get_sample_value(name, labels)
+
+    assert sample("test_request_duration_seconds_count", endpoint="qq_runes", status="200") == 1
+    assert sample("test_request_duration_seconds_sum", endpoint="qq_runes", status="200") == 0.25
+    assert sample("test_request_duration_seconds_bucket", endpoint="qq_runes", status="200", le="0.1") == 0
+    assert sample("test_request_duration_seconds_bucket", endpoint="qq_runes", status="200", le="1.0") == 1
+    assert sample("test_request_duration_seconds_bucket", endpoint="qq_runes", status="error", le="0.1") == 1
+
+    assert sample("test_response_bytes_total", endpoint="qq_runes") == 1024
+
+    assert sample("test_events_total", endpoint="qq_runes", event="cache_hit") == 1
+    assert sample("test_events_total", endpoint="host", event="throttled") == 1
@@ -0,0 +1,83 @@
+import json
+import os
+
+import pytest
+
+numpy = pytest.importorskip("numpy")
+
+from lol_esports_parser.dto.timeline_frames import TimelineFrames  # noqa: E402
+
+examples_folder = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "json_examples")
+
+
+@pytest.fixture
+def game():
+    with open(os.path.join(examples_folder, "lck_game.json")) as file:
+        return json.load(file)
+
+
+def match_timeline(game):
+    # Rebuilds the raw MatchTimelineDto frames riot_transmute created the snapshots from
+    frames = {}
+    for team in game["teams"].values():
+        for player in team["players"]:
+            for snapshot in player["snapshots"]:
+                frame = frames.setdefault(snapshot["timestamp"], {"timestamp": int(snapshot["timestamp"] * 1000)})
+                frame.setdefault("participantFrames", {})[str(player["id"])] = {
+                    "participantId": player["id"],
+                    "position": snapshot["position"],
+                    "currentGold": snapshot["currentGold"],
+                    "totalGold": snapshot["totalGold"],
+                    "level": snapshot["level"],
+                    "xp": snapshot["xp"],
+                    "minionsKilled": snapshot["cs"] - snapshot["monstersKilled"],
+                    "jungleMinionsKilled": snapshot["monstersKilled"],
+                }
+
+    return {"frames": [frames[timestamp] for timestamp in sorted(frames)]}
+
+
+def test_from_match_timeline_matches_snapshots(game):
+    frames = TimelineFrames.from_match_timeline(match_timeline(game))
+    game_frames = TimelineFrames.from_game(game)
+
+    numpy.testing.assert_array_equal(frames.timestamps, game_frames.timestamps)
+    numpy.testing.assert_array_equal(frames.values, game_frames.values)
+
+
+def test_features(game):
+    frames = TimelineFrames.from_game(game)
+    players = {p["id"]: p for team in game["teams"].values() for p in team["players"]}
+
+    def gold_at_10(participant_id):
+        return next(s["totalGold"] for s in players[participant_id]["snapshots"] if s["timestamp"] == 600)
+
+    features = frames.features(minutes=(10,))
+
+    assert features["totalGoldDiffAt10"][0] == gold_at_10(1) - gold_at_10(6)
+    assert features["totalGoldDiffAt10"][5] == gold_at_10(6) - gold_at_10(1)
+    assert features["teamTotalGoldDiffAt10"] == sum(gold_at_10(i) for i in range(1, 6)) - sum(
+        gold_at_10(i) for i in range(6, 11)
+    )
+
+
+def test_live_frames_are_snapped_to_their_minute(game):
+    timeline = match_timeline(game)
+
+    # Live servers write frames a few milliseconds after their minute
+    for frame in timeline["frames"]:
+        frame["timestamp"] += 17
+
+    frames = TimelineFrames.from_match_timeline(timeline)
+
+    assert frames.timestamps[frames.frame_index(10)] == pytest.approx(600.017)
+    assert frames.frame_index(10.5) == frames.frame_index(10)
+
+
+def test_default_features_are_computed_once(game):
+    frames = TimelineFrames.from_match_timeline(match_timeline(game))
+
+    # Computed while parsing, then shared by every call
+    assert frames._features
+    assert frames.features() is frames.features()
+    assert frames.features(minutes=(10,)) is not frames.features()
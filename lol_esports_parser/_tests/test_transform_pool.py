@@ -0,0 +1,45 @@
+import asyncio
+
+import lol_esports_parser
+from lol_esports_parser.parsers.riot.riot_parser import get_riot_game_async
+from lol_esports_parser.parsers.transform_pool import TransformPool
+
+from benchmarks import payloads
+
+match_url = f"http://lol.qq.com/match/match_data.shtml?bmid={payloads.qq_example_bmid}"
+
+
+def test_bulk_with_transform_processes(qq_stub):
+    results = list(lol_esports_parser.get_series_bulk([match_url] * 3, add_names=False, transform_processes=2))
+
+    assert len(results) == 3
+    for result in results:
+        assert not result.errors
+        assert result.series == lol_esports_parser.get_qq_series(match_url, add_names=False)
+
+
+def test_riot_game_in_transform_pool(acs):
+    game = payloads.riot_example_games()[-1]
+
+    async def get_game():
+        # A single slot makes the transforms wait for each other
+        with TransformPool(1, max_pending=1, add_names=False) as transform_pool:
+            return await asyncio.gather(
+                *(
+                    get_riot_game_async(payloads.riot_mh_url(game), True, acs=acs, transform_pool=transform_pool)
+                    for _ in range(2)
+                )
+            )
+
+    assert asyncio.run(get_game()) == [payloads.expected_riot_game(game, get_timeline=True)] * 2
+
+
+def test_bulk_with_names_in_transform_processes(qq_stub, lol_id_tools_stub):
+    # Tables are built from empty in the parent while its event loop runs, then sent to the workers
+    results = list(lol_esports_parser.get_series_bulk([match_url], transform_processes=2))
+
+    assert not results[0].errors
+    assert results[0].series["games"] == [
+        payloads.expected_qq_game(game, add_names=True) for game in payloads.qq_example_series()["games"]
+    ]
+    assert lol_id_tools_stub == ["en_US"]
@@ -0,0 +1,538 @@
+import asyncio
+import contextlib
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+import urllib.parse
+from concurrent.futures.thread import ThreadPoolExecutor
+from typing import Callable, Iterable, List, NamedTuple, Optional, TypeVar, Union
+
+from lol_esports_parser.dto.series_dto import create_series
+from lol_esports_parser.game_store import GameStore, source_keys
+from lol_esports_parser.parsers.bulk import QQSeriesJob, RiotSeriesJob, to_job
+from lol_esports_parser.parsers.http_client import HttpClient, ensure_client, run_sync
+from lol_esports_parser.parsers.qq.qq_access import get_qq_games_list
+from lol_esports_parser.parsers.qq.qq_parser import parse_qq_game_async
+from lol_esports_parser.parsers.retry_policy import RetryPolicy
+from lol_esports_parser.parsers.riot.acs_access import ACS
+from lol_esports_parser.parsers.riot.riot_parser import get_riot_game_async
+from lol_esports_parser.parsers.transform_pool import TransformPool
+
+T = TypeVar("T")
+
+# Series are pending until their games are listed, then listed until all their games are done or failed, and then
+# done or failed themselves
+# Games are pending, including while waiting for a retry, then done or failed after their last attempt
+_schema = """
+CREATE TABLE IF NOT EXISTS series (
+    key TEXT PRIMARY KEY,
+    shard INTEGER NOT NULL,
+    job TEXT NOT NULL,
+    state TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt REAL NOT NULL DEFAULT 0,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS series_state ON series (shard, state, next_attempt);
+
+CREATE TABLE IF NOT EXISTS games (
+    series_key TEXT NOT NULL REFERENCES series (key),
+    position INTEGER NOT NULL,
+    key TEXT NOT NULL,
+    state TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt REAL NOT NULL DEFAULT 0,
+    error TEXT,
+    source TEXT,
+    source_key TEXT,
+    PRIMARY KEY (series_key, position)
+);
+CREATE INDEX IF NOT EXISTS games_state ON games (state, next_attempt);
+"""
+
+
+def series_key(job: Union[QQSeriesJob, RiotSeriesJob]) -> str:
+    """Returns the key identifying a series in the journal, like 'qq:6131' or 'riot:' and its match history URLs.
+    """
+    if isinstance(job, QQSeriesJob):
+        return f"qq:{urllib.parse.parse_qs(urllib.parse.urlparse(job.qq_match_url).query)['bmid'][0]}"
+
+    return "riot:" + ",".join(job.mh_url_list)
+
+
+def shard_of(key: str, shards: int) -> int:
+    """Returns the shard a series belongs to, the same on every worker and node whatever the order of the inputs.
+    """
+    return int(hashlib.sha1(key.encode()).hexdigest(), 16) % shards
+
+
+def read_inputs(location: str) -> Iterable[Union[int, str, List[str]]]:
+    """Reads a backfill input file, holding one series per line.
+
+    A line is a QQ match URL or bmid, or the match history URLs of a Riot series separated by spaces. Empty lines and
+    lines starting with # are skipped.
+    """
+    with open(location) as file:
+        for line in file:
+            fields = line.split()
+
+            if not fields or fields[0].startswith("#"):
+                continue
+
+            if len(fields) > 1:
+                yield fields
+            else:
+                yield int(fields[0]) if fields[0].isdigit() else fields[0]
+
+
+class BackfillProgress(NamedTuple):
+    series_count: int
+    series_done: int
+    series_failed: int
+    series_waiting: int  # Series whose games list is waiting for a retry
+    games_done: int
+    games_pending: int  # Including the games waiting for a retry
+    games_waiting: int
+    games_failed: int
+    elapsed: float  # Seconds since the run started
+    games_per_second: float  # Games done during the run per second
+
+    def __str__(self):
+        return (
+            f"series {self.series_done}/{self.series_count} done, {self.series_waiting} waiting for a retry, "
+            f"{self.series_failed} failed | "
+            f"games {self.games_done} done, {self.games_pending} pending ({self.games_waiting} waiting for a retry), "
+            f"{self.games_failed} failed | {self.games_per_second:.2f} games/s"
+        )
+
+
+class Backfill:
+    """A resumable runner retrieving many series into a GameStore, with the state of every game in a local journal.
+
+    Series are split between shards on a hash of their key, so N workers or nodes given the same inputs with shards=N
+    and their own shard each get a disjoint part of the work. The journal is a SQLite file that shards can share.
+
+    Every game is recorded in the journal as soon as it is stored, so a stopped run resumes where it was, only
+    retrying the games that were running. Games that fail are retried later with the backoff of retry_policy,
+    while the other games go on, and are marked as failed once they used all its attempts.
+
+    A series is stored with upsert_series once all its games are done or failed, under its journal key.
+
+    Runs read and write the journal and the store from their own thread, so the event loop keeps serving queries
+    while SQLite waits for the disk or for the locks of other shards.
+    """
+
+    def __init__(
+        self,
+        journal_location: str,
+        store: GameStore,
+        shard: int = 0,
+        shards: int = 1,
+        get_timeline: bool = False,
+        add_names: bool = True,
+        max_games: int = 16,
+        retry_policy: RetryPolicy = None,
+        acs: ACS = None,
+        max_connections: int = 64,
+        max_connections_per_host: int = 16,
+        transform_processes: int = None,
+    ):
+        """
+        Params:
+            journal_location: the SQLite journal file, created if needed.
+            store: the GameStore the games and series are written to.
+            shard: the shard of this worker, from 0 to shards - 1.
+            shards: the number of workers the series are split between.
+            get_timeline: whether or not to query the /timeline/ endpoints for Riot games.
+            add_names: whether or not to add champions/items/runes names next to their objects.
+            max_games: maximum number of games, or series being listed, retrieved at the same time.
+            retry_policy: attempts and backoff of failed games and series, 5 attempts with a backoff starting at a
+                minute if None.
+            acs: the ACS instance used for Riot games, the default one if None.
+            max_connections: maximum number of simultaneous HTTP connections.
+            max_connections_per_host: maximum number of simultaneous HTTP connections to a single host.
+            transform_processes: if set, payloads are transformed into games by this many worker processes.
+        """
+        if not 0 <= shard < shards:
+            raise ValueError(f"Shard {shard} is not between 0 and {shards - 1}")
+
+        self.journal_location = journal_location
+        self.store = store
+        self.shard = shard
+        self.shards = shards
+        self.get_timeline = get_timeline
+        self.add_names = add_names
+        self.max_games = max_games
+        self.retry_policy = retry_policy or RetryPolicy(attempts=5, backoff=60, max_backoff=3600)
+        self.acs = acs
+        self.max_connections = max_connections
+        self.max_connections_per_host = max_connections_per_host
+        self.transform_processes = transform_processes
+
+        self._start = time.monotonic()
+        self._games_done = 0
+
+        self._lock = threading.Lock()
+        # Shards running on the same host wait for each other's writes instead of failing
+        self._connection = sqlite3.connect(journal_location, timeout=60, check_same_thread=False)
+
+        with self._lock, self._connection:
+            self._connection.execute("PRAGMA journal_mode = WAL")
+            self._connection.executescript(_schema)
+
+        self._journal_thread = ThreadPoolExecutor(1, thread_name_prefix="journal")
+
+    def close(self):
+        self._journal_thread.shutdown()
+        self._connection.close()
+
+    def __enter__(self) -> "Backfill":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def add_inputs(self, items: Iterable) -> int:
+        """Adds the series of this shard to the journal, the ones already in it being left as they are.
+
+        Inputs that are not series are logged and skipped, so a malformed line does not stop the others.
+
+        Params:
+            items: QQ match URLs, QQ bmids, match history URLs, lists of match history URLs, or jobs.
+
+        Returns:
+            The number of series added.
+        """
+        rows = []
+        for item in items:
+            try:
+                job = to_job(item)
+                key = series_key(job)
+            except (ValueError, KeyError) as e:
+                logging.warning(f"Skipping invalid input {item!r}: {type(e).__name__}: {e}")
+                continue
+
+            if shard_of(key, self.shards) == self.shard:
+                rows.append((key, self.shard, json.dumps(job._asdict())))
+
+        with self._lock, self._connection:
+            changes = self._connection.total_changes
+            self._connection.executemany("INSERT OR IGNORE INTO series (key, shard, job) VALUES (?, ?, ?)", rows)
+            return self._connection.total_changes - changes
+
+    def retry_failed(self):
+        """Makes the failed games and series of this shard pending again, with all their attempts.
+        """
+        with self._lock, self._connection:
+            self._connection.execute(
+                "UPDATE games SET state = 'pending', attempts = 0, next_attempt = 0 WHERE state = 'failed' "
+                "AND series_key IN (SELECT key FROM series WHERE shard = ?)",
+                (self.shard,),
+            )
+            self._connection.execute(
+                "UPDATE series SET state = CASE WHEN EXISTS (SELECT 1 FROM games WHERE series_key = series.key) "
+                "THEN 'listed' ELSE 'pending' END, attempts = 0, next_attempt = 0 "
+                "WHERE state = 'failed' AND shard = ?",
+                (self.shard,),
+            )
+
+    def progress(self) -> BackfillProgress:
+        """Returns the progress of this shard, throughput being measured since the run started.
+        """
+        with self._lock:
+            series_states = dict(
+                self._connection.execute(
+                    "SELECT state, COUNT(*) FROM series WHERE shard = ? GROUP BY state", (self.shard,)
+                ).fetchall()
+            )
+            games_states = dict(
+                self._connection.execute(
+                    "SELECT games.state, COUNT(*) FROM games JOIN series ON series.key = games.series_key "
+                    "WHERE series.shard = ? GROUP BY games.state",
+                    (self.shard,),
+                ).fetchall()
+            )
+            (series_waiting,) = self._connection.execute(
+                "SELECT COUNT(*) FROM series WHERE shard = ? AND state = 'pending' AND next_attempt > ?",
+                (self.shard, time.time()),
+            ).fetchone()
+            (games_waiting,) = self._connection.execute(
+                "SELECT COUNT(*) FROM games JOIN series ON series.key = games.series_key "
+                "WHERE series.shard = ? AND games.state = 'pending' AND games.next_attempt > ?",
+                (self.shard, time.time()),
+            ).fetchone()
+
+        elapsed = time.monotonic() - self._start
+
+        return BackfillProgress(
+            series_count=sum(series_states.values()),
+            series_done=series_states.get("done", 0),
+            series_failed=series_states.get("failed", 0),
+            series_waiting=series_waiting,
+            games_done=games_states.get("done", 0),
+            games_pending=games_states.get("pending", 0),
+            games_waiting=games_waiting,
+            games_failed=games_states.get("failed", 0),
+            elapsed=elapsed,
+            games_per_second=self._games_done / elapsed if elapsed else 0.0,
+        )
+
+    def run(
+        self,
+        progress: Callable[[BackfillProgress], None] = None,
+        progress_interval: float = 10.0,
+        wait_for_retries: bool = True,
+    ) -> BackfillProgress:
+        """Retrieves the pending series and games of this shard until none is left.
+
+        Params:
+            progress: function called with the progress every progress_interval seconds and at the end.
+            progress_interval: number of seconds between progress reports.
+            wait_for_retries: whether or not to wait for the games waiting for a retry, instead of returning once
+                only they are left. They are then retried by the next run.
+
+        Returns:
+            The progress at the end of the run.
+        """
+        return run_sync(self.run_async(progress, progress_interval, wait_for_retries))
+
+    async def run_async(
+        self,
+        progress: Callable[[BackfillProgress], None] = None,
+        progress_interval: float = 10.0,
+        wait_for_retries: bool = True,
+    ) -> BackfillProgress:
+        """Asynchronous version of run.
+        """
+        self._start = time.monotonic()
+        self._games_done = 0
+
+        transform_pool = (
+            TransformPool(self.transform_processes, add_names=self.add_names) if self.transform_processes else None
+        )
+
+        async with ensure_client(
+            None, limit=self.max_connections, limit_per_host=self.max_connections_per_host
+        ) as client, contextlib.AsyncExitStack() as stack:
+            if transform_pool is not None:
+                await stack.enter_async_context(transform_pool)
+
+            await self._run_jobs(client, transform_pool, progress, progress_interval, wait_for_retries)
+
+        result = self.progress()
+        if progress:
+            progress(result)
+
+        return result
+
+    async def _run_jobs(
+        self,
+        client: HttpClient,
+        transform_pool: Optional[TransformPool],
+        progress: Optional[Callable[[BackfillProgress], None]],
+        progress_interval: float,
+        wait_for_retries: bool,
+    ):
+        running = {}
+        next_report = time.monotonic() + progress_interval
+
+        try:
+            while True:
+                for row in await self._in_journal_thread(self._ready_rows, set(running.values())):
+                    if len(running) >= self.max_games:
+                        break
+
+                    if row[0] == "series":
+                        coroutine = self._list_series(client, *row[1:])
+                    else:
+                        coroutine = self._run_game(client, transform_pool, *row[1:])
+
+                    running[asyncio.ensure_future(coroutine)] = row[:3]
+
+                next_attempt = await self._in_journal_thread(self._next_attempt)
+
+                if not running and (next_attempt is None or not wait_for_retries):
+                    break
+
+                # Pending rows that are already due are running or waiting for room, so a task has to finish first
+                timeout = next_report - time.monotonic()
+                if next_attempt is not None and next_attempt > time.time():
+                    timeout = min(timeout, next_attempt - time.time())
+
+                if running:
+                    done, _ = await asyncio.wait(
+                        running, timeout=max(0.0, timeout), return_when=asyncio.FIRST_COMPLETED
+                    )
+                    for task in done:
+                        del running[task]
+                        # Failures are recorded in the journal, so only unexpected errors are raised here
+                        task.result()
+                else:
+                    await asyncio.sleep(max(0.0, timeout))
+
+                if progress and time.monotonic() >= next_report:
+                    progress(await self._in_journal_thread(self.progress))
+                    next_report = time.monotonic() + progress_interval
+
+        finally:
+            for task in running:
+                task.cancel()
+
+    async def _in_journal_thread(self, fn: Callable[..., T], *args) -> T:
+        return await asyncio.get_running_loop().run_in_executor(self._journal_thread, lambda: fn(*args))
+
+    def _ready_rows(self, running: set) -> list:
+        # Series are listed first, so their games can start as soon as possible
+        limit = self.max_games + len(running)
+        now = time.time()
+
+        with self._lock:
+            series = self._connection.execute(
+                "SELECT 'series', key, NULL, job, attempts FROM series "
+                "WHERE shard = ? AND state = 'pending' AND next_attempt <= ? ORDER BY next_attempt, rowid LIMIT ?",
+                (self.shard, now, limit),
+            ).fetchall()
+            games = self._connection.execute(
+                "SELECT 'game', games.series_key, games.position, series.job, games.attempts, games.key FROM games "
+                "JOIN series ON series.key = games.series_key "
+                "WHERE series.shard = ? AND games.state = 'pending' AND games.next_attempt <= ? "
+                "ORDER BY games.next_attempt, series.rowid, games.position LIMIT ?",
+                (self.shard, now, limit),
+            ).fetchall()
+
+        return [row for row in series + games if tuple(row[:3]) not in running]
+
+    def _next_attempt(self) -> Optional[float]:
+        with self._lock:
+            (next_attempt,) = self._connection.execute(
+                "SELECT MIN(next_attempt) FROM ("
+                "SELECT next_attempt FROM series WHERE shard = ? AND state = 'pending' UNION ALL "
+                "SELECT games.next_attempt FROM games JOIN series ON series.key = games.series_key "
+                "WHERE series.shard = ? AND games.state = 'pending')",
+                (self.shard, self.shard),
+            ).fetchone()
+
+        return next_attempt
+
+    async def _list_series(self, client: HttpClient, key: str, _, job: str, attempts: int):
+        job = _load_job(job)
+
+        try:
+            if isinstance(job, QQSeriesJob):
+                game_keys = [str(g["sMatchId"]) for g in await get_qq_games_list(client, job.qq_match_url)]
+            else:
+                game_keys = job.mh_url_list
+
+            if not game_keys:
+                raise FileNotFoundError("No game was listed for the series")
+
+        except Exception as e:
+            await self._in_journal_thread(self._record_failure, "series", "key = ?", (key,), attempts, e)
+            return
+
+        await self._in_journal_thread(self._record_listed, key, game_keys)
+
+    async def _run_game(
+        self,
+        client: HttpClient,
+        transform_pool: Optional[TransformPool],
+        key: str,
+        position: int,
+        job: str,
+        attempts: int,
+        game_key: str,
+    ):
+        job = _load_job(job)
+
+        try:
+            if isinstance(job, QQSeriesJob):
+                game = await parse_qq_game_async(
+                    int(game_key), job.patch, self.add_names, client, transform_pool=transform_pool
+                )
+            else:
+                game = await get_riot_game_async(
+                    game_key,
+                    self.get_timeline,
+                    self.add_names,
+                    client=client,
+                    acs=self.acs,
+                    transform_pool=transform_pool,
+                )
+
+            await self._in_journal_thread(self.store.upsert_games, [game])
+
+        except Exception as e:
+            await self._in_journal_thread(
+                self._record_failure, "games", "series_key = ? AND position = ?", (key, position), attempts, e
+            )
+
+        else:
+            await self._in_journal_thread(self._record_game, key, position, *source_keys(game)[0])
+            self._games_done += 1
+
+        await self._in_journal_thread(self._finish_series, key)
+
+    def _record_listed(self, key: str, game_keys: List[str]):
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "INSERT OR IGNORE INTO games (series_key, position, key) VALUES (?, ?, ?)",
+                [(key, position, game_key) for position, game_key in enumerate(game_keys)],
+            )
+            self._connection.execute(
+                "UPDATE series SET state = 'listed', attempts = attempts + 1, error = NULL WHERE key = ?", (key,)
+            )
+
+    def _record_game(self, key: str, position: int, source: str, source_key: str):
+        with self._lock, self._connection:
+            self._connection.execute(
+                "UPDATE games SET state = 'done', attempts = attempts + 1, error = NULL, source = ?, source_key = ? "
+                "WHERE series_key = ? AND position = ?",
+                (source, source_key, key, position),
+            )
+
+    def _record_failure(self, table: str, condition: str, parameters: tuple, attempts: int, error: Exception):
+        attempts += 1
+        error_text = f"{type(error).__name__}: {error}"
+
+        if attempts >= self.retry_policy.attempts:
+            logging.warning(f"Giving up on {parameters} after {attempts} attempts, {error_text}")
+            state, next_attempt = "failed", 0.0
+        else:
+            delay = self.retry_policy.backoff_delay(attempts)
+            logging.info(f"Retrying {parameters} in {delay:.0f}s after {error_text}")
+            state, next_attempt = "pending", time.time() + delay
+
+        with self._lock, self._connection:
+            self._connection.execute(
+                f"UPDATE {table} SET state = ?, attempts = ?, next_attempt = ?, error = ? WHERE {condition}",
+                (state, attempts, next_attempt, error_text, *parameters),
+            )
+
+    def _finish_series(self, key: str):
+        with self._lock:
+            games = self._connection.execute(
+                "SELECT state, source, source_key FROM games WHERE series_key = ? ORDER BY position", (key,)
+            ).fetchall()
+
+        if not games or any(state == "pending" for state, _, _ in games):
+            return
+
+        stored_games = [
+            self.store.get_game(source, source_key) for state, source, source_key in games if state == "done"
+        ]
+        if stored_games:
+            self.store.upsert_series(create_series(stored_games), key=key)
+
+        with self._lock, self._connection:
+            self._connection.execute(
+                "UPDATE series SET state = ? WHERE key = ?",
+                ("done" if len(stored_games) == len(games) else "failed", key),
+            )
+
+
+def _load_job(job: str) -> Union[QQSeriesJob, RiotSeriesJob]:
+    fields = json.loads(job)
+    return QQSeriesJob(**fields) if "qq_match_url" in fields else RiotSeriesJob(**fields)
@@ -0,0 +1,102 @@
+import argparse
+import sys
+from typing import List
+
+from lol_esports_parser import json_codec
+from lol_esports_parser.parsers.qq.qq_parser import stream_qq_series
+from lol_esports_parser.parsers.riot.riot_parser import stream_riot_series
+
+
+def get_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="lol_esports_parser",
+        description="Streams the games of a series to stdout as NDJSON, one game per line as soon as it is parsed, "
+        "followed by a line with the series score and winner. The backfill command retrieves many series into a "
+        "game store instead.",
+    )
+    subparsers = parser.add_subparsers(dest="source", required=True)
+
+    qq_parser = subparsers.add_parser("qq", help="a QQ series")
+    qq_parser.add_argument("qq_match_url", help="the QQ url of the full match, with bmid=xxx in its query")
+    qq_parser.add_argument("--patch", help="MM.mm patch used to add rune trees")
+    qq_parser.add_argument("--no-names", action="store_true", help="do not add champions/items/runes names")
+
+    riot_parser = subparsers.add_parser("riot", help="a series of Riot match history URLs")
+    riot_parser.add_argument("mh_urls", nargs="+", help="the match history URLs of the games")
+    riot_parser.add_argument("--timeline", action="store_true", help="query the /timeline/ endpoints for the games")
+    riot_parser.add_argument("--no-names", action="store_true", help="do not add champions/items/runes names")
+
+    backfill_parser = subparsers.add_parser(
+        "backfill",
+        help="retrieve many series into a game store, resuming where the last run stopped",
+        description="Retrieves the series of an input file into a game store, recording the state of every game in "
+        "a journal. Runs resume where the last one stopped, and failed games are retried later with a backoff. "
+        "Progress is reported on stderr.",
+    )
+    backfill_parser.add_argument(
+        "inputs",
+        help="file with one series per line: a QQ match URL or bmid, or match history URLs separated by spaces",
+    )
+    backfill_parser.add_argument("--store", required=True, help="the SQLite game store the games are written to")
+    backfill_parser.add_argument("--journal", help="the SQLite journal, defaults to the store location + .journal")
+    backfill_parser.add_argument("--shard", type=int, default=0, help="the shard of this worker, from 0")
+    backfill_parser.add_argument("--shards", type=int, default=1, help="the number of workers sharing the inputs")
+    backfill_parser.add_argument("--timeline", action="store_true", help="query the /timeline/ endpoints")
+    backfill_parser.add_argument("--no-names", action="store_true", help="do not add champions/items/runes names")
+    backfill_parser.add_argument("--max-games", type=int, default=16, help="games retrieved at the same time")
+    backfill_parser.add_argument("--attempts", type=int, default=5, help="attempts before a game is marked failed")
+    backfill_parser.add_argument("--backoff", type=float, default=60, help="seconds before the first retry")
+    backfill_parser.add_argument("--retry-failed", action="store_true", help="retry the games marked failed")
+    backfill_parser.add_argument(
+        "--no-wait", action="store_true", help="exit instead of waiting when only games waiting for a retry are left"
+    )
+    backfill_parser.add_argument("--progress-interval", type=float, default=10, help="seconds between reports")
+
+    return parser
+
+
+def backfill(args: argparse.Namespace):
+    # Imported here so streaming a single series does not load the store and journal modules
+    from lol_esports_parser.backfill import Backfill, read_inputs
+    from lol_esports_parser.game_store import GameStore
+    from lol_esports_parser.parsers.retry_policy import RetryPolicy
+
+    with GameStore(args.store) as store, Backfill(
+        args.journal or f"{args.store}.journal",
+        store,
+        shard=args.shard,
+        shards=args.shards,
+        get_timeline=args.timeline,
+        add_names=not args.no_names,
+        max_games=args.max_games,
+        retry_policy=RetryPolicy(attempts=args.attempts, backoff=args.backoff, max_backoff=3600),
+    ) as runner:
+        added = runner.add_inputs(read_inputs(args.inputs))
+        print(f"{added} new series for shard {args.shard}/{args.shards}", file=sys.stderr)
+
+        if args.retry_failed:
+            runner.retry_failed()
+
+        runner.run(
+            progress=lambda progress: print(progress, file=sys.stderr, flush=True),
+            progress_interval=args.progress_interval,
+            wait_for_retries=not args.no_wait,
+        )
+
+
+def main(args: List[str] = None):
+    args = get_parser().parse_args(args)
+
+    if args.source == "backfill":
+        return backfill(args)
+
+    if args.source == "qq":
+        items = stream_qq_series(args.qq_match_url, args.patch, not args.no_names)
+    else:
+        items = stream_riot_series(args.mh_urls, args.timeline, not args.no_names)
+
+    json_codec.write_ndjson(items, sys.stdout.buffer, flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,24 +5,82 @@ config_folder = os.path.join(os.path.expanduser("~"), ".config", "lol_esports_pa
 endpoints_location = os.path.join(config_folder, "endpoints.json")
 credentials_location = os.path.join(config_folder, "credentials.json")
 
-if not os.path.exists(config_folder):
-    os.makedirs(config_folder)
-    raise FileNotFoundError(f"Please create {endpoints_location}.")
-
-with open(endpoints_location) as file:
-    endpoints = json.load(file)
-
-if not os.path.exists(credentials_location):
-    print(
-        f"Creating {credentials_location} locally.\n"
-        "This information is required to connect to the ACS endpoints.\n"
-        f"Password will be saved in clear, so make sure only your user has read access on the file.\n"
-    )
-    account_name = input("Please input your LoL account name:")
-    password = input("Please input your LoL account password:")
-
-    with open(credentials_location, "w+") as file:
-        json.dump({"account_name": account_name, "password": password}, file, indent=4)
-
-with open(credentials_location) as file:
-    credentials = json.load(file)
+# Endpoints that do not need to be present in endpoints.json
+default_endpoints = {
+    "acs": {"auth": "https://auth.riotgames.com/token"},
+    "ddragon": {"base": "https://ddragon.leagueoflegends.com"},
+}
+
+# Configuration files are only read when first needed so importing the package has no side effect
+_endpoints = None
+_credentials = None
+
+
+def get_endpoints() -> dict:
+    """Returns the endpoints configuration, loading it from endpoints.json on first use.
+    """
+    global _endpoints
+
+    if _endpoints is None:
+        if not os.path.exists(config_folder):
+            os.makedirs(config_folder)
+            raise FileNotFoundError(f"Please create {endpoints_location}.")
+
+        with open(endpoints_location) as file:
+            set_endpoints(json.load(file))
+
+    return _endpoints
+
+
+def set_endpoints(endpoints: dict):
+    """Overrides the endpoints configuration, for example to use a local mirror.
+    """
+    global _endpoints
+
+    _endpoints = {}
+    for section in set(endpoints) | set(default_endpoints):
+        _endpoints[section] = {**default_endpoints.get(section, {}), **endpoints.get(section, {})}
+
+
+def get_credentials() -> dict:
+    """Returns the ACS credentials, loading them from credentials.json on first use.
+
+    If the file does not exist, the user is prompted for the account information.
+    """
+    global _credentials
+
+    if _credentials is None:
+        if not os.path.exists(credentials_location):
+            print(
+                f"Creating {credentials_location} locally.\n"
+                "This information is required to connect to the ACS endpoints.\n"
+                f"Password will be saved in clear, so make sure only your user has read access on the file.\n"
+            )
+            account_name = input("Please input your LoL account name:")
+            password = input("Please input your LoL account password:")
+
+            os.makedirs(config_folder, exist_ok=True)
+            with open(credentials_location, "w+") as file:
+                json.dump({"account_name": account_name, "password": password}, file, indent=4)
+
+        with open(credentials_location) as file:
+            set_credentials(json.load(file))
+
+    return _credentials
+
+
+def set_credentials(credentials: dict):
+    """Overrides the ACS credentials.
+    """
+    global _credentials
+    _credentials = credentials
+
+
+def __getattr__(name):
+    # Keeps config.endpoints and config.credentials working while loading them lazily
+    if name == "endpoints":
+        return get_endpoints()
+    if name == "credentials":
+        return get_credentials()
+
+    raise AttributeError(f"module {__name__} has no attribute {name}")
@@ -0,0 +1,247 @@
+import json
+import os
+import typing
+from typing import TYPE_CHECKING, Dict, Iterable, List, Tuple
+
+import lol_dto
+
+# NumPy and Arrow are optional dependencies, only imported when converting the tables
+# They can be installed with pip install lol_esports_parser[columnar]
+if TYPE_CHECKING:
+    import numpy
+    import pyarrow
+
+python_types = {int: "int", float: "float", bool: "bool", str: "str"}
+
+
+def _stats_columns(stats_class) -> List[Tuple[str, str]]:
+    # End of game stats columns are read from the DTO definitions so they stay in sync with lol_dto
+    return [
+        (field, python_types[field_type])
+        for field, field_type in typing.get_type_hints(stats_class).items()
+        if field_type in python_types
+    ]
+
+
+team_stats_columns = _stats_columns(lol_dto.classes.game.LolGameTeamEndOfGameStats)
+player_stats_columns = _stats_columns(lol_dto.classes.game.LolGamePlayerEndOfGameStats)
+
+# {table: [(column, type)]}, rows of other tables refer to games through gameIndex
+schemas = {
+    "games": [
+        ("gameIndex", "int"),
+        ("sources", "str"),  # JSON, as every source has its own identifiers
+        ("start", "str"),
+        ("duration", "int"),
+        ("patch", "str"),
+        ("gameVersion", "str"),
+        ("winner", "str"),
+        ("tournament", "str"),
+        ("gameInSeries", "int"),
+        ("vod", "str"),
+    ],
+    "teams": [
+        ("gameIndex", "int"),
+        ("side", "str"),
+        ("name", "str"),
+        ("win", "bool"),
+        ("uniqueIdentifiers", "str"),
+        *team_stats_columns,
+    ],
+    "players": [
+        ("gameIndex", "int"),
+        ("side", "str"),
+        ("playerIndex", "int"),
+        ("id", "int"),
+        ("inGameName", "str"),
+        ("role", "str"),
+        ("championId", "int"),
+        ("championName", "str"),
+        ("primaryRuneTreeId", "int"),
+        ("primaryRuneTreeName", "str"),
+        ("secondaryRuneTreeId", "int"),
+        ("secondaryRuneTreeName", "str"),
+        ("summonerSpell1Id", "int"),
+        ("summonerSpell2Id", "int"),
+        ("uniqueIdentifiers", "str"),
+        *player_stats_columns,
+    ],
+    "items": [
+        ("gameIndex", "int"),
+        ("side", "str"),
+        ("playerIndex", "int"),
+        ("slot", "int"),
+        ("id", "int"),
+        ("name", "str"),
+    ],
+    "runes": [
+        ("gameIndex", "int"),
+        ("side", "str"),
+        ("playerIndex", "int"),
+        ("slot", "int"),
+        ("id", "int"),
+        ("name", "str"),
+        ("rank", "int"),
+    ],
+    "bans": [
+        ("gameIndex", "int"),
+        ("side", "str"),
+        ("banIndex", "int"),
+        ("championId", "int"),
+        ("championName", "str"),
+    ],
+}
+
+
+class GameTables:
+    """Flattens LolGame objects into columnar tables: games, teams, players, items, runes and bans.
+
+    Each game is walked once and its values appended to per-column lists, which are only converted to typed NumPy
+    arrays or Arrow tables at the end. Missing fields are null.
+    """
+
+    def __init__(self, games: Iterable[lol_dto.classes.game.LolGame] = ()):
+        self.columns: Dict[str, Dict[str, list]] = {
+            table: {column: [] for column, _ in schema} for table, schema in schemas.items()
+        }
+        self.games_count = 0
+
+        self.add_games(games)
+
+    def add_games(self, games: Iterable[lol_dto.classes.game.LolGame]):
+        for game in games:
+            self.add_game(game)
+
+    def add_game(self, game: lol_dto.classes.game.LolGame):
+        game_index = self.games_count
+        self.games_count += 1
+
+        self._append(
+            "games",
+            game,
+            gameIndex=game_index,
+            sources=_to_json(game.get("sources")),
+        )
+
+        for side, team in game.get("teams", {}).items():
+            self._append(
+                "teams",
+                team.get("endOfGameStats", {}),
+                gameIndex=game_index,
+                side=side,
+                name=team.get("name"),
+                win=game.get("winner") == side if "winner" in game else None,
+                uniqueIdentifiers=_to_json(team.get("uniqueIdentifiers")),
+            )
+
+            bans_names = team.get("bansNames") or []
+            for ban_index, champion_id in enumerate(team.get("bans") or []):
+                self._append(
+                    "bans",
+                    {},
+                    gameIndex=game_index,
+                    side=side,
+                    banIndex=ban_index,
+                    championId=champion_id,
+                    championName=bans_names[ban_index] if ban_index < len(bans_names) else None,
+                )
+
+            for player_index, player in enumerate(team.get("players", [])):
+                self._add_player(game_index, side, player_index, player)
+
+    def _add_player(self, game_index: int, side: str, player_index: int, player: lol_dto.classes.game.LolGamePlayer):
+        end_of_game_stats = player.get("endOfGameStats", {})
+        summoner_spells = sorted(player.get("summonerSpells", []), key=lambda spell: spell["slot"])
+
+        self._append(
+            "players",
+            {**player, **end_of_game_stats},
+            gameIndex=game_index,
+            side=side,
+            playerIndex=player_index,
+            summonerSpell1Id=summoner_spells[0]["id"] if len(summoner_spells) > 0 else None,
+            summonerSpell2Id=summoner_spells[1]["id"] if len(summoner_spells) > 1 else None,
+            uniqueIdentifiers=_to_json(player.get("uniqueIdentifiers")),
+        )
+
+        for item in end_of_game_stats.get("items", []):
+            self._append("items", item, gameIndex=game_index, side=side, playerIndex=player_index)
+
+        for rune in player.get("runes", []):
+            self._append("runes", rune, gameIndex=game_index, side=side, playerIndex=player_index)
+
+    def _append(self, table: str, source: dict, **values):
+        # Explicit values take precedence over the fields of the source object
+        for column, column_values in self.columns[table].items():
+            column_values.append(values[column] if column in values else source.get(column))
+
+    def to_numpy(self) -> Dict[str, Dict[str, "numpy.ndarray"]]:
+        """Returns {table: {column: array}}.
+
+        Integer and boolean columns with missing values become float columns with NaN, strings are object arrays.
+        """
+        import numpy
+
+        numpy_types = {"int": numpy.int64, "float": numpy.float64, "bool": numpy.bool_, "str": object}
+
+        tables = {}
+        for table, schema in schemas.items():
+            tables[table] = {}
+
+            for column, column_type in schema:
+                values = self.columns[table][column]
+
+                if column_type != "str" and None in values:
+                    array = numpy.array([numpy.nan if v is None else v for v in values], dtype=numpy.float64)
+                else:
+                    array = numpy.array(values, dtype=numpy_types[column_type])
+
+                tables[table][column] = array
+
+        return tables
+
+    def to_arrow(self) -> Dict[str, "pyarrow.Table"]:
+        """Returns {table: pyarrow.Table}, with nullable typed columns.
+        """
+        import pyarrow
+
+        arrow_types = {
+            "int": pyarrow.int64(),
+            "float": pyarrow.float64(),
+            "bool": pyarrow.bool_(),
+            "str": pyarrow.string(),
+        }
+
+        return {
+            table: pyarrow.Table.from_arrays(
+                [
+                    pyarrow.array(self.columns[table][column], arrow_types[column_type])
+                    for column, column_type in schema
+                ],
+                names=[column for column, _ in schema],
+            )
+            for table, schema in schemas.items()
+        }
+
+    def write(self, folder: str, file_format: str = "parquet"):
+        """Writes one file per table in the folder.
+
+        Params:
+            folder: where to write the tables, created if needed.
+            file_format: 'parquet' or 'feather'.
+        """
+        if file_format == "parquet":
+            from pyarrow.parquet import write_table
+        elif file_format == "feather":
+            from pyarrow.feather import write_feather as write_table
+        else:
+            raise ValueError(f"Unknown file format {file_format}")
+
+        os.makedirs(folder, exist_ok=True)
+
+        for table, arrow_table in self.to_arrow().items():
+            write_table(arrow_table, os.path.join(folder, f"{table}.{file_format}"))
+
+
+def _to_json(value):
+    return None if value is None else json.dumps(value, sort_keys=True)
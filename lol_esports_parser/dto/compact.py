@@ -0,0 +1,191 @@
+import array
+import sys
+from typing import Dict, Iterable, Iterator, List, Sequence, Tuple, Union
+
+import lol_dto
+
+
+class _Record(tuple):
+    """A dict stored as (shape index, *values).
+    """
+
+    __slots__ = ()
+
+
+class _Columns(tuple):
+    """A list of dicts with the same keys stored as (shape index, *columns), each column being an encoded list.
+    """
+
+    __slots__ = ()
+
+
+class Shapes:
+    """The key tuples of the dicts of a corpus, shared by all its records instead of repeated in every dict.
+    """
+
+    def __init__(self):
+        self.keys: List[Tuple[str, ...]] = []
+        self._indexes: Dict[Tuple[str, ...], int] = {}
+
+    def index(self, keys: Tuple[str, ...]) -> int:
+        shape_index = self._indexes.get(keys)
+
+        if shape_index is None:
+            shape_index = self._indexes[keys] = len(self.keys)
+            self.keys.append(tuple(sys.intern(key) for key in keys))
+
+        return shape_index
+
+
+def encode(value, shapes: Shapes):
+    """Returns the compact form of a JSON-like value.
+
+    Dicts become tuples of values referring to a shape, lists of dicts with the same keys become columns, lists of
+    integers or floats become typed arrays, other lists become tuples, and strings are interned so team, champion
+    and item names are stored once.
+    """
+    value_type = type(value)
+
+    if value_type is dict:
+        return _Record((shapes.index(tuple(value)), *(encode(v, shapes) for v in value.values())))
+
+    if value_type is list:
+        return _encode_list(value, shapes)
+
+    if value_type is str:
+        return sys.intern(value)
+
+    return value
+
+
+def _encode_list(values: list, shapes: Shapes):
+    if not values:
+        return ()
+
+    first_type = type(values[0])
+
+    # Booleans are integers too, so types are compared exactly
+    if first_type is int and all(type(v) is int for v in values):
+        try:
+            return array.array("q", values)
+        except OverflowError:
+            pass
+
+    elif first_type is float and all(type(v) is float for v in values):
+        return array.array("d", values)
+
+    elif first_type is dict and len(values) > 1:
+        keys = tuple(values[0])
+
+        # Columns of empty dicts would not know how many dicts they hold
+        if keys and all(type(v) is dict and tuple(v) == keys for v in values):
+            return _Columns((shapes.index(keys), *(_encode_list([v[key] for v in values], shapes) for key in keys)))
+
+    return tuple(encode(v, shapes) for v in values)
+
+
+def decode(value, shapes: Shapes):
+    """Returns the JSON-like value of a compact form, the opposite of encode.
+    """
+    value_type = type(value)
+
+    if value_type is _Record:
+        keys = shapes.keys[value[0]]
+        return {keys[index]: decode(value[index + 1], shapes) for index in range(len(keys))}
+
+    if value_type is _Columns:
+        keys = shapes.keys[value[0]]
+        columns = [decode(column, shapes) for column in value[1:]]
+        return [dict(zip(keys, row)) for row in zip(*columns)]
+
+    if value_type is tuple:
+        return [decode(v, shapes) for v in value]
+
+    if value_type is array.array:
+        return value.tolist()
+
+    return value
+
+
+class CompactRecord:
+    """A read-only view of a compact dict, only materializing the fields that are accessed.
+
+    Nested dicts are returned as views too, and lists are materialized whole. to_dict returns the full dict.
+    """
+
+    __slots__ = ("_record", "_shapes")
+
+    def __init__(self, record: _Record, shapes: Shapes):
+        self._record = record
+        self._shapes = shapes
+
+    def keys(self) -> Tuple[str, ...]:
+        return self._shapes.keys[self._record[0]]
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.keys()
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.keys())
+
+    def __len__(self) -> int:
+        return len(self._record) - 1
+
+    def __getitem__(self, key: str):
+        try:
+            value = self._record[self.keys().index(key) + 1]
+        except ValueError:
+            raise KeyError(key)
+
+        if type(value) is _Record:
+            return CompactRecord(value, self._shapes)
+
+        return decode(value, self._shapes)
+
+    def get(self, key: str, default=None):
+        return self[key] if key in self else default
+
+    def to_dict(self) -> dict:
+        return decode(self._record, self._shapes)
+
+    def __repr__(self):
+        return f"CompactRecord({', '.join(self.keys())})"
+
+
+class CompactGames(Sequence):
+    """A compact in-memory corpus of LolGame objects, for analyses holding many games at once.
+
+    Games are stored without their dict and list objects, keys are stored once for the whole corpus, numbers lists
+    like timeline snapshot columns are typed arrays and strings are interned. Conversion is lossless: to_dict gives
+    back a LolGame equal to the stored one, with keys in the same order.
+
+    Indexing returns CompactRecord views, which only materialize the fields that are read.
+    """
+
+    def __init__(self, games: Iterable[lol_dto.classes.game.LolGame] = ()):
+        self.shapes = Shapes()
+        self._records: List[_Record] = []
+
+        self.extend(games)
+
+    def append(self, game: lol_dto.classes.game.LolGame):
+        self._records.append(encode(game, self.shapes))
+
+    def extend(self, games: Iterable[lol_dto.classes.game.LolGame]):
+        for game in games:
+            self.append(game)
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[CompactRecord, List[CompactRecord]]:
+        if isinstance(index, slice):
+            return [CompactRecord(record, self.shapes) for record in self._records[index]]
+
+        return CompactRecord(self._records[index], self.shapes)
+
+    def to_games(self) -> Iterator[lol_dto.classes.game.LolGame]:
+        """Materializes the games one at a time.
+        """
+        for record in self._records:
+            yield decode(record, self.shapes)
@@ -26,20 +26,43 @@ def create_series(games: List[lol_dto.classes.game.LolGame]) -> LolSeries:
         # The missing field should already have been raised
         pass
 
-    # We get the team names from the first game
-    team_scores = Counter()
+    series_score = SeriesScore()
+    for lol_game_dto in games:
+        series_score.add_game(lol_game_dto)
 
-    try:
-        for lol_game_dto in games:
+    return LolSeries(**series_score.summary(), games=games)
+
+
+class SeriesScore:
+    """Computes the score and winner of a series one game at a time, so games do not need to be kept in memory.
+    """
+
+    def __init__(self):
+        self.team_scores = Counter()
+        self.has_team_names = True
+
+    def add_game(self, lol_game_dto: lol_dto.classes.game.LolGame):
+        # Live games don’t have a team name
+        try:
+            game_scores = Counter()
             for team_side, team in lol_game_dto["teams"].items():
-                if lol_game_dto["winner"] == team_side:
-                    team_scores[team["name"]] += 1
-                else:  # Required to make sure teams with no game win still appear
-                    team_scores[team["name"]] += 0
+                # Required to make sure teams with no game win still appear
+                game_scores[team["name"]] += 1 if lol_game_dto["winner"] == team_side else 0
+        except KeyError:
+            self.has_team_names = False
+            return
 
-        return LolSeries(score=dict(team_scores), winner=team_scores.most_common(1)[0][0], games=games)
+        for team_name, score in game_scores.items():
+            self.team_scores[team_name] += score
 
-    # Live games don’t have a team name
-    except KeyError:
-        logging.warning("Team names not available, cannot compute score and series winner.")
-        return LolSeries(games=games)
+    def summary(self) -> LolSeries:
+        """Returns a LolSeries without games, with the score and winner of the games added so far.
+        """
+        if not self.has_team_names:
+            logging.warning("Team names not available, cannot compute score and series winner.")
+            return LolSeries()
+
+        if not self.team_scores:
+            return LolSeries()
+
+        return LolSeries(score=dict(self.team_scores), winner=self.team_scores.most_common(1)[0][0])
@@ -0,0 +1,156 @@
+from typing import Dict, Iterable, Tuple
+
+import numpy
+import lol_dto
+
+# Stats kept for every participant at every frame, in the order of the last axis of TimelineFrames.values
+frame_stats = ("currentGold", "totalGold", "xp", "level", "cs", "monstersKilled", "x", "y")
+
+
+class TimelineFrames:
+    """Dense representation of the per-minute snapshots of a game.
+
+    values is a (participants, frames, stats) float array, with NaN where a participant has no snapshot. Participants
+    are sorted by id, so with Riot games the 5 first ones are on the BLUE side and each participant faces the one 5
+    indexes away, which is the player in the same role in esports games.
+    """
+
+    def __init__(self, timestamps: numpy.ndarray, participant_ids: numpy.ndarray, values: numpy.ndarray):
+        """
+        Params:
+            timestamps: (frames,) array of frame timestamps in seconds.
+            participant_ids: (participants,) array of participant ids, referring to the id field of players.
+            values: (participants, frames, stats) array following frame_stats.
+        """
+        self.timestamps = timestamps
+        self.participant_ids = participant_ids
+        self.values = values
+
+        self.sides = numpy.where(participant_ids < 6, "BLUE", "RED")
+
+        # Frames of live games land a few milliseconds after their minute, so they are looked up by rounded minute
+        self.minutes = numpy.round(timestamps / 60)
+
+        # {(minutes, stats): features}, computed once per set of arguments
+        self._features: Dict[Tuple[tuple, tuple], Dict[str, numpy.ndarray]] = {}
+
+    @classmethod
+    def from_match_timeline(cls, match_timeline_dto: dict) -> "TimelineFrames":
+        """Builds the frames directly from a Riot MatchTimelineDto, without creating snapshot objects.
+
+        The default features are computed here, so parsing pays for them once instead of every caller.
+        """
+        frames = match_timeline_dto["frames"]
+        participant_ids = sorted({int(i) for frame in frames for i in frame["participantFrames"]})
+        participant_index = {participant_id: index for index, participant_id in enumerate(participant_ids)}
+
+        timestamps = numpy.array([frame["timestamp"] / 1000 for frame in frames], dtype=numpy.float64)
+        values = numpy.full((len(participant_ids), len(frames), len(frame_stats)), numpy.nan)
+
+        for frame_index, frame in enumerate(frames):
+            for participant_frame in frame["participantFrames"].values():
+                position = participant_frame.get("position") or {}
+
+                # Same fields as riot_transmute snapshots
+                values[participant_index[participant_frame["participantId"]], frame_index] = (
+                    participant_frame["currentGold"],
+                    participant_frame["totalGold"],
+                    participant_frame["xp"],
+                    participant_frame["level"],
+                    participant_frame["minionsKilled"] + participant_frame["jungleMinionsKilled"],
+                    participant_frame["jungleMinionsKilled"],
+                    position.get("x", numpy.nan),
+                    position.get("y", numpy.nan),
+                )
+
+        timeline_frames = cls(timestamps, numpy.array(participant_ids, dtype=numpy.int64), values)
+        timeline_frames.features()
+
+        return timeline_frames
+
+    @classmethod
+    def from_game(cls, game: lol_dto.classes.game.LolGame) -> "TimelineFrames":
+        """Builds the frames from the snapshots of a LolGame.
+        """
+        players = sorted((p for team in game["teams"].values() for p in team["players"]), key=lambda p: p["id"])
+        timestamps = sorted({snapshot["timestamp"] for player in players for snapshot in player.get("snapshots", [])})
+        timestamp_index = {timestamp: index for index, timestamp in enumerate(timestamps)}
+
+        values = numpy.full((len(players), len(timestamps), len(frame_stats)), numpy.nan)
+
+        for player_index, player in enumerate(players):
+            for snapshot in player.get("snapshots", []):
+                position = snapshot.get("position") or {}
+
+                values[player_index, timestamp_index[snapshot["timestamp"]]] = [
+                    snapshot.get(stat, numpy.nan) for stat in frame_stats[:6]
+                ] + [position.get("x", numpy.nan), position.get("y", numpy.nan)]
+
+        return cls(
+            numpy.array(timestamps, dtype=numpy.float64),
+            numpy.array([player["id"] for player in players], dtype=numpy.int64),
+            values,
+        )
+
+    def stat(self, stat: str) -> numpy.ndarray:
+        """Returns the (participants, frames) array of a stat.
+        """
+        return self.values[:, :, frame_stats.index(stat)]
+
+    def frame_index(self, minute: float) -> int:
+        """Returns the index of the last frame at or before the given minute, frames counting for their nearest minute.
+        """
+        return max(0, int(numpy.searchsorted(self.minutes, minute, side="right")) - 1)
+
+    def at(self, stat: str, minute: float) -> numpy.ndarray:
+        """Returns the (participants,) values of a stat at the given minute.
+        """
+        return self.stat(stat)[:, self.frame_index(minute)]
+
+    def team_totals(self, stat: str) -> numpy.ndarray:
+        """Returns the (2, frames) sums of a stat for the BLUE then RED team.
+        """
+        values = self.stat(stat)
+        return numpy.stack([values[self.sides == "BLUE"].sum(axis=0), values[self.sides == "RED"].sum(axis=0)])
+
+    def team_diff(self, stat: str) -> numpy.ndarray:
+        """Returns the (frames,) difference of a stat between the BLUE and RED teams.
+        """
+        blue, red = self.team_totals(stat)
+        return blue - red
+
+    def lane_diff(self, stat: str) -> numpy.ndarray:
+        """Returns the (participants, frames) difference of a stat between each participant and their opponent.
+        """
+        values = self.stat(stat)
+        half = len(values) // 2
+        return values - numpy.roll(values, half, axis=0)
+
+    def features(self, minutes: Iterable[float] = (10, 15), stats: Iterable[str] = ("totalGold", "xp", "cs")):
+        """Returns common derived features as {name: array}.
+
+        For each stat and minute, "{stat}DiffAt{minute}" is the (participants,) difference with the lane opponent and
+        "team{Stat}DiffAt{minute}" the BLUE minus RED team difference.
+
+        Features are computed once for given minutes and stats and then shared, so the arrays should not be modified.
+        """
+        key = (tuple(minutes), tuple(stats))
+
+        if key not in self._features:
+            self._features[key] = self._compute_features(*key)
+
+        return self._features[key]
+
+    def _compute_features(self, minutes: Tuple[float, ...], stats: Tuple[str, ...]) -> Dict[str, numpy.ndarray]:
+        features: Dict[str, numpy.ndarray] = {}
+
+        for stat in stats:
+            lane_diff = self.lane_diff(stat)
+            team_diff = self.team_diff(stat)
+
+            for minute in minutes:
+                frame_index = self.frame_index(minute)
+                features[f"{stat}DiffAt{minute}"] = lane_diff[:, frame_index]
+                features[f"team{stat[0].upper()}{stat[1:]}DiffAt{minute}"] = team_diff[frame_index]
+
+        return features
@@ -0,0 +1,342 @@
+import datetime
+import json
+import os
+import sqlite3
+import threading
+from typing import Any, Iterable, List, Optional, Tuple, Union
+
+import lol_dto
+
+from lol_esports_parser import json_codec
+from lol_esports_parser.dto.series_dto import LolSeries
+
+_schema = """
+CREATE TABLE IF NOT EXISTS games (
+    id INTEGER PRIMARY KEY,
+    start_utc TEXT,
+    patch TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS games_patch ON games (patch, start_utc);
+CREATE INDEX IF NOT EXISTS games_start ON games (start_utc);
+
+CREATE TABLE IF NOT EXISTS game_sources (
+    game_id INTEGER NOT NULL REFERENCES games (id) ON DELETE CASCADE,
+    source TEXT NOT NULL,
+    key TEXT NOT NULL,
+    PRIMARY KEY (source, key)
+);
+CREATE INDEX IF NOT EXISTS game_sources_game ON game_sources (game_id);
+
+CREATE TABLE IF NOT EXISTS teams (
+    game_id INTEGER NOT NULL REFERENCES games (id) ON DELETE CASCADE,
+    side TEXT NOT NULL,
+    name TEXT
+);
+CREATE INDEX IF NOT EXISTS teams_name ON teams (name, game_id);
+CREATE INDEX IF NOT EXISTS teams_game ON teams (game_id);
+
+CREATE TABLE IF NOT EXISTS player_identifiers (
+    game_id INTEGER NOT NULL REFERENCES games (id) ON DELETE CASCADE,
+    source TEXT NOT NULL,
+    field TEXT NOT NULL,
+    value TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS player_identifiers_value ON player_identifiers (source, field, value, game_id);
+CREATE INDEX IF NOT EXISTS player_identifiers_game ON player_identifiers (game_id);
+
+CREATE TABLE IF NOT EXISTS series (
+    id INTEGER PRIMARY KEY,
+    key TEXT NOT NULL UNIQUE,
+    score TEXT,
+    winner TEXT
+);
+
+CREATE TABLE IF NOT EXISTS series_games (
+    series_id INTEGER NOT NULL REFERENCES series (id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    game_id INTEGER NOT NULL REFERENCES games (id) ON DELETE CASCADE,
+    PRIMARY KEY (series_id, position)
+);
+"""
+
+
+def source_keys(game: lol_dto.classes.game.LolGame) -> List[Tuple[str, str]]:
+    """Returns the (source, key) pairs identifying a game, like ('qq', '7802') or ('riotLolApi', 'ESPORTSTMNT03/1').
+    """
+    keys = []
+
+    for source, identifiers in game.get("sources", {}).items():
+        if source == "riotLolApi":
+            keys.append((source, f"{identifiers['platformId']}/{identifiers['gameId']}"))
+        elif "id" in identifiers:
+            keys.append((source, str(identifiers["id"])))
+        else:
+            keys.append((source, json.dumps(identifiers, sort_keys=True)))
+
+    return keys
+
+
+def _utc(date_time: Union[str, datetime.datetime, None]) -> Optional[str]:
+    # Start dates come with their own offsets, so they are compared in UTC
+    if date_time is None:
+        return None
+
+    if isinstance(date_time, str):
+        date_time = datetime.datetime.fromisoformat(date_time)
+
+    if date_time.tzinfo is None:
+        date_time = date_time.replace(tzinfo=datetime.timezone.utc)
+
+    return date_time.astimezone(datetime.timezone.utc).isoformat(timespec="seconds")
+
+
+class GameStore:
+    """A local SQLite store for parsed games and series.
+
+    Games are stored whole as JSON next to indexed columns: source ids, team names, player unique identifiers, patch
+    and start date. Queries only decode the games they return, so no game is parsed or downloaded again.
+
+    Games are matched on their source ids, so storing a game again replaces it, and games stored separately from
+    different sources are merged into one when a game has the source ids of both. Stored games keep the source ids
+    the new game is missing. The store can be shared by threads, and by processes as SQLite handles the locking of
+    the file.
+    """
+
+    def __init__(self, location: str):
+        """
+        Params:
+            location: the SQLite database file, created if needed. ':memory:' gives a temporary store.
+        """
+        if location != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(location)), exist_ok=True)
+
+        self.location = location
+
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(location, check_same_thread=False)
+
+        with self._lock, self._connection:
+            self._connection.execute("PRAGMA foreign_keys = ON")
+            if location != ":memory:":
+                # Readers do not block the writer and the other way around
+                self._connection.execute("PRAGMA journal_mode = WAL")
+            self._connection.executescript(_schema)
+
+    def close(self):
+        self._connection.close()
+
+    def __enter__(self) -> "GameStore":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def upsert_games(self, games: Iterable[lol_dto.classes.game.LolGame]) -> List[int]:
+        """Stores games in a single transaction, replacing the stored games with the same source ids.
+
+        Returns:
+            The store ids of the games.
+        """
+        with self._lock, self._connection:
+            return [self._upsert_game(game) for game in games]
+
+    def upsert_series(self, series: LolSeries, key: str = None) -> int:
+        """Stores a series and its games.
+
+        Params:
+            series: the LolSeries.
+            key: what identifies the series, like the QQ bmid. Defaults to the source ids of its games.
+
+        Returns:
+            The store id of the series.
+        """
+        if key is None:
+            key = ",".join(
+                f"{source}:{source_key}" for game in series["games"] for source, source_key in source_keys(game)
+            )
+
+        with self._lock, self._connection:
+            game_ids = [self._upsert_game(game) for game in series["games"]]
+
+            self._connection.execute(
+                "INSERT INTO series (key, score, winner) VALUES (?, ?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET score = excluded.score, winner = excluded.winner",
+                (key, json.dumps(series["score"]) if "score" in series else None, series.get("winner")),
+            )
+            (series_id,) = self._connection.execute("SELECT id FROM series WHERE key = ?", (key,)).fetchone()
+
+            self._connection.execute("DELETE FROM series_games WHERE series_id = ?", (series_id,))
+            self._connection.executemany(
+                "INSERT INTO series_games (series_id, position, game_id) VALUES (?, ?, ?)",
+                [(series_id, position, game_id) for position, game_id in enumerate(game_ids)],
+            )
+
+        return series_id
+
+    def get_game(self, source: str, key: Any) -> Optional[lol_dto.classes.game.LolGame]:
+        """Returns a game from one of its source ids, like get_game('qq', 7802), or None if it is not stored.
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT data FROM games JOIN game_sources ON game_sources.game_id = games.id "
+                "WHERE game_sources.source = ? AND game_sources.key = ?",
+                (source, str(key)),
+            ).fetchone()
+
+        return json_codec.loads(row[0]) if row else None
+
+    def get_series(self, key: str) -> Optional[LolSeries]:
+        """Returns a series stored with upsert_series, or None if it is not stored.
+        """
+        with self._lock:
+            row = self._connection.execute("SELECT id, score, winner FROM series WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+
+            games = self._connection.execute(
+                "SELECT data FROM series_games JOIN games ON games.id = series_games.game_id "
+                "WHERE series_games.series_id = ? ORDER BY series_games.position",
+                (row[0],),
+            ).fetchall()
+
+        series = LolSeries(games=[json_codec.loads(data) for data, in games])
+
+        # Series of live games have no score nor winner, and older stores saved a missing score as null
+        score = json_codec.loads(row[1]) if row[1] is not None else None
+        if score is not None:
+            series["score"] = score
+        if row[2] is not None:
+            series["winner"] = row[2]
+
+        return series
+
+    def find_games(
+        self,
+        team: str = None,
+        patch: str = None,
+        player: Tuple[str, str, Any] = None,
+        start_from: Union[str, datetime.datetime] = None,
+        start_to: Union[str, datetime.datetime] = None,
+        limit: int = None,
+    ) -> List[lol_dto.classes.game.LolGame]:
+        """Returns the stored games matching all the given criteria, ordered by start date.
+
+        Params:
+            team: a team name.
+            patch: a MM.mm patch.
+            player: a (source, field, value) player unique identifier, like ('qq', 'accountId', 200001160).
+            start_from: the earliest start date, included, naive dates being UTC.
+            start_to: the latest start date, excluded, naive dates being UTC.
+            limit: the maximum number of games to return.
+        """
+        conditions, parameters = [], []
+
+        if team is not None:
+            conditions.append("games.id IN (SELECT game_id FROM teams WHERE name = ?)")
+            parameters.append(team)
+
+        if player is not None:
+            conditions.append(
+                "games.id IN (SELECT game_id FROM player_identifiers WHERE source = ? AND field = ? AND value = ?)"
+            )
+            parameters.extend((player[0], player[1], str(player[2])))
+
+        if patch is not None:
+            conditions.append("games.patch = ?")
+            parameters.append(patch)
+
+        if start_from is not None:
+            conditions.append("games.start_utc >= ?")
+            parameters.append(_utc(start_from))
+
+        if start_to is not None:
+            conditions.append("games.start_utc < ?")
+            parameters.append(_utc(start_to))
+
+        query = "SELECT data FROM games"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY games.start_utc, games.id"
+
+        if limit is not None:
+            query += " LIMIT ?"
+            parameters.append(limit)
+
+        with self._lock:
+            rows = self._connection.execute(query, parameters).fetchall()
+
+        return [json_codec.loads(data) for data, in rows]
+
+    def _upsert_game(self, game: lol_dto.classes.game.LolGame) -> int:
+        keys = source_keys(game)
+        if not keys:
+            raise ValueError("Games need at least one source id to be stored")
+
+        # Games stored separately from different sources are merged into the one stored first
+        game_ids = set()
+        for source, key in keys:
+            row = self._connection.execute(
+                "SELECT game_id FROM game_sources WHERE source = ? AND key = ?", (source, key)
+            ).fetchone()
+
+            if row is not None:
+                game_ids.add(row[0])
+
+        if game_ids:
+            # The new game only replaces the stored sources it has, older games taking precedence for the other ones
+            stored_sources = {}
+            for (sources,) in self._connection.execute(
+                f"SELECT json_extract(data, '$.sources') FROM games WHERE id IN ({', '.join('?' * len(game_ids))}) "
+                "ORDER BY id DESC",
+                sorted(game_ids),
+            ):
+                stored_sources.update(json_codec.loads(sources) if sources else {})
+
+            game = {**game, "sources": {**stored_sources, **game["sources"]}}
+            keys = source_keys(game)
+
+        values = (_utc(game.get("start")), game.get("patch"), json_codec.dumps(game).decode("utf-8"))
+
+        game_id = min(game_ids, default=None)
+
+        for duplicate_id in game_ids - {game_id}:
+            # Series keep their games, and the other rows of the duplicate are deleted with it
+            self._connection.execute("UPDATE series_games SET game_id = ? WHERE game_id = ?", (game_id, duplicate_id))
+            self._connection.execute("DELETE FROM games WHERE id = ?", (duplicate_id,))
+
+        if game_id is None:
+            game_id = self._connection.execute(
+                "INSERT INTO games (start_utc, patch, data) VALUES (?, ?, ?)", values
+            ).lastrowid
+        else:
+            self._connection.execute(
+                "UPDATE games SET start_utc = ?, patch = ?, data = ? WHERE id = ?", (*values, game_id)
+            )
+
+            for table in "game_sources", "teams", "player_identifiers":
+                self._connection.execute(f"DELETE FROM {table} WHERE game_id = ?", (game_id,))
+
+        self._connection.executemany(
+            "INSERT OR REPLACE INTO game_sources (game_id, source, key) VALUES (?, ?, ?)",
+            [(game_id, source, key) for source, key in keys],
+        )
+
+        teams = game.get("teams", {})
+        self._connection.executemany(
+            "INSERT INTO teams (game_id, side, name) VALUES (?, ?, ?)",
+            [(game_id, side, team.get("name")) for side, team in teams.items()],
+        )
+
+        self._connection.executemany(
+            "INSERT INTO player_identifiers (game_id, source, field, value) VALUES (?, ?, ?, ?)",
+            [
+                (game_id, source, field, str(value))
+                for team in teams.values()
+                for player in team.get("players", [])
+                for source, identifiers in player.get("uniqueIdentifiers", {}).items()
+                for field, value in identifiers.items()
+            ],
+        )
+
+        return game_id
@@ -0,0 +1,116 @@
+import importlib
+import json
+from typing import Any, BinaryIO, Iterable, Union
+
+from lol_esports_parser.dto.series_dto import LolSeries
+
+# Faster backends are used when installed, in order of preference
+# They can be installed with pip install lol_esports_parser[fast_json]
+backends = ("orjson", "ujson", "json")
+
+backend: str = None
+_loads = None
+_dumps = None
+
+
+def set_backend(name: str = None):
+    """Selects the JSON backend, the fastest installed one if None.
+
+    Raises:
+        ImportError: the backend is not installed.
+    """
+    global backend, _loads, _dumps
+
+    if name is None:
+        for name in backends:
+            try:
+                importlib.import_module(name)
+                break
+            except ImportError:
+                continue
+
+    module = importlib.import_module(name)
+
+    if name == "orjson":
+        options = module.OPT_NON_STR_KEYS
+
+        def dumps(value, indent: bool) -> bytes:
+            return module.dumps(value, option=options | module.OPT_INDENT_2 if indent else options)
+
+        loads = module.loads
+
+    elif name == "ujson":
+
+        def dumps(value, indent: bool) -> bytes:
+            return module.dumps(
+                value, ensure_ascii=False, escape_forward_slashes=False, indent=2 if indent else 0
+            ).encode("utf-8")
+
+        loads = module.loads
+
+    elif name == "json":
+
+        def dumps(value, indent: bool) -> bytes:
+            if indent:
+                return json.dumps(value, ensure_ascii=False, indent=2).encode("utf-8")
+            return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+        loads = json.loads
+
+    else:
+        raise ImportError(f"Unknown JSON backend {name}")
+
+    backend, _loads, _dumps = name, loads, dumps
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """Decodes a JSON document, directly from the raw bytes of a response or a file.
+
+    Raises:
+        ValueError: the document is not valid JSON, every backend raising a subclass of it.
+    """
+    return _loads(data)
+
+
+def dumps(value, indent: bool = False) -> bytes:
+    """Encodes a value as UTF-8 JSON, compact unless indent is True, non-ASCII characters being kept as they are.
+    """
+    return _dumps(value, indent)
+
+
+def write_series(series: LolSeries, file: BinaryIO):
+    """Writes a LolSeries as compact JSON one game at a time, so the whole document is never held in memory.
+
+    Params:
+        series: the LolSeries.
+        file: a file opened in binary mode.
+    """
+    file.write(b"{")
+    for key, value in series.items():
+        if key != "games":
+            file.write(_dumps(key, False) + b":" + _dumps(value, False) + b",")
+
+    file.write(b'"games":[')
+    for index, game in enumerate(series.get("games", [])):
+        if index:
+            file.write(b",")
+        file.write(_dumps(game, False))
+    file.write(b"]}")
+
+
+def write_ndjson(items: Iterable, file: BinaryIO, flush: bool = False):
+    """Writes items as NDJSON, one compact JSON document per line.
+
+    Params:
+        items: the items, like the games and summary yielded by stream_qq_series.
+        file: a file opened in binary mode.
+        flush: whether or not to flush the file after every line, for readers following it live.
+    """
+    for item in items:
+        file.write(_dumps(item, False) + b"\n")
+
+        if flush:
+            file.flush()
+
+
+set_backend()
@@ -0,0 +1,202 @@
+import asyncio
+import contextlib
+from typing import Iterable, Iterator, AsyncIterator, List, NamedTuple, Optional, Union
+
+from lol_esports_parser.dto.series_dto import LolSeries, create_series
+from lol_esports_parser.parsers.http_client import HttpClient, ensure_client
+from lol_esports_parser.parsers.qq.qq_access import get_qq_games_list
+from lol_esports_parser.parsers.qq.qq_parser import parse_qq_game_async
+from lol_esports_parser.parsers.riot.riot_parser import get_riot_game_async
+from lol_esports_parser.parsers.streaming import iterate_sync
+from lol_esports_parser.parsers.transform_pool import TransformPool
+
+
+class QQSeriesJob(NamedTuple):
+    qq_match_url: str  # Any URL with bmid=xxx in its query
+    patch: str = None
+
+
+class RiotSeriesJob(NamedTuple):
+    mh_url_list: List[str]
+
+
+class BulkResult(NamedTuple):
+    job: Union[QQSeriesJob, RiotSeriesJob]  # The input itself if it could not be cast to a job
+    series: Optional[LolSeries]  # None if no game could be retrieved
+    errors: List[Exception]  # Exceptions raised while retrieving the series or its games
+
+
+def to_job(item: Union[QQSeriesJob, RiotSeriesJob, str, int, list, tuple]) -> Union[QQSeriesJob, RiotSeriesJob]:
+    """Casts a bulk input to a job.
+
+    Params:
+        item: a job, a QQ match URL, a QQ bmid, a match history URL, or a list of match history URLs.
+    """
+    if isinstance(item, (QQSeriesJob, RiotSeriesJob)):
+        return item
+
+    if isinstance(item, int):
+        return QQSeriesJob(f"https://lpl.qq.com/es/stats.shtml?bmid={item}")
+
+    if isinstance(item, str):
+        if "bmid=" in item:
+            return QQSeriesJob(item)
+        if "match-details" in item:
+            return RiotSeriesJob([item])
+
+    if isinstance(item, (list, tuple)):
+        return RiotSeriesJob(list(item))
+
+    raise ValueError(f"Could not understand bulk input {item}")
+
+
+def get_series_bulk(
+    items: Iterable,
+    get_timeline: bool = False,
+    add_names: bool = True,
+    max_connections: int = 64,
+    max_connections_per_host: int = 16,
+    max_series: int = None,
+    max_threads: int = 8,
+    transform_processes: int = None,
+) -> Iterator[BulkResult]:
+    """Retrieves many series on a single scheduler and yields them as they finish.
+
+    All series share one event loop, one connection pool and one thread pool, so the total concurrency stays bounded
+    however many series are requested.
+
+    Params:
+        items: QQ match URLs, QQ bmids, match history URLs, lists of match history URLs, or jobs.
+        get_timeline: whether or not to query the /timeline/ endpoints for Riot games.
+        add_names: whether or not to add champions/items/runes names next to their objects through lol_id_tools.
+        max_connections: maximum number of simultaneous HTTP connections.
+        max_connections_per_host: maximum number of simultaneous HTTP connections to a single host.
+        max_series: maximum number of series being retrieved at the same time, defaults to max_connections.
+        max_threads: size of the thread pool used for synchronous calls (ddragon, Riot API).
+        transform_processes: if set, payloads are transformed into games by this many worker processes, so parsing
+            scales with cores instead of sharing the GIL with the I/O. Scripts using it need an
+            if __name__ == "__main__" guard as workers are spawned.
+
+    Returns:
+        A BulkResult for every input, in order of completion.
+    """
+    return iterate_sync(
+        lambda: get_series_bulk_async(
+            items,
+            get_timeline,
+            add_names,
+            max_connections,
+            max_connections_per_host,
+            max_series,
+            transform_processes=transform_processes,
+        ),
+        max_size=max_connections,
+        max_threads=max_threads,
+    )
+
+
+async def get_series_bulk_async(
+    items: Iterable,
+    get_timeline: bool = False,
+    add_names: bool = True,
+    max_connections: int = 64,
+    max_connections_per_host: int = 16,
+    max_series: int = None,
+    client: HttpClient = None,
+    transform_processes: int = None,
+) -> AsyncIterator[BulkResult]:
+    """Asynchronous version of get_series_bulk.
+
+    Params:
+        client: the HttpClient to use for the queries, a client respecting the connection limits is created if None.
+    """
+    max_series = max_series or max_connections
+    items = iter(items)
+    transform_pool = TransformPool(transform_processes, add_names=add_names) if transform_processes else None
+
+    async with ensure_client(
+        client, limit=max_connections, limit_per_host=max_connections_per_host
+    ) as client, contextlib.AsyncExitStack() as stack:
+        if transform_pool is not None:
+            await stack.enter_async_context(transform_pool)
+
+        jobs = _run_jobs(client, items, get_timeline, add_names, max_series, transform_pool)
+
+        try:
+            async for result in jobs:
+                yield result
+        finally:
+            # Closing the jobs cancels the pending ones now instead of when the generator is garbage collected
+            await jobs.aclose()
+
+
+async def _run_jobs(
+    client: HttpClient,
+    items: Iterator,
+    get_timeline: bool,
+    add_names: bool,
+    max_series: int,
+    transform_pool: Optional[TransformPool],
+) -> AsyncIterator[BulkResult]:
+    pending = set()
+
+    # None could be an item, even if invalid, so the end of the items is told apart with its own object
+    end = object()
+
+    try:
+        while True:
+            # Jobs are only started when there is room for them, so huge inputs are consumed lazily
+            while len(pending) < max_series:
+                item = next(items, end)
+                if item is end:
+                    break
+
+                pending.add(asyncio.ensure_future(_run_job(client, item, get_timeline, add_names, transform_pool)))
+
+            if not pending:
+                break
+
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+
+            for task in done:
+                yield task.result()
+
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+async def _run_job(
+    client: HttpClient,
+    item,
+    get_timeline: bool,
+    add_names: bool,
+    transform_pool: Optional[TransformPool],
+) -> BulkResult:
+    job = item
+
+    try:
+        # Invalid inputs only fail their own result instead of the whole retrieval
+        job = to_job(item)
+
+        if isinstance(job, QQSeriesJob):
+            game_id_list = await get_qq_games_list(client, job.qq_match_url)
+            games_coroutines = [
+                parse_qq_game_async(int(g["sMatchId"]), job.patch, add_names, client, transform_pool=transform_pool)
+                for g in game_id_list
+            ]
+        else:
+            games_coroutines = [
+                get_riot_game_async(mh_url, get_timeline, add_names, client=client, transform_pool=transform_pool)
+                for mh_url in job.mh_url_list
+            ]
+
+    except Exception as e:
+        return BulkResult(job, None, [e])
+
+    results = await asyncio.gather(*games_coroutines, return_exceptions=True)
+
+    games = [r for r in results if not isinstance(r, Exception)]
+    errors = [r for r in results if isinstance(r, Exception)]
+
+    return BulkResult(job, create_series(games) if games else None, errors)
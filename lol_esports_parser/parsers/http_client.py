@@ -0,0 +1,104 @@
+import asyncio
+from concurrent.futures.thread import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import NamedTuple, Optional, Coroutine, TypeVar
+
+import aiohttp
+
+from lol_esports_parser import json_codec
+
+T = TypeVar("T")
+
+
+class HttpResponse(NamedTuple):
+    status: int
+    headers: dict
+    body: bytes
+
+    def json(self):
+        return json_codec.loads(self.body)
+
+
+class HttpStatusError(aiohttp.ClientError):
+    """Raised for server errors, which are retried like connection errors.
+    """
+
+
+class HttpRequestError(Exception):
+    """Raised for other unsuccessful statuses, like 404, which are not retried as they would fail again.
+    """
+
+
+class HttpClient:
+    """Asynchronous HTTP client sharing a single connection pool between all the queries it makes.
+
+    One client should be shared by all the games retrieved from the same event loop.
+    """
+
+    def __init__(self, limit: int = 100, limit_per_host: int = 0):
+        """
+        Params:
+            limit: maximum number of simultaneous connections.
+            limit_per_host: maximum number of simultaneous connections to the same host, 0 meaning no limit.
+        """
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        # The session is created lazily as it has to be created from inside the event loop
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.limit, limit_per_host=self.limit_per_host)
+            self._session = aiohttp.ClientSession(connector=connector)
+
+        return self._session
+
+    async def get(self, url: str, headers: dict = None) -> HttpResponse:
+        async with self.session.get(url, headers=headers) as response:
+            return HttpResponse(response.status, dict(response.headers), await response.read())
+
+    async def post(self, url: str, data: dict = None, headers: dict = None) -> HttpResponse:
+        async with self.session.post(url, data=data, headers=headers) as response:
+            return HttpResponse(response.status, dict(response.headers), await response.read())
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+
+@asynccontextmanager
+async def ensure_client(client: Optional[HttpClient], **client_kwargs):
+    """Yields the given client, or a temporary one closed on exit if it is None.
+
+    Params:
+        client: the client to use.
+        client_kwargs: arguments used to create the temporary client.
+    """
+    if client is not None:
+        yield client
+        return
+
+    async with HttpClient(**client_kwargs) as temporary_client:
+        yield temporary_client
+
+
+def run_sync(coroutine: Coroutine[None, None, T]) -> T:
+    """Runs a coroutine to completion from synchronous code.
+
+    If an event loop is already running in the calling thread, the coroutine is run in its own loop in another thread.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coroutine)
+
+    with ThreadPoolExecutor(1) as executor:
+        return executor.submit(asyncio.run, coroutine).result()
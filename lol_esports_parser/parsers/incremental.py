@@ -0,0 +1,139 @@
+import asyncio
+import hashlib
+import json
+import logging
+from typing import Awaitable, Callable, Dict, List, Optional, Union
+
+import lol_dto
+
+from lol_esports_parser.dto.series_dto import LolSeries, create_series
+
+
+class SeriesState:
+    """What refreshing a series needs to know about the previous refresh.
+
+    Games are identified by a key, the QQ game id or platform/game id for Riot games, and each key has the hash of
+    its entry in the games list, so games are only parsed again if their entry changed. Games that could not be
+    parsed yet, usually because they are still being played, are retried at the next refresh.
+
+    States can be kept between processes as tokens with to_token and from_token.
+    """
+
+    def __init__(
+        self,
+        keys: List[str] = None,
+        games: Dict[str, lol_dto.classes.game.LolGame] = None,
+        entries: Dict[str, str] = None,
+        validators: dict = None,
+    ):
+        """
+        Params:
+            keys: the keys of all the games of the series, in order.
+            games: {key: LolGame} for the games that were parsed.
+            entries: {key: hash of the game entry in the games list}.
+            validators: what tells if the games list changed, like its ETag.
+        """
+        self.keys = keys or []
+        self.games = games or {}
+        self.entries = entries or {}
+        self.validators = validators or {}
+
+        # Keys of the games parsed by the refresh that returned this state
+        self.updated_keys: List[str] = []
+
+    @property
+    def series(self) -> LolSeries:
+        return create_series([self.games[key] for key in self.keys if key in self.games])
+
+    @property
+    def complete(self) -> bool:
+        """Whether or not all the games in the games list were parsed.
+        """
+        return all(key in self.games for key in self.keys)
+
+    @classmethod
+    def from_series(cls, series: LolSeries, game_key: Callable[[lol_dto.classes.game.LolGame], str]) -> "SeriesState":
+        """Creates a state from a previously returned LolSeries, whose games are then not parsed again.
+        """
+        games = {game_key(game): game for game in series.get("games", [])}
+        return cls(list(games), games)
+
+    def to_token(self) -> str:
+        return json.dumps(
+            {"keys": self.keys, "games": self.games, "entries": self.entries, "validators": self.validators},
+            ensure_ascii=False,
+        )
+
+    @classmethod
+    def from_token(cls, token: str) -> "SeriesState":
+        return cls(**json.loads(token))
+
+
+def entry_hash(entry) -> str:
+    """Returns a hash of a JSON-serializable games list entry.
+    """
+    return hashlib.sha1(json.dumps(entry, sort_keys=True).encode()).hexdigest()
+
+
+def as_state(
+    previous: Union[SeriesState, LolSeries, None], game_key: Callable[[lol_dto.classes.game.LolGame], str]
+) -> SeriesState:
+    if previous is None:
+        return SeriesState()
+
+    if isinstance(previous, SeriesState):
+        return previous
+
+    return SeriesState.from_series(previous, game_key)
+
+
+async def refresh_games(
+    previous: SeriesState,
+    entries: Optional[Dict[str, str]],
+    validators: dict,
+    parse_game: Callable[[str, bool], Awaitable[lol_dto.classes.game.LolGame]],
+) -> SeriesState:
+    """Parses the new, changed and previously failed games of a series, and returns the new state.
+
+    Params:
+        previous: the previous state.
+        entries: {key: entry hash} of the current games list in order, None if the list did not change.
+        validators: the validators of the current games list.
+        parse_game: coroutine function taking a key and whether the payloads cached for it may be outdated, because
+            its entry changed or it could not be parsed before, returning the game.
+    """
+    if entries is None:
+        entries = {key: previous.entries.get(key) for key in previous.keys}
+
+    # Games parsed from a previous LolSeries have no entry hash and are kept
+    changed_keys = {
+        key
+        for key, entry in entries.items()
+        if key in previous.games and previous.entries.get(key) not in (None, entry)
+    }
+    keys_to_parse = [key for key in entries if key not in previous.games or key in changed_keys]
+
+    state = SeriesState(
+        list(entries),
+        {key: game for key, game in previous.games.items() if key in entries and key not in changed_keys},
+        {key: entry for key, entry in entries.items() if entry is not None},
+        validators,
+    )
+
+    results = await asyncio.gather(
+        *(parse_game(key, key in changed_keys or key in previous.keys) for key in keys_to_parse),
+        return_exceptions=True,
+    )
+
+    for key, result in zip(keys_to_parse, results):
+        if isinstance(result, asyncio.CancelledError):
+            raise result
+
+        if isinstance(result, Exception):
+            logging.warning(f"Game {key} could not be parsed yet, it will be retried at the next refresh: {result!r}")
+            continue
+
+        state.games[key] = result
+        state.updated_keys.append(key)
+
+    return state
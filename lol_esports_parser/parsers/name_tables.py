@@ -0,0 +1,177 @@
+import asyncio
+import json
+import logging
+import os
+import threading
+from concurrent.futures.thread import ThreadPoolExecutor
+from typing import Callable, Dict, TypeVar
+
+import lol_dto
+
+object_types = ("champion", "item", "rune", "summoner_spell")
+
+T = TypeVar("T")
+
+
+class NameTables:
+    """Id to name tables for champions, items, runes and summoner spells, built once from lol_id_tools data.
+
+    Tables are plain {object type: {id: name}} dictionaries that are only read once built, so they can be pickled to
+    worker processes, inherited through fork, or saved to a file and loaded by every worker. Ids missing from the
+    tables go through lol_id_tools, which reloads its data, and are then added to them.
+
+    lol_id_tools only knows the latest patch, so names are not per patch. Rune trees per patch come from the
+    RuneTreeHandler instead.
+    """
+
+    def __init__(self, tables: Dict[str, Dict[int, str]] = None, locale: str = "en_US"):
+        """
+        Params:
+            tables: {object type: {id: name}}, built from lol_id_tools when first needed if None.
+            locale: the locale of the names.
+        """
+        self._tables = tables
+        self.locale = locale
+
+        self._lock = threading.Lock()
+
+    @property
+    def tables(self) -> Dict[str, Dict[int, str]]:
+        if self._tables is None:
+            with self._lock:
+                if self._tables is None:
+                    self._tables = self._build_tables()
+
+        return self._tables
+
+    def __getstate__(self):
+        # Locks cannot be pickled, so processes receiving the tables get their own
+        return {"tables": self.tables, "locale": self.locale}
+
+    def __setstate__(self, state):
+        self.__init__(state["tables"], state["locale"])
+
+    def _build_tables(self) -> Dict[str, Dict[int, str]]:
+        # lol_id_tools is slow to import and loads its data from disk or ddragon, so it is only imported here
+        import lol_id_tools
+        from lol_id_tools.lol_id_tools import lod
+
+        # Makes lol_id_tools load the locale if it is missing
+        _outside_event_loop(lol_id_tools.get_name, 1, self.locale, object_type="champion")
+
+        tables = {object_type: {} for object_type in object_types}
+        for object_id, names in lod.loaded_data[self.locale].items():
+            for object_type, name in names.items():
+                tables[object_type][object_id] = name
+
+        logging.debug(f"Name tables built with {sum(len(t) for t in tables.values())} {self.locale} names")
+
+        return tables
+
+    def get_name(self, object_id: int, object_type: str) -> str:
+        """Returns the name of an object, like lol_id_tools.get_name but without any computation for known ids.
+
+        Params:
+            object_id: the Riot id of the object, 0 or less meaning no object.
+            object_type: 'champion', 'item', 'rune' or 'summoner_spell'.
+
+        Raises:
+            KeyError: the object was not found, even after reloading lol_id_tools data.
+        """
+        try:
+            return self._tables[object_type][object_id]
+        except (KeyError, TypeError):
+            # TypeError means the tables are not built yet
+            pass
+
+        table = self.tables[object_type]
+        if object_id in table:
+            return table[object_id]
+
+        object_id = int(object_id)
+        if object_id <= 0:
+            return ""
+
+        import lol_id_tools
+
+        # Transforms run in parallel threads, and a missing id should only reload lol_id_tools data once
+        with self._lock:
+            if object_id not in table:
+                table[object_id] = _outside_event_loop(
+                    lol_id_tools.get_name, object_id, self.locale, object_type=object_type, retry=True
+                )
+
+        return table[object_id]
+
+    def add_names(self, game: lol_dto.classes.game.LolGame) -> lol_dto.classes.game.LolGame:
+        """Adds the names of champions, bans, rune trees, runes, items and summoner spells of a game, in place.
+        """
+        champions, items, runes, summoner_spells = (self.tables[object_type] for object_type in object_types)
+
+        for team in game.get("teams", {}).values():
+            if "bans" in team:
+                team["bansNames"] = [self._lookup(champions, ban, "champion") for ban in team["bans"]]
+
+            for player in team.get("players", []):
+                if "championId" in player:
+                    player["championName"] = self._lookup(champions, player["championId"], "champion")
+
+                # Rune trees are in the runes table
+                for tree_field in ("primaryRuneTree", "secondaryRuneTree"):
+                    if f"{tree_field}Id" in player:
+                        player[f"{tree_field}Name"] = self._lookup(runes, player[f"{tree_field}Id"], "rune")
+
+                for objects, table, object_type in (
+                    (player.get("runes", ()), runes, "rune"),
+                    (player.get("summonerSpells", ()), summoner_spells, "summoner_spell"),
+                    (player.get("endOfGameStats", {}).get("items", ()), items, "item"),
+                    (player.get("itemsEvents", ()), items, "item"),
+                ):
+                    for lol_object in objects:
+                        lol_object["name"] = self._lookup(table, lol_object["id"], object_type)
+
+        return game
+
+    def _lookup(self, table: Dict[int, str], object_id: int, object_type: str) -> str:
+        name = table.get(object_id)
+        return self.get_name(object_id, object_type) if name is None else name
+
+    def save(self, location: str):
+        """Saves the tables to a JSON file, to be loaded by other processes without lol_id_tools.
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(location)), exist_ok=True)
+
+        temporary_location = f"{location}.{os.getpid()}.tmp"
+        with open(temporary_location, "w", encoding="utf-8") as file:
+            json.dump({"locale": self.locale, "tables": self.tables}, file, ensure_ascii=False)
+        os.replace(temporary_location, location)
+
+    def load(self, location: str) -> "NameTables":
+        """Replaces the tables with tables saved with save, for example in default_name_tables of worker processes.
+        """
+        with open(location, encoding="utf-8") as file:
+            data = json.load(file)
+
+        # JSON keys are strings
+        self._tables = {
+            object_type: {int(object_id): name for object_id, name in table.items()}
+            for object_type, table in data["tables"].items()
+        }
+        self.locale = data["locale"]
+
+        return self
+
+
+def _outside_event_loop(fn: Callable[..., T], *args, **kwargs) -> T:
+    # lol_id_tools loads its data with asyncio.run, which cannot be called from a thread running an event loop
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return fn(*args, **kwargs)
+
+    with ThreadPoolExecutor(1) as executor:
+        return executor.submit(fn, *args, **kwargs).result()
+
+
+# Shared by the QQ and Riot parsers
+default_name_tables = NameTables()
@@ -1,31 +1,145 @@
-import json
+import hashlib
 import logging
-import time
 import urllib.parse
-import warnings
+from typing import Optional, Tuple
 
-import requests
+from lol_esports_parser import json_codec
+from lol_esports_parser.config import get_endpoints
+from lol_esports_parser.parsers import telemetry
+from lol_esports_parser.parsers.http_client import HttpClient, HttpRequestError, HttpResponse, HttpStatusError
+from lol_esports_parser.parsers.rate_limiter import rate_limiter, retry_after
+from lol_esports_parser.parsers.response_cache import response_cache
+from lol_esports_parser.parsers.retry_policy import RetryPolicy, network_errors
 
-from lol_esports_parser.config import endpoints
+# QQ endpoints regularly stall or return empty payloads, so slow requests are hedged past the 95th percentile
+retry_policy = RetryPolicy(attempts=3, timeout=20, hedge_percentile=95)
 
 
-def get_qq_games_list(qq_match_url) -> list:
+async def _request(client: HttpClient, url: str, endpoint: str, headers: dict = None) -> HttpResponse:
+    """Returns the response of a QQ endpoint, endpoint being its name in telemetry.
+    """
+    bucket = ("host", urllib.parse.urlsplit(url).netloc)
+
+    async def limited_request():
+        await rate_limiter.acquire_async(bucket)
+        return await telemetry.timed_request(endpoint, client.get(url, headers=headers))
+
+    logging.debug(f"Querying {url}")
+    response = await retry_policy.request(limited_request, endpoint)
+
+    if response.status == 429:
+        rate_limiter.block(retry_after(response.headers), bucket)
+
+    if response.status >= 500 or response.status == 429:
+        raise HttpStatusError(f"Status code {response.status} for {url}")
+
+    # 304 only answers the validators sent by get_qq_games_list_if_changed
+    if not 200 <= response.status < 300 and response.status != 304:
+        raise HttpRequestError(f"Status code {response.status} for {url}")
+
+    return response
+
+
+def _message(payload: bytes, nested: bool = False):
+    """Returns the msg field of a QQ payload, decoded again if nested, as QQ sends some of them as JSON strings.
+
+    Raises:
+        TypeError: the message is not a dict or a list, like the "not found" or empty messages of errors, so that
+            they are never cached.
+    """
+    message = json_codec.loads(payload)["msg"]
+    if nested:
+        message = json_codec.loads(message)
+
+    if not isinstance(message, (dict, list)):
+        raise TypeError(f"QQ returned {message!r} instead of a payload")
+
+    return message
+
+
+async def _query(client: HttpClient, url: str, endpoint: str) -> bytes:
+    """Returns the raw payload of a QQ endpoint, endpoint being its name in telemetry.
+    """
+    return (await _request(client, url, endpoint)).body
+
+
+def _get_qq_match_id(qq_match_url: str) -> str:
+    # Relies on having bmid=xxx in the URL
+    parsed_url = urllib.parse.urlparse(qq_match_url)
+    return urllib.parse.parse_qs(parsed_url.query)["bmid"][0]
+
+
+async def get_qq_games_list(client: HttpClient, qq_match_url) -> list:
     """Gets a games list from a QQ series match history URL.
 
     Relies on having bmid=xxx in the URL.
     """
-    parsed_url = urllib.parse.urlparse(qq_match_url)
-    qq_match_id = urllib.parse.parse_qs(parsed_url.query)["bmid"][0]
+    qq_match_id = _get_qq_match_id(qq_match_url)
+    games_list_query_url = f"{get_endpoints()['qq']['match_list']}{qq_match_id}"
+
+    return await retry_policy.call(
+        lambda: response_cache.fetch(
+            "qq_match_list",
+            (qq_match_id,),
+            lambda: _query(client, games_list_query_url, "qq_match_list"),
+            _message,
+        ),
+        endpoint="qq_match_list",
+    )
+
 
-    games_list_query_url = f"{endpoints['qq']['match_list']}{qq_match_id}"
+async def get_qq_games_list_if_changed(
+    client: HttpClient, qq_match_url, validators: dict = None
+) -> Tuple[Optional[list], dict]:
+    """Gets a games list from a QQ series match history URL, only if it changed since validators were returned.
 
-    logging.debug(f"Querying {games_list_query_url}")
-    response = requests.get(games_list_query_url)
+    The list is always queried, bypassing the response cache, and refreshes it. The ETag and Last-Modified values
+    QQ returned are sent back for the server to answer 304 Not Modified, and a hash of the payload is compared
+    otherwise.
 
-    return response.json()["msg"]
+    Params:
+        validators: the validators returned with the previous list, None to always get the list.
+
+    Returns:
+        games_list, validators
+
+        games_list is None if it did not change.
+    """
+    validators = validators or {}
+
+    qq_match_id = _get_qq_match_id(qq_match_url)
+    games_list_query_url = f"{get_endpoints()['qq']['match_list']}{qq_match_id}"
+
+    headers = {}
+    if validators.get("etag"):
+        headers["If-None-Match"] = validators["etag"]
+    if validators.get("last_modified"):
+        headers["If-Modified-Since"] = validators["last_modified"]
+
+    response = await retry_policy.call(
+        lambda: _request(client, games_list_query_url, "qq_match_list", headers), endpoint="qq_match_list"
+    )
+
+    if response.status == 304:
+        return None, validators
+
+    response_headers = {name.lower(): value for name, value in response.headers.items()}
+    new_validators = {
+        "etag": response_headers.get("etag"),
+        "last_modified": response_headers.get("last-modified"),
+        "hash": hashlib.sha1(response.body).hexdigest(),
+    }
+
+    if new_validators["hash"] == validators.get("hash"):
+        return None, new_validators
 
+    games_list = _message(response.body)
+    response_cache.set("qq_match_list", (qq_match_id,), response.body)
 
-def get_all_qq_game_info(qq_game_id: int) -> tuple:
+    return games_list, new_validators
+
+
+async def get_all_qq_game_info(client: HttpClient, qq_game_id: int) -> tuple:
     """Queries all QQ endpoints sequentially to gather all available information.
 
     Params:
@@ -36,67 +150,67 @@ def get_all_qq_game_info(qq_game_id: int) -> tuple:
 
         team_info and and runes will be empty if the endpoints are empty.
     """
-    game_info = get_basic_qq_game_info(qq_game_id)
+    game_info = await get_basic_qq_game_info(client, qq_game_id)
 
     qq_server_id = int(game_info["sMatchInfo"]["AreaId"])
     qq_battle_id = int(game_info["sMatchInfo"]["BattleId"])
 
     # TODO Handle this endpoint not working
-    team_info = get_team_info(qq_server_id, qq_battle_id)
+    team_info = await get_team_info(client, qq_server_id, qq_battle_id)
 
     if team_info:
         qq_world_id = team_info["world_"]
         qq_room_id = team_info["room_id_"]
 
-        runes_info = get_runes_info(qq_world_id, qq_room_id)
+        runes_info = await get_runes_info(client, qq_world_id, qq_room_id)
     else:
         runes_info = {}
 
     return game_info, team_info, runes_info, qq_server_id, qq_battle_id
 
 
-def get_basic_qq_game_info(qq_game_id: int, retry=True) -> dict:
+async def get_basic_qq_game_info(client: HttpClient, qq_game_id: int) -> dict:
     """Gets the basic info about the game, including sides and end of game stats for players.
     """
 
-    game_query_url = f"{endpoints['qq']['match_info']}{qq_game_id}"
-
-    logging.debug(f"Querying {game_query_url}")
-    response = requests.get(game_query_url)
+    game_query_url = f"{get_endpoints()['qq']['match_info']}{qq_game_id}"
 
     try:
-        return response.json()["msg"]
+        # A TypeError means the endpoint returned an empty message, which usually works on a retry
+        return await retry_policy.call(
+            lambda: response_cache.fetch(
+                "qq_match_info",
+                (qq_game_id,),
+                lambda: _query(client, game_query_url, "qq_match_info"),
+                _message,
+            ),
+            retry_on=(TypeError, *network_errors),
+            endpoint="qq_match_info",
+        )
 
     except TypeError:
-        if retry:
-            logging.info("Retrying on faulty game info endpoint.")
-            time.sleep(1)
-            return get_basic_qq_game_info(qq_game_id, False)
-
         raise FileNotFoundError("Game info was not found on the QQ servers")
 
 
-def get_team_info(qq_server_id, qq_battle_id, retry=True) -> dict:
+async def get_team_info(client: HttpClient, qq_server_id, qq_battle_id) -> dict:
     """Gets team-specific information, but also world_id and room_id for runes queries.
     """
-    team_info_url = (
-        endpoints["qq"]["battle_info"].replace("BATTLE_ID", str(qq_battle_id)).replace("WORLD_ID", str(qq_server_id))
-    )
-
-    logging.debug(f"Querying {team_info_url}")
-    response = requests.get(team_info_url)
+    battle_info_endpoint = get_endpoints()["qq"]["battle_info"]
+    team_info_url = battle_info_endpoint.replace("BATTLE_ID", str(qq_battle_id)).replace("WORLD_ID", str(qq_server_id))
 
     try:
-        return json.loads(response.json()["msg"])["battle_list_"][0]
-
-    except (KeyError, TypeError) as e:
-        if retry and type(e) == TypeError:
-            logging.info(
-                f"battle_id {qq_battle_id}:server_id {qq_server_id}:\t" f"Retrying on faulty team info endpoint."
-            )
-            time.sleep(1)
-            return get_team_info(qq_server_id, qq_battle_id, False)
+        return await retry_policy.call(
+            lambda: response_cache.fetch(
+                "qq_battle_info",
+                (qq_server_id, qq_battle_id),
+                lambda: _query(client, team_info_url, "qq_battle_info"),
+                lambda p: _message(p, nested=True)["battle_list_"][0],
+            ),
+            retry_on=(TypeError, *network_errors),
+            endpoint="qq_battle_info",
+        )
 
+    except (KeyError, TypeError):
         logging.warning(
             f"Team information endpoint not returning any information for "
             f"server ID {qq_server_id} and battle id {qq_battle_id}"
@@ -104,25 +218,25 @@ def get_team_info(qq_server_id, qq_battle_id, retry=True) -> dict:
         return {}
 
 
-def get_runes_info(qq_world_id, qq_room_id, retry=True) -> dict:
+async def get_runes_info(client: HttpClient, qq_world_id, qq_room_id) -> dict:
     """Gets runes lists per players.
     """
-    runes_info_url = endpoints["qq"]["runes"].replace("WORLD_ID", str(qq_world_id)).replace("ROOM_ID", str(qq_room_id))
-
-    logging.debug(f"Querying {runes_info_url}")
-    response = requests.get(runes_info_url)
+    runes_endpoint = get_endpoints()["qq"]["runes"]
+    runes_info_url = runes_endpoint.replace("WORLD_ID", str(qq_world_id)).replace("ROOM_ID", str(qq_room_id))
 
     try:
-        return json.loads(response.json()["msg"])["hero_list_"]
-
-    except (KeyError, TypeError) as e:
-        if retry and type(e) == TypeError:
-            logging.info(
-                f"room_id {qq_room_id}:world_id {qq_world_id}:\t" f"Retrying on faulty runes info endpoint."
-            )
-            time.sleep(1)
-            return get_runes_info(qq_world_id, qq_room_id, False)
+        return await retry_policy.call(
+            lambda: response_cache.fetch(
+                "qq_runes",
+                (qq_world_id, qq_room_id),
+                lambda: _query(client, runes_info_url, "qq_runes"),
+                lambda p: _message(p, nested=True)["hero_list_"],
+            ),
+            retry_on=(TypeError, *network_errors),
+            endpoint="qq_runes",
+        )
 
+    except (KeyError, TypeError):
         logging.warning(
             f"Runes information endpoint not returning any information for "
             f"world ID {qq_world_id} and room id {qq_room_id}"
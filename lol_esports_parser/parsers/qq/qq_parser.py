@@ -1,61 +1,322 @@
+import asyncio
 import datetime
-import json
 import logging
-from concurrent.futures.thread import ThreadPoolExecutor
-from json import JSONDecodeError
-from typing import List
+from typing import AsyncIterator, Iterator, List, Optional, Union
 
-import dateparser
-
-import lol_id_tools as lit
 import lol_dto
 
+from lol_esports_parser import json_codec
 from lol_esports_parser.dto.qq_source import SourceQQ
 from lol_esports_parser.dto.series_dto import LolSeries, create_series
-from lol_esports_parser.parsers.qq.qq_access import get_qq_games_list, get_all_qq_game_info
+from lol_esports_parser.parsers.http_client import HttpClient, ensure_client, run_sync
+from lol_esports_parser.parsers.incremental import SeriesState, as_state, entry_hash, refresh_games
+from lol_esports_parser.parsers.name_tables import default_name_tables
+from lol_esports_parser.parsers.qq.qq_access import (
+    get_qq_games_list,
+    get_all_qq_game_info,
+    get_qq_games_list_if_changed,
+)
+from lol_esports_parser.parsers.response_cache import response_cache
 from lol_esports_parser.parsers.rune_tree_handler import RuneTreeHandler
+from lol_esports_parser.parsers.streaming import iterate_sync, stream_games
+from lol_esports_parser.parsers.transform_pool import TransformPool, run_transform
 
 
-rune_tree_handler = RuneTreeHandler()
+default_rune_tree_handler = RuneTreeHandler()
 roles = {"1": "TOP", "5": "JGL", "2": "MID", "3": "BOT", "4": "SUP"}
 
+# QQ dates and times are always given in China Standard Time
+qq_timezone = datetime.timezone(datetime.timedelta(hours=8))
+
 
-def get_qq_series(qq_match_url: str, patch: str = None, add_names: bool = True) -> LolSeries:
+def get_qq_series(
+    qq_match_url: str, patch: str = None, add_names: bool = True, rune_tree_handler: RuneTreeHandler = None
+) -> LolSeries:
     """Returns a LolSeriesDto.
 
     Params:
         qq_url: the qq url of the full match, usually acquired from Leaguepedia.
         get_timeline: whether or not to query the /timeline/ endpoints for the games.
         add_names: whether or not to add champions/items/runes names next to their objects through lol_id_tools.
+        rune_tree_handler: the RuneTreeHandler used to get rune trees, a shared default one is used if None.
 
     Returns:
         A LolSeries.
     """
+    return run_sync(get_qq_series_async(qq_match_url, patch, add_names, rune_tree_handler=rune_tree_handler))
 
-    game_id_list = get_qq_games_list(qq_match_url)
-
-    games_futures = []
-    with ThreadPoolExecutor() as executor:
-        for qq_game_object in game_id_list:
-            games_futures.append(executor.submit(parse_qq_game, int(qq_game_object["sMatchId"]), patch, add_names))
 
-    return create_series([g.result() for g in games_futures])
-
-
-def parse_qq_game(qq_game_id: int, patch: str = None, add_names: bool = True) -> lol_dto.classes.game.LolGame:
+def parse_qq_game(
+    qq_game_id: int, patch: str = None, add_names: bool = True, rune_tree_handler: RuneTreeHandler = None
+) -> lol_dto.classes.game.LolGame:
     """Parses a QQ game and returns a LolGameDto.
 
     Params:
         qq_game_̤d: the qq game id, acquired from qq’s match list endpoint.
         patch: optional patch to include in the object and query rune trees.
         add_names: whether or not to add champions/items/runes names next to their objects through lol_id_tools.
+        rune_tree_handler: the RuneTreeHandler used to get rune trees, a shared default one is used if None.
 
     Returns:
         A LolGameDto.
     """
+    return run_sync(parse_qq_game_async(qq_game_id, patch, add_names, rune_tree_handler=rune_tree_handler))
+
+
+async def get_qq_series_async(
+    qq_match_url: str,
+    patch: str = None,
+    add_names: bool = True,
+    client: HttpClient = None,
+    rune_tree_handler: RuneTreeHandler = None,
+    transform_pool: TransformPool = None,
+) -> LolSeries:
+    """Asynchronous version of get_qq_series.
+
+    Params:
+        client: the HttpClient to use for the queries, a temporary one is created if None.
+        transform_pool: the TransformPool running the transforms, run in the shared transform thread if None.
+    """
+    rune_tree_handler = rune_tree_handler or default_rune_tree_handler
+
+    async with ensure_client(client) as client:
+        # Rune trees do not depend on any QQ payload, so they are loaded while the match list is queried
+        rune_trees = _prefetch_rune_trees(rune_tree_handler, patch)
+
+        game_id_list = await get_qq_games_list(client, qq_match_url)
+
+        # Each game runs its own chain of queries and is parsed as soon as its payloads are complete
+        games = await asyncio.gather(
+            *(
+                _parse_qq_game(
+                    int(g["sMatchId"]), patch, add_names, client, rune_tree_handler, rune_trees, transform_pool
+                )
+                for g in game_id_list
+            )
+        )
+
+    return create_series(list(games))
+
+
+def stream_qq_series(
+    qq_match_url: str, patch: str = None, add_names: bool = True, rune_tree_handler: RuneTreeHandler = None
+) -> Iterator[Union[lol_dto.classes.game.LolGame, LolSeries]]:
+    """Yields the games of a QQ series as soon as they are parsed, then the series summary.
+
+    Params:
+        qq_match_url: the qq url of the full match, usually acquired from Leaguepedia.
+        patch: optional patch to include in the objects and query rune trees.
+        add_names: whether or not to add champions/items/runes names next to their objects through lol_id_tools.
+        rune_tree_handler: the RuneTreeHandler used to get rune trees, a shared default one is used if None.
+
+    Returns:
+        The LolGame of each game in order of completion, then a LolSeries without games holding score and winner.
+    """
+    return iterate_sync(
+        lambda: stream_qq_series_async(qq_match_url, patch, add_names, rune_tree_handler=rune_tree_handler)
+    )
+
+
+async def stream_qq_series_async(
+    qq_match_url: str,
+    patch: str = None,
+    add_names: bool = True,
+    client: HttpClient = None,
+    rune_tree_handler: RuneTreeHandler = None,
+) -> AsyncIterator[Union[lol_dto.classes.game.LolGame, LolSeries]]:
+    """Asynchronous version of stream_qq_series.
+
+    Params:
+        client: the HttpClient to use for the queries, a temporary one is created if None.
+    """
+    rune_tree_handler = rune_tree_handler or default_rune_tree_handler
+
+    async with ensure_client(client) as client:
+        rune_trees = _prefetch_rune_trees(rune_tree_handler, patch)
+
+        game_id_list = await get_qq_games_list(client, qq_match_url)
+
+        async for item in stream_games(
+            _parse_qq_game(int(g["sMatchId"]), patch, add_names, client, rune_tree_handler, rune_trees)
+            for g in game_id_list
+        ):
+            yield item
+
+
+def refresh_qq_series(
+    qq_match_url: str,
+    previous: Union[SeriesState, LolSeries] = None,
+    patch: str = None,
+    add_names: bool = True,
+    rune_tree_handler: RuneTreeHandler = None,
+) -> SeriesState:
+    """Refreshes a QQ series that is being played, only parsing the games that are new or changed since previous.
+
+    If the games list did not change and all games were parsed, a single request is made.
+
+    Params:
+        qq_match_url: the qq url of the full match, usually acquired from Leaguepedia.
+        previous: the state returned by the previous refresh or a LolSeries, None to start from scratch.
+        patch: optional patch to include in the objects and query rune trees.
+        add_names: whether or not to add champions/items/runes names next to their objects through lol_id_tools.
+        rune_tree_handler: the RuneTreeHandler used to get rune trees, a shared default one is used if None.
+
+    Returns:
+        A SeriesState, whose series property is the LolSeries of the games parsed so far.
+    """
+    return run_sync(
+        refresh_qq_series_async(qq_match_url, previous, patch, add_names, rune_tree_handler=rune_tree_handler)
+    )
+
+
+async def refresh_qq_series_async(
+    qq_match_url: str,
+    previous: Union[SeriesState, LolSeries] = None,
+    patch: str = None,
+    add_names: bool = True,
+    client: HttpClient = None,
+    rune_tree_handler: RuneTreeHandler = None,
+) -> SeriesState:
+    """Asynchronous version of refresh_qq_series.
+
+    Params:
+        client: the HttpClient to use for the queries, a temporary one is created if None.
+    """
+    rune_tree_handler = rune_tree_handler or default_rune_tree_handler
+    previous = as_state(previous, lambda game: str(game["sources"]["qq"]["id"]))
+
+    async with ensure_client(client) as client:
+        game_id_list, validators = await get_qq_games_list_if_changed(client, qq_match_url, previous.validators)
+
+        entries = None if game_id_list is None else {str(g["sMatchId"]): entry_hash(g) for g in game_id_list}
+
+        rune_trees = None
+
+        async def parse_game(key: str, outdated: bool) -> lol_dto.classes.game.LolGame:
+            nonlocal rune_trees
+
+            # Rune trees are only loaded if a game has to be parsed
+            if rune_trees is None:
+                rune_trees = _prefetch_rune_trees(rune_tree_handler, patch)
+
+            if not outdated:
+                return await _parse_qq_game(int(key), patch, add_names, client, rune_tree_handler, rune_trees)
+
+            with response_cache.refreshing():
+                return await _parse_qq_game(int(key), patch, add_names, client, rune_tree_handler, rune_trees)
+
+        return await refresh_games(previous, entries, validators, parse_game)
+
+
+async def parse_qq_game_async(
+    qq_game_id: int,
+    patch: str = None,
+    add_names: bool = True,
+    client: HttpClient = None,
+    rune_tree_handler: RuneTreeHandler = None,
+    transform_pool: TransformPool = None,
+) -> lol_dto.classes.game.LolGame:
+    """Asynchronous version of parse_qq_game.
+
+    Params:
+        client: the HttpClient to use for the queries, a temporary one is created if None.
+        transform_pool: the TransformPool running the transform, run in the shared transform thread if None.
+    """
+    rune_tree_handler = rune_tree_handler or default_rune_tree_handler
+
+    async with ensure_client(client) as client:
+        rune_trees = _prefetch_rune_trees(rune_tree_handler, patch)
+
+        return await _parse_qq_game(qq_game_id, patch, add_names, client, rune_tree_handler, rune_trees, transform_pool)
+
+
+def _prefetch_rune_trees(rune_tree_handler: RuneTreeHandler, patch: Optional[str]) -> Optional[asyncio.Future]:
+    """Starts loading the rune trees of the patch from ddragon outside of the event loop.
+    """
+    if not patch:
+        return None
+
+    rune_trees = asyncio.get_running_loop().run_in_executor(None, rune_tree_handler.get_runes_data, patch)
+
+    # Games without runes never await the future, so its error is retrieved here to not be logged as unhandled
+    rune_trees.add_done_callback(lambda future: future.cancelled() or future.exception())
+
+    return rune_trees
+
+
+async def _parse_qq_game(
+    qq_game_id: int,
+    patch: Optional[str],
+    add_names: bool,
+    client: HttpClient,
+    rune_tree_handler: RuneTreeHandler,
+    rune_trees: Optional[asyncio.Future],
+    transform_pool: TransformPool = None,
+) -> lol_dto.classes.game.LolGame:
+    game_info, team_info, runes_info, qq_server_id, qq_battle_id = await get_all_qq_game_info(client, qq_game_id)
+
+    if rune_trees is not None and runes_info:
+        await rune_trees
+
+    # Workers use their own default handler, reading the rune trees the prefetch saved to the static data folder
+    return await run_transform(
+        transform_pool,
+        transform_qq_game,
+        qq_game_id,
+        game_info,
+        team_info,
+        runes_info,
+        qq_server_id,
+        qq_battle_id,
+        patch,
+        add_names,
+        rune_tree_handler if transform_pool is None else None,
+    )
 
-    game_info, team_info, runes_info, qq_server_id, qq_battle_id = get_all_qq_game_info(qq_game_id)
 
+def parse_qq_datetime(battle_date: str, battle_time: str) -> datetime.datetime:
+    """Returns the timezone-aware start of a QQ game.
+
+    QQ dates are YYYY-MM-DD and times HH:MM:SS, which are parsed directly. Anything else goes through dateparser,
+    which is only imported for it as it is slow to import and to run.
+    """
+    # The 'BattleTime' field sometimes has sub-second digits that we cut
+    date_time_string = f"{battle_date}T{battle_time[:8]}"
+
+    try:
+        date_time = datetime.datetime.fromisoformat(date_time_string)
+    except ValueError:
+        import dateparser
+
+        logging.debug(f"Unexpected QQ date format {date_time_string}, falling back to dateparser")
+        date_time = dateparser.parse(date_time_string)
+
+    return date_time.replace(tzinfo=qq_timezone)
+
+
+def transform_qq_game(
+    qq_game_id: int,
+    game_info: dict,
+    team_info: dict,
+    runes_info: list,
+    qq_server_id: int,
+    qq_battle_id: int,
+    patch: str = None,
+    add_names: bool = True,
+    rune_tree_handler: RuneTreeHandler = None,
+) -> lol_dto.classes.game.LolGame:
+    """Transforms the raw payloads of the QQ endpoints into a LolGameDto.
+
+    Params:
+        qq_game_id: the qq game id, acquired from qq’s match list endpoint.
+        game_info, team_info, runes_info, qq_server_id, qq_battle_id: the output of get_all_qq_game_info.
+        patch: optional patch to include in the object and query rune trees.
+        add_names: whether or not to add champions/items/runes names next to their objects through lol_id_tools.
+        rune_tree_handler: the RuneTreeHandler used to get rune trees, a shared default one is used if None.
+
+    Returns:
+        A LolGameDto.
+    """
     log_prefix = (
         f"match {game_info['sMatchInfo']['bMatchId']}|"
         f"game {game_info['sMatchInfo']['MatchNum']}|"
@@ -74,11 +335,7 @@ def parse_qq_game(qq_game_id: int, patch: str = None, add_names: bool = True) ->
     info = set()
 
     try:
-        # The 'BattleTime' field sometimes has sub-second digits that we cut
-        date_time = dateparser.parse(
-            f"{game_info['battleInfo']['BattleDate']}T{game_info['battleInfo']['BattleTime'][:8]}"
-        )
-        date_time = date_time.replace(tzinfo=datetime.timezone(datetime.timedelta(hours=8)))
+        date_time = parse_qq_datetime(game_info["battleInfo"]["BattleDate"], game_info["battleInfo"]["BattleTime"])
         lol_game_dto["start"] = date_time.isoformat(timespec="seconds")
     except KeyError:
         info.add(f"{log_prefix}Missing ['game']['start']")
@@ -110,10 +367,10 @@ def parse_qq_game(qq_game_id: int, patch: str = None, add_names: bool = True) ->
     # Handle battle_data parsing and game-related information
     try:
         # This is a json inside the json of game_info
-        battle_data = json.loads(game_info["battleInfo"]["BattleData"])
+        battle_data = json_codec.loads(game_info["battleInfo"]["BattleData"])
         lol_game_dto["duration"] = int(battle_data["game-period"])
 
-    except JSONDecodeError:
+    except ValueError:
         # Usually means the field was empty
         battle_data = {}
 
@@ -121,18 +378,27 @@ def parse_qq_game(qq_game_id: int, patch: str = None, add_names: bool = True) ->
     possible_team_names = game_info["sMatchInfo"]["bMatchName"].lower().split("vs")  # Used if team_info is not there
     possible_team_names = [n.replace(" ", "").upper() for n in possible_team_names]
 
+    # Indexes are built once so teams, sides and players are not found through scans of the payloads
+    members_by_team = {}
+    member_names = set()
+    for match_member in game_info["sMatchMember"]:
+        member_team_id = int(match_member["TeamId"])
+        members_by_team.setdefault(member_team_id, []).append(match_member)
+        member_names.add((match_member["GameName"], member_team_id))
+
+    runes_by_hero = {}
+    for player_runes in runes_info:
+        runes_by_hero.setdefault(player_runes["hero_id_"], player_runes)
+
     # We iterate of the two team IDs from sMatchInfo
     for team_id in blue_team_id, red_team_id:
         team_color = "BLUE" if team_id == blue_team_id else "RED"
 
         team = lol_dto.classes.game.LolGameTeam(uniqueIdentifiers={"qq": {"id": team_id}}, players=[])
+        players_by_name = {}
 
         # We start by getting as much information as possible from the sMatchMember fields
-        for match_member in game_info["sMatchMember"]:
-            # We match players on the team id
-            if int(match_member["TeamId"]) != team_id:
-                continue
-
+        for match_member in members_by_team.get(team_id, []):
             player = lol_dto.classes.game.LolGamePlayer(
                 inGameName=match_member["GameName"],
                 role=roles[match_member["Place"]],
@@ -149,9 +415,10 @@ def parse_qq_game(qq_game_id: int, patch: str = None, add_names: bool = True) ->
             )
 
             if add_names:
-                player["championName"] = lit.get_name(player["championId"], object_type="champion")
+                player["championName"] = default_name_tables.get_name(player["championId"], "champion")
 
             team["players"].append(player)
+            players_by_name.setdefault(player["inGameName"], player)
 
             # We get the tentative team name
             # We cast team names and player names as lowercase because they made the mistake in some old games
@@ -204,11 +471,8 @@ def parse_qq_game(qq_game_id: int, patch: str = None, add_names: bool = True) ->
         # TODO Make that a bit more palatable
         for tentative_team_side in "left", "right":
             # We just look at the first player
-            player = battle_data[tentative_team_side]["players"][0]
-
-            for match_member in game_info["sMatchMember"]:
-                if player["name"] == match_member["GameName"] and int(match_member["TeamId"]) == team_id:
-                    team_side = tentative_team_side
+            if (battle_data[tentative_team_side]["players"][0]["name"], team_id) in member_names:
+                team_side = tentative_team_side
 
         # Sometimes the firstTower field isn’t in battleData but it can be calculated from the players
         if "firstTower" in battle_data[team_side]:
@@ -232,7 +496,7 @@ def parse_qq_game(qq_game_id: int, patch: str = None, add_names: bool = True) ->
 
         # We add ban names from the bans field
         if add_names:
-            team["bansNames"] = [lit.get_name(i, object_type="champion") for i in team["bans"]]
+            team["bansNames"] = [default_name_tables.get_name(i, "champion") for i in team["bans"]]
 
         # Bans are sometimes incomplete
         if team["bans"].__len__() < 5:
@@ -240,7 +504,7 @@ def parse_qq_game(qq_game_id: int, patch: str = None, add_names: bool = True) ->
 
         # Finally, we look at per-player BattleData
         for player_battle_data in battle_data[team_side]["players"]:
-            player = next(p for p in team["players"] if player_battle_data["name"] == p["inGameName"])
+            player = players_by_name[player_battle_data["name"]]
 
             # Updating missing fields for logging
             try:
@@ -256,9 +520,9 @@ def parse_qq_game(qq_game_id: int, patch: str = None, add_names: bool = True) ->
                 warnings.add(f"{log_prefix}⚠ Bans are likely wrong ⚠")
                 continue
 
-            try:
-                add_runes(player, runes_info, patch, add_names)
-            except StopIteration:
+            if player["championId"] in runes_by_hero:
+                _add_player_runes(player, runes_by_hero[player["championId"]], patch, add_names, rune_tree_handler)
+            else:
                 info.add(f"{log_prefix}Missing ['player']['runes']")
 
         # Finally, we insert the team
@@ -273,9 +537,27 @@ def parse_qq_game(qq_game_id: int, patch: str = None, add_names: bool = True) ->
     return lol_game_dto
 
 
-def add_runes(player: lol_dto.classes.game.LolGamePlayer, runes_info, patch, add_names=True):
+def add_runes(
+    player: lol_dto.classes.game.LolGamePlayer,
+    runes_info,
+    patch,
+    add_names=True,
+    rune_tree_handler: RuneTreeHandler = None,
+):
     player_runes = next(p for p in runes_info if p["hero_id_"] == player["championId"])
 
+    return _add_player_runes(player, player_runes, patch, add_names, rune_tree_handler)
+
+
+def _add_player_runes(
+    player: lol_dto.classes.game.LolGamePlayer,
+    player_runes: dict,
+    patch,
+    add_names=True,
+    rune_tree_handler: RuneTreeHandler = None,
+):
+    rune_tree_handler = rune_tree_handler or default_rune_tree_handler
+
     player["runes"] = []
     for rune_index, rune in enumerate(player_runes["runes_info_"]["runes_list_"]):
         # slot is 0 for keystones, 1 for first rune of primary tree, ...
@@ -283,7 +565,7 @@ def add_runes(player: lol_dto.classes.game.LolGamePlayer, runes_info, patch, add
         rune = lol_dto.classes.game.LolGamePlayerRune(id=rune["runes_id_"], slot=rune_index, rank=rune["runes_num_"],)
 
         if add_names:
-            rune["name"] = lit.get_name(rune["id"], object_type="rune")
+            rune["name"] = default_name_tables.get_name(rune["id"], "rune")
 
         player["runes"].append(rune)
 
@@ -352,7 +634,7 @@ def parse_player_battle_data(
         )
 
         if add_names:
-            item["name"] = lit.get_name(item["id"], object_type="item")
+            item["name"] = default_name_tables.get_name(item["id"], "item")
 
         end_of_game_stats["items"].append(item)
 
@@ -391,7 +673,7 @@ def parse_player_battle_data(
         )
 
         if add_names:
-            summoner_spell["name"] = lit.get_name(summoner_spell["id"], object_type="summoner_spell")
+            summoner_spell["name"] = default_name_tables.get_name(summoner_spell["id"], "summoner_spell")
 
         player["summonerSpells"].append(summoner_spell)
 
@@ -0,0 +1,266 @@
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Mapping, NamedTuple, Optional, Sequence, Tuple, Union
+
+from lol_esports_parser.config import config_folder
+from lol_esports_parser.parsers import telemetry
+
+try:
+    import fcntl
+except ImportError:
+    # Windows, buckets are then only shared between the threads of a process
+    fcntl = None
+
+
+class Limit(NamedTuple):
+    """At most requests requests in any window of seconds seconds.
+    """
+
+    requests: int
+    seconds: float
+
+
+# A bucket is a (kind, key) pair, like ("host", "qq.example.com") or ("acs", account_name)
+Bucket = Tuple[str, str]
+
+# Riot's published limits for development keys, per region, and for the match endpoints methods
+# Production keys have higher limits, which can be set with rate_limiter.set_limits("riot_api", ...)
+# Other sources do not publish their limits, so their buckets are unlimited unless limits are set
+default_limits = {"riot_api": "20:1,100:120", "riot_api_method": "500:10"}
+
+
+def parse_limits(limits: Union[str, Sequence[Limit], None]) -> List[Limit]:
+    """Returns a list of Limit from Riot's "requests:seconds,requests:seconds" format, like "20:1,100:120".
+    """
+    if not limits:
+        return []
+
+    if isinstance(limits, str):
+        return [Limit(int(requests), float(seconds)) for requests, seconds in (p.split(":") for p in limits.split(","))]
+
+    return [Limit(*limit) for limit in limits]
+
+
+def retry_after(headers: Mapping[str, str], default: float = 1.0) -> float:
+    """Returns the number of seconds to wait from the Retry-After header of a 429 response, default if missing.
+    """
+    for name, value in headers.items():
+        if name.lower() == "retry-after":
+            try:
+                return float(value)
+            except ValueError:
+                # HTTP dates are not used by the endpoints we query
+                break
+
+    return default
+
+
+def _limit_id(limit: Limit) -> str:
+    return f"{limit.requests}:{limit.seconds:g}"
+
+
+class RateLimiter:
+    """Token buckets shared by all the threads and processes of a host, to stay under the rate limits of endpoints.
+
+    Requests take a token from each of their buckets, usually one for the host and one for the credentials used,
+    waiting until all of them have one. A limit of N requests per T seconds becomes a bucket holding up to
+    burst * N tokens and refilled with the rest of N over T seconds, so there are never more than N requests in
+    any window of T seconds whatever the window Riot counts in, instead of bouncing off the limit and retrying.
+
+    The buckets are saved in a locked file next to credentials.json, so every process of the host shares them.
+    Processes sharing buckets should use the same limits. Buckets without limits are never waited on.
+    """
+
+    def __init__(
+        self,
+        limits: Dict[str, Union[str, Sequence[Limit]]] = None,
+        state_location: Optional[str] = "",
+        burst: float = 0.1,
+    ):
+        """
+        Params:
+            limits: {kind: limits} in parse_limits formats, defaults to default_limits.
+            state_location: where to share the buckets between processes, defaults to rate_limits.json next to
+                credentials.json. None keeps them in memory, only shared by the threads of the process.
+            burst: fraction of each limit that can be used at once, the rest being spread evenly over its window.
+        """
+        self.state_location = (
+            os.path.join(config_folder, "rate_limits.json") if state_location == "" else state_location
+        )
+        self.burst = burst
+
+        self._limits: Dict[Tuple[str, Optional[str]], List[Limit]] = {}
+        for kind, kind_limits in (default_limits if limits is None else limits).items():
+            self.set_limits(kind, kind_limits)
+
+        self._lock = threading.Lock()
+        self._state: Dict[str, dict] = {}
+
+    def set_limits(self, kind: str, limits: Union[str, Sequence[Limit], None], key: str = None):
+        """Sets the limits of a kind of buckets, or of a single bucket if key is given.
+
+        Params:
+            kind: the kind of buckets, like "host", "acs", "riot_api" or "riot_api_method".
+            limits: the limits in parse_limits formats, None removing them.
+            key: the key of the bucket, like a host name, its limits taking precedence over the ones of its kind.
+        """
+        self._limits[kind, key] = parse_limits(limits)
+
+    def get_limits(self, bucket: Bucket) -> List[Limit]:
+        kind, key = bucket
+        return self._limits.get((kind, key)) or self._limits.get((kind, None)) or []
+
+    def try_acquire(self, *buckets: Bucket) -> float:
+        """Takes a token from each bucket if they all have one.
+
+        Returns:
+            0 if the tokens were taken, else the number of seconds to wait before trying again.
+        """
+        limited = [(f"{kind}:{key}", self.get_limits((kind, key))) for kind, key in buckets]
+        limited = [(bucket_id, limits) for bucket_id, limits in limited if limits]
+
+        if not limited:
+            return 0.0
+
+        with self._locked_state() as state:
+            now = time.time()
+            wait = 0.0
+
+            refilled = {}
+            for bucket_id, limits in limited:
+                bucket = state.get(bucket_id, {})
+                wait = max(wait, bucket.get("blocked_until", 0.0) - now)
+
+                refilled[bucket_id] = tokens = []
+                for index, limit in enumerate(limits):
+                    capacity, rate = self._capacity(limit), self._rate(limit)
+                    previous_tokens = bucket.get("tokens", {}).get(_limit_id(limit), capacity)
+                    tokens.append(min(capacity, previous_tokens + (now - bucket.get("updated", now)) * rate))
+
+                    if tokens[index] < 1:
+                        wait = max(wait, (1 - tokens[index]) / rate)
+
+            if wait > 0:
+                return wait
+
+            for bucket_id, limits in limited:
+                tokens = [bucket_tokens - 1 for bucket_tokens in refilled[bucket_id]]
+                state[bucket_id] = {
+                    "tokens": {_limit_id(limit): limit_tokens for limit, limit_tokens in zip(limits, tokens)},
+                    "updated": now,
+                    # Once full again, the bucket is the same as a missing one and can be removed
+                    "full_at": now
+                    + max((self._capacity(limit) - t) / self._rate(limit) for limit, t in zip(limits, tokens)),
+                }
+
+            return 0.0
+
+    def acquire(self, *buckets: Bucket) -> float:
+        """Waits until a token was taken from each bucket.
+
+        Returns:
+            The number of seconds spent waiting.
+        """
+        waited = 0.0
+
+        while True:
+            wait = self.try_acquire(*buckets)
+            if not wait:
+                return waited
+
+            self._report_wait(buckets, wait)
+            time.sleep(wait)
+            waited += wait
+
+    async def acquire_async(self, *buckets: Bucket) -> float:
+        """Waits until a token was taken from each bucket, without blocking the event loop while waiting.
+
+        Returns:
+            The number of seconds spent waiting.
+        """
+        waited = 0.0
+
+        while True:
+            # The file lock is only held to update the buckets, so it is taken from the event loop
+            wait = self.try_acquire(*buckets)
+            if not wait:
+                return waited
+
+            self._report_wait(buckets, wait)
+            await asyncio.sleep(wait)
+            waited += wait
+
+    def block(self, seconds: float, *buckets: Bucket):
+        """Makes every request on the buckets wait, for example for the Retry-After of a 429 response.
+        """
+        bucket_ids = [f"{kind}:{key}" for kind, key in buckets if self.get_limits((kind, key))]
+
+        if not bucket_ids:
+            return
+
+        with self._locked_state() as state:
+            blocked_until = time.time() + seconds
+
+            for bucket_id in bucket_ids:
+                bucket = state.setdefault(bucket_id, {})
+                bucket["blocked_until"] = max(bucket.get("blocked_until", 0.0), blocked_until)
+
+    def _capacity(self, limit: Limit) -> float:
+        return max(1.0, float(int(limit.requests * self.burst)))
+
+    def _rate(self, limit: Limit) -> float:
+        # Tokens trickling in over the window make sure its requests count stays under the limit
+        return max(1.0, limit.requests - self._capacity(limit)) / limit.seconds
+
+    @staticmethod
+    def _report_wait(buckets: Sequence[Bucket], wait: float):
+        logging.debug(f"Waiting {wait:.2f}s for rate limits of {buckets}")
+        for kind, _ in buckets:
+            telemetry.increment(kind, "throttled")
+
+    @contextmanager
+    def _locked_state(self):
+        with self._lock:
+            if self.state_location is None or fcntl is None:
+                yield self._state
+                self._cleanup(self._state)
+                return
+
+            os.makedirs(os.path.dirname(os.path.abspath(self.state_location)), exist_ok=True)
+
+            # The state file is its own lock, so updating it is a single read and write
+            file_descriptor = os.open(self.state_location, os.O_RDWR | os.O_CREAT, 0o600)
+            with open(file_descriptor, "r+") as file:
+                fcntl.flock(file, fcntl.LOCK_EX)
+                try:
+                    try:
+                        state = json.loads(file.read() or "{}")
+                    except ValueError:
+                        state = {}
+
+                    yield state
+
+                    self._cleanup(state)
+                    file.seek(0)
+                    file.truncate()
+                    file.write(json.dumps(state))
+                    file.flush()
+                finally:
+                    fcntl.flock(file, fcntl.LOCK_UN)
+
+    @staticmethod
+    def _cleanup(state: Dict[str, dict]):
+        # Removing full buckets keeps the state small whatever the number of keys used
+        now = time.time()
+
+        for bucket_id in list(state):
+            if state[bucket_id].get("blocked_until", 0.0) <= now and state[bucket_id].get("full_at", 0.0) <= now:
+                del state[bucket_id]
+
+
+rate_limiter = RateLimiter()
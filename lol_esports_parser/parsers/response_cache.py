@@ -0,0 +1,263 @@
+import hashlib
+import logging
+import os
+import threading
+import time
+import zlib
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Awaitable, Callable, Dict, Optional, TypeVar
+
+from lol_esports_parser.config import config_folder
+from lol_esports_parser.parsers import telemetry
+from lol_esports_parser.parsers.single_flight import AsyncSingleFlight
+
+T = TypeVar("T")
+
+# Endpoints whose payloads can still change, with the number of seconds their entries stay valid
+default_ttl = {"qq_match_list": 10 * 60}
+
+# Set by ResponseCache.refreshing for the current thread or asyncio task
+_refreshing = ContextVar("refreshing", default=False)
+
+
+class ResponseCache:
+    """A compressed on-disk cache for raw endpoint responses.
+
+    Entries are grouped by namespace (one per endpoint) and keyed by a hash of the identifiers used in the query,
+    so finished games are only downloaded once. Namespaces present in ttl are considered mutable and expire after
+    the given number of seconds. The least recently read entries are evicted once the cache grows over max_size.
+
+    Concurrent fetches of the same entry in an event loop share a single query and decode, so duplicate games in
+    the same batch are only downloaded and parsed once. Callers share the decoded payload and must not modify it.
+    """
+
+    def __init__(
+        self,
+        folder: str = None,
+        max_size: int = 2 * 1024**3,
+        ttl: Dict[str, float] = None,
+        compression_level: int = 6,
+        enabled: bool = True,
+    ):
+        """
+        Params:
+            folder: where to store the cache, defaults to the cache folder next to the configuration files.
+            max_size: maximum size of the cache on disk in bytes.
+            ttl: {namespace: seconds} for mutable endpoints, defaults to default_ttl.
+            compression_level: zlib compression level used for new entries.
+            enabled: whether or not the cache is read and written.
+        """
+        self.folder = folder or os.path.join(config_folder, "cache")
+        self.max_size = max_size
+        self.ttl = dict(default_ttl if ttl is None else ttl)
+        self.compression_level = compression_level
+        self.enabled = enabled
+
+        self.hits = Counter()
+        self.misses = Counter()
+        self.coalesced = Counter()
+        self.evictions = 0
+
+        self._flights = AsyncSingleFlight()
+
+        self._lock = threading.Lock()
+        self._size = None  # Computed from the disk on the first write
+
+    def get(self, namespace: str, key: tuple) -> Optional[bytes]:
+        """Returns the cached payload, or None if it is missing or expired.
+        """
+        payload = self._read(namespace, key)
+        self._count(namespace, payload is not None)
+        return payload
+
+    def set(self, namespace: str, key: tuple, payload: bytes):
+        """Writes a payload to the cache, evicting old entries if needed.
+        """
+        if not self.enabled:
+            return
+
+        path = self._path(namespace, key)
+        data = zlib.compress(payload, self.compression_level)
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # Writing to a temporary file first so concurrent readers never see partial entries
+        temporary_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temporary_path, "wb") as file:
+            file.write(data)
+        os.replace(temporary_path, path)
+
+        with self._lock:
+            if self._size is None:
+                self._size = self._compute_size()
+            else:
+                self._size += len(data)
+
+            if self._size > self.max_size:
+                self._evict()
+
+    async def fetch(
+        self, namespace: str, key: tuple, query: Callable[[], Awaitable[bytes]], decode: Callable[[bytes], T]
+    ) -> T:
+        """Returns the decoded payload from the cache, or queries, decodes and caches it.
+
+        Params:
+            namespace: the endpoint namespace.
+            key: the identifiers used in the query.
+            query: coroutine function returning the raw payload from the endpoint.
+            decode: function transforming the raw payload, raising if the payload is faulty.
+
+        Only payloads that were decoded without raising are written to the cache.
+        """
+        # Refreshing callers do not join fetches that may have come from the cache
+        result, shared = await self._flights.do(
+            (namespace, key, _refreshing.get()), lambda: self._fetch(namespace, key, query, decode)
+        )
+
+        if shared:
+            with self._lock:
+                self.coalesced[namespace] += 1
+            telemetry.increment(namespace, "coalesced")
+
+        return result
+
+    async def _fetch(
+        self, namespace: str, key: tuple, query: Callable[[], Awaitable[bytes]], decode: Callable[[bytes], T]
+    ) -> T:
+        payload = self._read(namespace, key)
+
+        if payload is not None:
+            try:
+                result = decode(payload)
+                self._count(namespace, True)
+                return result
+            except Exception:
+                logging.info(f"Dropping faulty cache entry {namespace}:{key}")
+
+        self._count(namespace, False)
+
+        payload = await query()
+        result = decode(payload)
+        self.set(namespace, key, payload)
+
+        return result
+
+    @contextmanager
+    def refreshing(self):
+        """Queries every payload again inside the block, for example for games that changed, while still caching them.
+
+        The context is local to the thread or asyncio task, and tasks started inside the block inherit it.
+        """
+        token = _refreshing.set(True)
+        try:
+            yield
+        finally:
+            _refreshing.reset(token)
+
+    def stats(self) -> dict:
+        """Returns hits, misses and coalesced fetches per namespace as well as the number of evicted entries.
+        """
+        with self._lock:
+            return {
+                "hits": dict(self.hits),
+                "misses": dict(self.misses),
+                "coalesced": dict(self.coalesced),
+                "evictions": self.evictions,
+            }
+
+    def clear(self, namespace: str = None):
+        """Deletes all entries, or only the entries of the given namespace.
+        """
+        folder = os.path.join(self.folder, namespace) if namespace else self.folder
+
+        for path in self._entries(folder):
+            os.remove(path)
+
+        with self._lock:
+            self._size = None
+
+    def _read(self, namespace: str, key: tuple) -> Optional[bytes]:
+        if not self.enabled or _refreshing.get():
+            return None
+
+        path = self._path(namespace, key)
+
+        try:
+            stat = os.stat(path)
+
+            ttl = self.ttl.get(namespace)
+            if ttl is not None and time.time() - stat.st_mtime > ttl:
+                return None
+
+            with open(path, "rb") as file:
+                payload = zlib.decompress(file.read())
+
+            # Access time is what eviction relies on, the modification time is kept for expiration
+            os.utime(path, (time.time(), stat.st_mtime))
+
+        except (OSError, zlib.error):
+            return None
+
+        return payload
+
+    def _count(self, namespace: str, hit: bool):
+        with self._lock:
+            if hit:
+                self.hits[namespace] += 1
+            else:
+                self.misses[namespace] += 1
+
+        telemetry.increment(namespace, "cache_hit" if hit else "cache_miss")
+
+    def _path(self, namespace: str, key: tuple) -> str:
+        digest = hashlib.sha1("/".join(str(k) for k in key).encode()).hexdigest()
+        return os.path.join(self.folder, namespace, digest[:2], f"{digest}.zlib")
+
+    @staticmethod
+    def _entries(folder: str):
+        for root, _, files in os.walk(folder):
+            for file_name in files:
+                if file_name.endswith(".zlib"):
+                    yield os.path.join(root, file_name)
+
+    def _compute_size(self) -> int:
+        size = 0
+        for path in self._entries(self.folder):
+            try:
+                size += os.path.getsize(path)
+            except OSError:
+                # Another process evicted it
+                pass
+        return size
+
+    def _evict(self):
+        """Deletes least recently read entries until the cache is back under 90% of its maximum size.
+        """
+        entries = []
+        for path in self._entries(self.folder):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_atime, stat.st_size, path))
+
+        self._size = sum(size for _, size, _ in entries)
+
+        for _, size, path in sorted(entries):
+            if self._size <= self.max_size * 0.9:
+                break
+
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+
+            self._size -= size
+            self.evictions += 1
+
+        logging.debug(f"Response cache evicted down to {self._size} bytes")
+
+
+response_cache = ResponseCache()
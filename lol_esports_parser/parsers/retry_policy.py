@@ -0,0 +1,143 @@
+import asyncio
+import logging
+import random
+from collections import deque
+from typing import Awaitable, Callable, Optional, Tuple, Type, TypeVar
+
+import aiohttp
+
+from lol_esports_parser.parsers import telemetry
+
+T = TypeVar("T")
+
+# Errors that are always worth retrying, whatever the endpoint
+network_errors = (aiohttp.ClientError, asyncio.TimeoutError)
+
+
+class RetryPolicy:
+    """Retries, deadlines and hedged requests shared by the endpoints of a same source.
+
+    Each network request gets a deadline, and failed calls are retried with an exponential backoff and jitter. Once
+    enough latencies were recorded, an idempotent request still running after the hedge_percentile of past
+    latencies gets a duplicate, and the first response wins.
+    """
+
+    def __init__(
+        self,
+        attempts: int = 2,
+        backoff: float = 1.0,
+        max_backoff: float = 30.0,
+        jitter: float = 0.5,
+        timeout: Optional[float] = 30.0,
+        hedge_percentile: Optional[float] = None,
+        hedge_min_samples: int = 20,
+        latency_window: int = 200,
+    ):
+        """
+        Params:
+            attempts: maximum number of attempts of a call, 1 meaning no retries.
+            backoff: delay before the first retry in seconds, doubled at each following retry.
+            max_backoff: maximum delay between two attempts in seconds.
+            jitter: fraction of the delay that is randomised, so clients retrying together spread out.
+            timeout: deadline of a single request in seconds, None meaning no deadline.
+            hedge_percentile: latency percentile after which a duplicate request is sent, None disabling hedging.
+            hedge_min_samples: number of latencies to record before hedging.
+            latency_window: number of recent latencies the percentile is computed on.
+        """
+        self.attempts = attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.timeout = timeout
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+
+        self.latencies = deque(maxlen=latency_window)
+        self.hedges = 0
+
+    def backoff_delay(self, attempt: int) -> float:
+        """Returns the delay before the given retry, starting at 1.
+        """
+        delay = min(self.max_backoff, self.backoff * 2 ** (attempt - 1))
+        return delay * (1 - self.jitter * random.random())
+
+    def hedge_delay(self) -> Optional[float]:
+        """Returns the delay after which a request is duplicated, or None if it should not be.
+        """
+        if self.hedge_percentile is None or len(self.latencies) < self.hedge_min_samples:
+            return None
+
+        latencies = sorted(self.latencies)
+        return latencies[min(len(latencies) - 1, int(len(latencies) * self.hedge_percentile / 100))]
+
+    async def call(
+        self,
+        coroutine_fn: Callable[[], Awaitable[T]],
+        retry_on: Tuple[Type[BaseException], ...] = network_errors,
+        endpoint: str = None,
+    ) -> T:
+        """Awaits coroutine_fn(), calling it again after a backoff when it raises one of the retry_on errors.
+
+        The last error is raised once all attempts failed. Retries are reported to telemetry under the endpoint name.
+        """
+        for attempt in range(1, self.attempts + 1):
+            try:
+                return await coroutine_fn()
+
+            except retry_on as e:
+                if attempt == self.attempts:
+                    raise
+
+                delay = self.backoff_delay(attempt)
+                telemetry.increment(endpoint, "retry")
+                logging.info(f"Retrying in {delay:.2f}s after {type(e).__name__}: {e}")
+                await asyncio.sleep(delay)
+
+    async def request(self, coroutine_fn: Callable[[], Awaitable[T]], endpoint: str = None) -> T:
+        """Awaits a single idempotent request with its deadline, hedging it if it is slower than usual.
+
+        Raises asyncio.TimeoutError if no response arrived before the deadline.
+        """
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        deadline = None if self.timeout is None else start + self.timeout
+
+        tasks = {asyncio.ensure_future(coroutine_fn())}
+        error = None
+
+        try:
+            hedge_delay = self.hedge_delay()
+            if hedge_delay is not None and (self.timeout is None or hedge_delay < self.timeout):
+                done, _ = await asyncio.wait(tasks, timeout=hedge_delay)
+                if not done:
+                    logging.debug(f"Hedging a request still running after {hedge_delay:.2f}s")
+                    self.hedges += 1
+                    telemetry.increment(endpoint, "hedge")
+                    tasks.add(asyncio.ensure_future(coroutine_fn()))
+
+            while tasks:
+                remaining = None if deadline is None else deadline - loop.time()
+                if remaining is not None and remaining <= 0:
+                    break
+
+                done, _ = await asyncio.wait(tasks, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    break
+
+                for task in done:
+                    tasks.discard(task)
+
+                    if task.exception() is None:
+                        self.latencies.append(loop.time() - start)
+                        return task.result()
+
+                    error = task.exception()
+
+            if error is not None and not tasks:
+                raise error
+
+            raise asyncio.TimeoutError(f"No response after {self.timeout}s")
+
+        finally:
+            for task in tasks:
+                task.cancel()
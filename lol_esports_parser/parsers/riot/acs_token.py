@@ -0,0 +1,162 @@
+import base64
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Optional
+
+from lol_esports_parser.config import config_folder
+
+try:
+    import fcntl
+except ImportError:
+    # Windows, tokens are then only shared between the threads of a process
+    fcntl = None
+
+
+def get_token_expiration(token: str) -> Optional[float]:
+    """Returns the expiration timestamp of a JWT, or None if it cannot be decoded.
+    """
+    try:
+        payload = token.split(".")[1]
+        payload += "=" * (-len(payload) % 4)
+        return float(json.loads(base64.urlsafe_b64decode(payload))["exp"])
+    except (IndexError, ValueError, KeyError, TypeError):
+        return None
+
+
+class AcsTokenManager:
+    """Keeps a valid ACS id_token for an account.
+
+    Tokens are refreshed a few minutes before they expire, by a single thread while the others wait. They are also
+    saved in a locked file next to credentials.json so all processes of a host share the same token.
+    """
+
+    def __init__(
+        self,
+        request_token: Callable[[], Optional[str]],
+        account_name: str,
+        token_location: str = None,
+        refresh_margin: float = 300,
+        default_lifetime: float = 3600,
+    ):
+        """
+        Params:
+            request_token: function querying a new token from the auth endpoint, returning None on failure.
+            account_name: the account the tokens belong to.
+            token_location: where to save the token, defaults to acs_token.json next to credentials.json.
+            refresh_margin: number of seconds before expiration when the token gets refreshed.
+            default_lifetime: lifetime assumed for tokens whose expiration cannot be decoded.
+        """
+        self.request_token = request_token
+        self.account_name = account_name
+        self.token_location = token_location or os.path.join(config_folder, "acs_token.json")
+        self.refresh_margin = refresh_margin
+        self.default_lifetime = default_lifetime
+
+        self.token = None
+        self.expiration = 0.0
+
+        self._lock = threading.Lock()
+
+    def cached_token(self) -> Optional[str]:
+        """Returns the token held in memory if it is still valid, without blocking.
+        """
+        if self.token and time.time() < self.expiration - self.refresh_margin:
+            return self.token
+
+        return None
+
+    def get_token(self) -> Optional[str]:
+        """Returns a valid token, refreshing it if needed.
+        """
+        token = self.cached_token()
+        if token:
+            return token
+
+        with self._lock:
+            # Another thread might have refreshed it while we were waiting
+            token = self.cached_token()
+            if token:
+                return token
+
+            with self._file_lock():
+                # Or another process
+                if self._read_token_file():
+                    token = self.cached_token()
+                    if token:
+                        return token
+
+                logging.info(f"Requesting a new ACS token for {self.account_name}")
+                token = self.request_token()
+
+                if token is None:
+                    return None
+
+                self._set_token(token)
+                self._write_token_file()
+
+            return token
+
+    def invalidate(self, token: str):
+        """Marks a token as unusable, for example after a query was refused with it.
+
+        Params:
+            token: the token that was used, so a token that was already refreshed is not invalidated again.
+        """
+        with self._lock:
+            if token == self.token:
+                self.token = None
+                self.expiration = 0.0
+
+                with self._file_lock():
+                    if os.path.exists(self.token_location):
+                        os.remove(self.token_location)
+
+    def _set_token(self, token: str):
+        self.token = token
+        self.expiration = get_token_expiration(token) or time.time() + self.default_lifetime
+
+    def _read_token_file(self) -> bool:
+        try:
+            with open(self.token_location) as file:
+                token_data = json.load(file)
+        except (OSError, ValueError):
+            return False
+
+        if token_data.get("account_name") != self.account_name:
+            return False
+
+        self.token = token_data["id_token"]
+        self.expiration = token_data["expiration"]
+
+        return True
+
+    def _write_token_file(self):
+        os.makedirs(os.path.dirname(self.token_location), exist_ok=True)
+
+        temporary_location = f"{self.token_location}.{os.getpid()}.tmp"
+
+        # The token grants access to the account, so only the user can read it
+        file_descriptor = os.open(temporary_location, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with open(file_descriptor, "w") as file:
+            json.dump({"account_name": self.account_name, "id_token": self.token, "expiration": self.expiration}, file)
+
+        os.replace(temporary_location, self.token_location)
+
+    @contextmanager
+    def _file_lock(self):
+        if fcntl is None:
+            yield
+            return
+
+        os.makedirs(os.path.dirname(self.token_location), exist_ok=True)
+
+        with open(f"{self.token_location}.lock", "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
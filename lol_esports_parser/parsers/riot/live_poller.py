@@ -0,0 +1,234 @@
+import logging
+import time
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+import lol_dto
+import riot_transmute
+import riotwatcher
+from lol_dto.classes.game import LolGame
+
+from lol_esports_parser.parsers.name_tables import default_name_tables
+from lol_esports_parser.parsers.riot.riot_parser import get_default_lol_watcher, parse_mh_url
+
+
+class LiveGameUpdate(NamedTuple):
+    mh_url: str
+    # LolGame holding only the snapshots and events that were not in the previous updates of the game
+    delta: LolGame
+    # Full LolGame, only set in the last update of a game, once the match endpoint returns it
+    game: Optional[LolGame] = None
+
+
+class _FollowedGame:
+    def __init__(self, mh_url: str):
+        self.mh_url = mh_url
+        self.platform_id, self.game_id, _ = parse_mh_url(mh_url)
+
+        self.next_poll = 0.0
+
+        # Number of frames whose participant frames were emitted, the last frame of a live game not being final
+        self.snapshot_frames = 0
+        # Position of the first event that was not emitted
+        self.event_frame = 0
+        self.event_offset = 0
+
+        # (frames count, last frame timestamp, last frame events count) of the last timeline
+        self.signature = None
+
+
+class LiveGamePoller:
+    """Follows live server games, emitting only what is new in their timelines at every poll.
+
+    Games are polled every interval seconds through the timeline endpoint. Unchanged timelines are skipped, and new
+    frames and events are transmuted on their own into a delta LolGame, so a tick costs the same at the end of a game
+    as at its start. The participant frames of the last frame are only emitted once a new frame follows it.
+
+    When a timeline stops changing, the match endpoint is queried to know if the game is over. The last update of a
+    game then holds the full LolGame, built once, and the game stops being followed.
+
+    Rate limits are respected through the LolWatcher rate limiter, requests_per_second, and by waiting for the
+    Retry-After of 429 answers.
+    """
+
+    def __init__(
+        self,
+        lol_watcher: riotwatcher.LolWatcher = None,
+        interval: float = 30,
+        requests_per_second: float = None,
+        add_names: bool = False,
+    ):
+        """
+        Params:
+            lol_watcher: the LolWatcher used for the queries, one using RIOT_API_KEY is used if None.
+            interval: the number of seconds between two polls of a game.
+            requests_per_second: if set, the poller waits between requests to not go above it.
+            add_names: whether or not to add champions/items/runes names next to their objects.
+        """
+        self.lol_watcher = lol_watcher or get_default_lol_watcher()
+        self.interval = interval
+        self.requests_per_second = requests_per_second
+        self.add_names = add_names
+
+        self._games: Dict[str, _FollowedGame] = {}
+        self._last_request = 0.0
+
+    @property
+    def games(self) -> List[str]:
+        """The match history URLs of the followed games.
+        """
+        return list(self._games)
+
+    def follow(self, mh_url: str):
+        """Starts following a game, polled at the next tick.
+
+        Params:
+            mh_url: a match history URL of a live server game, without a gameHash.
+        """
+        if mh_url not in self._games:
+            self._games[mh_url] = _FollowedGame(mh_url)
+
+    def unfollow(self, mh_url: str):
+        self._games.pop(mh_url, None)
+
+    def poll(self) -> List[LiveGameUpdate]:
+        """Polls the games whose next poll is due and returns their updates.
+        """
+        updates = []
+        now = time.monotonic()
+
+        for followed in list(self._games.values()):
+            # A rate limit during this tick postpones the games not polled yet
+            if followed.next_poll > now:
+                continue
+
+            followed.next_poll = now + self.interval
+
+            try:
+                update = self._poll_game(followed)
+            except riotwatcher.ApiError as e:
+                self._handle_api_error(followed, e)
+                continue
+
+            if update is not None:
+                updates.append(update)
+
+        return updates
+
+    def run(self) -> Iterator[LiveGameUpdate]:
+        """Polls the followed games on schedule until they are all over, yielding their updates.
+        """
+        while self._games:
+            yield from self.poll()
+
+            if self._games:
+                time.sleep(max(0.0, min(followed.next_poll for followed in self._games.values()) - time.monotonic()))
+
+    def _poll_game(self, followed: _FollowedGame) -> Optional[LiveGameUpdate]:
+        timeline = self._query(self.lol_watcher.match.timeline_by_match, followed)
+        frames = timeline.get("frames") or []
+
+        signature = (len(frames), frames[-1]["timestamp"], len(frames[-1]["events"])) if frames else (0, None, 0)
+
+        if signature != followed.signature:
+            followed.signature = signature
+
+            delta_frames = self._new_frames(followed, frames, final=False)
+            if not delta_frames:
+                return None
+
+            return LiveGameUpdate(followed.mh_url, self._transmute(followed, delta_frames))
+
+        # The timeline did not change since the last poll, which is also what happens once the game is over
+        try:
+            match_dto = self._query(self.lol_watcher.match.by_id, followed)
+        except riotwatcher.ApiError as e:
+            if e.response is not None and e.response.status_code == 404:
+                return None
+            raise
+
+        game = riot_transmute.match_to_game(match_dto)
+        game = lol_dto.utilities.merge_games(
+            game, riot_transmute.match_timeline_to_game(timeline, int(followed.game_id), followed.platform_id)
+        )
+        if self.add_names:
+            default_name_tables.add_names(game)
+
+        self.unfollow(followed.mh_url)
+
+        return LiveGameUpdate(
+            followed.mh_url, self._transmute(followed, self._new_frames(followed, frames, True)), game
+        )
+
+    @staticmethod
+    def _new_frames(followed: _FollowedGame, frames: List[dict], final: bool) -> List[dict]:
+        """Returns partial timeline frames with only what was not emitted yet, and moves the game cursor.
+        """
+        complete_frames = len(frames) if final else max(len(frames) - 1, 0)
+        delta_frames = []
+
+        for index in range(min(followed.snapshot_frames, followed.event_frame), len(frames)):
+            frame = frames[index]
+
+            if index > followed.event_frame:
+                events = frame["events"]
+            elif index == followed.event_frame:
+                events = frame["events"][followed.event_offset :]
+            else:
+                events = []
+
+            participant_frames = (
+                frame["participantFrames"] if followed.snapshot_frames <= index < complete_frames else {}
+            )
+
+            if events or participant_frames:
+                delta_frames.append(
+                    {"timestamp": frame["timestamp"], "participantFrames": participant_frames, "events": events}
+                )
+
+        if frames:
+            followed.snapshot_frames = max(followed.snapshot_frames, complete_frames)
+            followed.event_frame, followed.event_offset = len(frames) - 1, len(frames[-1]["events"])
+
+        return delta_frames
+
+    def _transmute(self, followed: _FollowedGame, delta_frames: List[dict]) -> LolGame:
+        delta = riot_transmute.match_timeline_to_game(
+            {"frames": delta_frames}, int(followed.game_id), followed.platform_id
+        )
+
+        if self.add_names:
+            default_name_tables.add_names(delta)
+
+        return delta
+
+    def _query(self, endpoint, followed: _FollowedGame) -> dict:
+        if self.requests_per_second:
+            time.sleep(max(0.0, self._last_request + 1 / self.requests_per_second - time.monotonic()))
+            self._last_request = time.monotonic()
+
+        return endpoint(followed.platform_id, followed.game_id)
+
+    def _handle_api_error(self, followed: _FollowedGame, error: riotwatcher.ApiError):
+        status, retry_after = _error_status(error)
+
+        if status == 429:
+            # The limit can be the application one, so every game waits
+            next_poll = time.monotonic() + (retry_after if retry_after is not None else self.interval)
+            for other_game in self._games.values():
+                other_game.next_poll = max(other_game.next_poll, next_poll)
+
+            logging.info(f"Rate limited while polling {followed.mh_url}, waiting until the next allowed poll")
+
+        elif status != 404:
+            # 404 means the timeline is not available yet, anything else is retried at the next poll
+            logging.warning(f"Polling {followed.mh_url} failed, it will be retried at the next poll: {error!r}")
+
+
+def _error_status(error: riotwatcher.ApiError) -> Tuple[Optional[int], Optional[float]]:
+    response = error.response
+    if response is None:
+        return None, None
+
+    retry_after = response.headers.get("Retry-After")
+
+    return response.status_code, float(retry_after) if retry_after is not None else None
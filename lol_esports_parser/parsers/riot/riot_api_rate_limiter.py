@@ -0,0 +1,47 @@
+import datetime
+import hashlib
+from typing import Dict, Optional
+
+from riotwatcher.Handlers.RateLimit.BasicRateLimiter import BasicRateLimiter
+
+from lol_esports_parser.parsers.rate_limiter import RateLimiter, rate_limiter, retry_after
+
+
+class RiotApiRateLimiter(BasicRateLimiter):
+    """A riotwatcher rate limiter also taking tokens from the shared buckets of the Riot API key.
+
+    Requests wait for the app limit bucket of their region and the method limit bucket of their method, shared by
+    all the processes of the host using the same key, and 429 answers make all of them wait for the Retry-After.
+    riotwatcher's own limiter still applies on top, reacting to the limits Riot returns in its headers.
+
+    Usage:
+        riotwatcher.LolWatcher(api_key, rate_limiter=RiotApiRateLimiter(api_key))
+    """
+
+    def __init__(self, api_key: str, limiter: RateLimiter = None):
+        """
+        Params:
+            api_key: the Riot API key, only a hash of it being used to name the buckets.
+            limiter: the RateLimiter holding the buckets, the shared rate_limiter if None.
+        """
+        super().__init__()
+
+        self.limiter = limiter or rate_limiter
+        self.key_id = hashlib.sha1(api_key.encode()).hexdigest()[:12]
+
+    def _buckets(self, region: str, endpoint_name: str, method_name: str):
+        return (
+            ("riot_api", f"{region}/{self.key_id}"),
+            ("riot_api_method", f"{region}/{self.key_id}/{endpoint_name}.{method_name}"),
+        )
+
+    def wait_until(self, region: str, endpoint_name: str, method_name: str) -> Optional[datetime.datetime]:
+        self.limiter.acquire(*self._buckets(region, endpoint_name, method_name))
+
+        return super().wait_until(region, endpoint_name, method_name)
+
+    def record_response(self, region: str, endpoint_name: str, method_name: str, status: int, headers: Dict[str, str]):
+        if status == 429:
+            self.limiter.block(retry_after(headers), *self._buckets(region, endpoint_name, method_name))
+
+        super().record_response(region, endpoint_name, method_name, status, headers)
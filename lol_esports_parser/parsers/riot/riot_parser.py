@@ -1,105 +1,370 @@
+import asyncio
 import logging
 import os
 import urllib.parse
 import warnings
-from concurrent.futures.thread import ThreadPoolExecutor
+from typing import TYPE_CHECKING, AsyncIterator, Iterator, Optional, Tuple, Union
 
 import lol_dto
-import riot_transmute
 import riotwatcher
 from lol_dto.classes.game import LolGame
 
 from lol_esports_parser.dto.series_dto import LolSeries, create_series
+from lol_esports_parser.parsers.http_client import HttpClient, ensure_client, run_sync
+from lol_esports_parser.parsers.incremental import SeriesState, as_state, entry_hash, refresh_games
+from lol_esports_parser.parsers.name_tables import default_name_tables
 from lol_esports_parser.parsers.riot.acs_access import ACS
+from lol_esports_parser.parsers.riot.riot_api_rate_limiter import RiotApiRateLimiter
+from lol_esports_parser.parsers.streaming import iterate_sync, stream_games
+from lol_esports_parser.parsers.transform_pool import TransformPool, run_transform
 
+if TYPE_CHECKING:
+    from lol_esports_parser.dto.timeline_frames import TimelineFrames
 
-acs = ACS()
 
-try:
-    lol_watcher = riotwatcher.LolWatcher(os.environ["RIOT_API_KEY"])
-except KeyError:
-    warnings.warn("'RIOT_API_KEY' environment variable not found.\n"
-                  "The parser will not be able to retrieve games on the live server.")
+default_acs = ACS()
+_default_lol_watcher = None
 
 
-def get_riot_series(mh_url_list: list, get_timeline: bool = False, add_names: bool = True) -> LolSeries:
+def get_default_lol_watcher() -> riotwatcher.LolWatcher:
+    """Returns a LolWatcher using the RIOT_API_KEY environment variable, created on first use.
+
+    Its requests take tokens from the rate limiter buckets of the key, shared by all the processes of the host.
+    """
+    global _default_lol_watcher
+
+    if _default_lol_watcher is None:
+        try:
+            api_key = os.environ["RIOT_API_KEY"]
+            _default_lol_watcher = riotwatcher.LolWatcher(api_key, rate_limiter=RiotApiRateLimiter(api_key))
+        except KeyError:
+            warnings.warn(
+                "'RIOT_API_KEY' environment variable not found.\n"
+                "The parser will not be able to retrieve games on the live server."
+            )
+            raise
+
+    return _default_lol_watcher
+
+
+def get_riot_series(
+    mh_url_list: list,
+    get_timeline: bool = False,
+    add_names: bool = True,
+    acs: ACS = None,
+    lol_watcher: riotwatcher.LolWatcher = None,
+) -> LolSeries:
     """Gets a list of Riot API games as a single LolSeries object.
 
     Params:
         mh_url_list: the list of match history URLs to include in the series object.
         get_timeline: whether or not to query the /timeline/ endpoints for the games.
         add_names: whether or not to add champions/items/runes names next to their objects through lol_id_tools.
+        acs: the ACS object used for tournament games, a shared default one is used if None.
+        lol_watcher: the LolWatcher used for live server games, one using RIOT_API_KEY is used if None.
 
     Returns:
         A LolSeries made from all the games in the given order.
     """
-    games_futures = []
-    with ThreadPoolExecutor() as executor:
-        for mh_url in mh_url_list:
-            games_futures.append(executor.submit(get_riot_game, mh_url, get_timeline, add_names))
-
-    return create_series([g.result() for g in games_futures])
+    return run_sync(get_riot_series_async(mh_url_list, get_timeline, add_names, acs=acs, lol_watcher=lol_watcher))
 
 
 def get_riot_game(
-    mh_url: str, get_timeline: bool = False, add_names: bool = False, infer_team_names: bool = True
-) -> lol_dto.classes.game.LolGame:
+    mh_url: str,
+    get_timeline: bool = False,
+    add_names: bool = False,
+    infer_team_names: bool = True,
+    acs: ACS = None,
+    lol_watcher: riotwatcher.LolWatcher = None,
+    timeline_frames: bool = False,
+) -> Union[LolGame, Tuple[LolGame, "TimelineFrames"]]:
     """Returns a LolGame for the given match history URL.
 
     Params:
         mh_url: a Riot match history URL, containing the game hash.
         get_timeline: whether or not to query the /timeline/ endpoints for the games.
         add_names: whether or not to add champions/items/runes names next to their objects through lol_id_tools.
+        acs: the ACS object used for tournament games, a shared default one is used if None.
+        lol_watcher: the LolWatcher used for live server games, one using RIOT_API_KEY is used if None.
+        timeline_frames: with get_timeline, returns the snapshots of the timeline as dense NumPy TimelineFrames
+            instead of adding them to the players of the LolGame, its events being merged in the LolGame as usual.
 
     Returns:
-        A LolGame with all available information.
+        A LolGame with all available information, or a (LolGame, TimelineFrames) tuple if timeline_frames is True.
     """
-    parsed_url = urllib.parse.urlparse(urllib.parse.urlparse(mh_url).fragment)
-    query = urllib.parse.parse_qs(parsed_url.query)
+    return run_sync(
+        get_riot_game_async(
+            mh_url,
+            get_timeline,
+            add_names,
+            infer_team_names,
+            acs=acs,
+            lol_watcher=lol_watcher,
+            timeline_frames=timeline_frames,
+        )
+    )
 
-    platform_id, game_id = parsed_url.path.split("/")[1:3]
 
-    if "gameHash" in query:
-        game_hash = query["gameHash"][0]
-        match_query = (
-            acs.get_game,
-            platform_id,
-            game_id,
-            game_hash,
-        )
-        timeline_query = (
-            acs.get_game_timeline,
-            platform_id,
-            game_id,
-            game_hash,
-        )
-    else:
-        # This is a live game, we just use Riotwatcher
-        match_query = (
-            lol_watcher.match.by_id,
-            platform_id,
-            game_id,
+async def get_riot_series_async(
+    mh_url_list: list,
+    get_timeline: bool = False,
+    add_names: bool = True,
+    client: HttpClient = None,
+    acs: ACS = None,
+    lol_watcher: riotwatcher.LolWatcher = None,
+) -> LolSeries:
+    """Asynchronous version of get_riot_series.
+
+    Params:
+        client: the HttpClient to use for the queries, a temporary one is created if None.
+    """
+    async with ensure_client(client) as client:
+        games = await asyncio.gather(
+            *(
+                get_riot_game_async(mh_url, get_timeline, add_names, client=client, acs=acs, lol_watcher=lol_watcher)
+                for mh_url in mh_url_list
+            )
         )
-        timeline_query = (
-            lol_watcher.match.timeline_by_match,
-            platform_id,
-            game_id,
+
+    return create_series(list(games))
+
+
+def stream_riot_series(
+    mh_url_list: list,
+    get_timeline: bool = False,
+    add_names: bool = True,
+    acs: ACS = None,
+    lol_watcher: riotwatcher.LolWatcher = None,
+) -> Iterator[Union[LolGame, LolSeries]]:
+    """Yields the games of a Riot series as soon as they are parsed, then the series summary.
+
+    Params:
+        mh_url_list: the list of match history URLs to include in the series.
+        get_timeline: whether or not to query the /timeline/ endpoints for the games.
+        add_names: whether or not to add champions/items/runes names next to their objects through lol_id_tools.
+        acs: the ACS object used for tournament games, a shared default one is used if None.
+        lol_watcher: the LolWatcher used for live server games, one using RIOT_API_KEY is used if None.
+
+    Returns:
+        The LolGame of each game in order of completion, then a LolSeries without games holding score and winner.
+    """
+    return iterate_sync(
+        lambda: stream_riot_series_async(mh_url_list, get_timeline, add_names, acs=acs, lol_watcher=lol_watcher)
+    )
+
+
+async def stream_riot_series_async(
+    mh_url_list: list,
+    get_timeline: bool = False,
+    add_names: bool = True,
+    client: HttpClient = None,
+    acs: ACS = None,
+    lol_watcher: riotwatcher.LolWatcher = None,
+) -> AsyncIterator[Union[LolGame, LolSeries]]:
+    """Asynchronous version of stream_riot_series.
+
+    Params:
+        client: the HttpClient to use for the queries, a temporary one is created if None.
+    """
+    async with ensure_client(client) as client:
+        async for item in stream_games(
+            get_riot_game_async(mh_url, get_timeline, add_names, client=client, acs=acs, lol_watcher=lol_watcher)
+            for mh_url in mh_url_list
+        ):
+            yield item
+
+
+def refresh_riot_series(
+    mh_url_list: list,
+    previous: Union[SeriesState, LolSeries] = None,
+    get_timeline: bool = False,
+    add_names: bool = True,
+    acs: ACS = None,
+    lol_watcher: riotwatcher.LolWatcher = None,
+) -> SeriesState:
+    """Refreshes a Riot series that is being played, only parsing the games whose URL is new or changed.
+
+    Finished games never change, so refreshing a series whose games were all parsed makes no request.
+
+    Params:
+        mh_url_list: the list of match history URLs to include in the series.
+        previous: the state returned by the previous refresh or a LolSeries, None to start from scratch.
+        get_timeline: whether or not to query the /timeline/ endpoints for the games.
+        add_names: whether or not to add champions/items/runes names next to their objects through lol_id_tools.
+        acs: the ACS object used for tournament games, a shared default one is used if None.
+        lol_watcher: the LolWatcher used for live server games, one using RIOT_API_KEY is used if None.
+
+    Returns:
+        A SeriesState, whose series property is the LolSeries of the games parsed so far.
+    """
+    return run_sync(
+        refresh_riot_series_async(mh_url_list, previous, get_timeline, add_names, acs=acs, lol_watcher=lol_watcher)
+    )
+
+
+async def refresh_riot_series_async(
+    mh_url_list: list,
+    previous: Union[SeriesState, LolSeries] = None,
+    get_timeline: bool = False,
+    add_names: bool = True,
+    client: HttpClient = None,
+    acs: ACS = None,
+    lol_watcher: riotwatcher.LolWatcher = None,
+) -> SeriesState:
+    """Asynchronous version of refresh_riot_series.
+
+    Params:
+        client: the HttpClient to use for the queries, a temporary one is created if None.
+    """
+    previous = as_state(previous, _game_key)
+
+    mh_urls = {}
+    for mh_url in mh_url_list:
+        platform_id, game_id, _ = parse_mh_url(mh_url)
+        mh_urls[f"{platform_id}/{game_id}"] = mh_url
+
+    async with ensure_client(client) as client:
+        return await refresh_games(
+            previous,
+            {key: entry_hash(mh_url) for key, mh_url in mh_urls.items()},
+            {},
+            lambda key, _: get_riot_game_async(
+                mh_urls[key], get_timeline, add_names, client=client, acs=acs, lol_watcher=lol_watcher
+            ),
         )
 
-    with ThreadPoolExecutor() as executor:
-        match_dto_future = executor.submit(*match_query)
 
-        if get_timeline:
-            match_timeline_dto_future = executor.submit(*timeline_query)
+def _game_key(game: LolGame) -> str:
+    source = game["sources"]["riotLolApi"]
+    return f"{source['platformId']}/{source['gameId']}"
+
+
+def parse_mh_url(mh_url: str) -> Tuple[str, str, dict]:
+    """Returns the platform id, game id and query parameters of a match history URL.
+    """
+    parsed_url = urllib.parse.urlparse(urllib.parse.urlparse(mh_url).fragment)
+    platform_id, game_id = parsed_url.path.split("/")[1:3]
+
+    return platform_id, game_id, urllib.parse.parse_qs(parsed_url.query)
 
-    game = riot_transmute.match_to_game(match_dto_future.result(), add_names=add_names)
 
-    if get_timeline:
-        timeline_game = riot_transmute.match_timeline_to_game(
-            match_timeline_dto_future.result(), int(game_id), platform_id, add_names=add_names
+async def get_riot_game_async(
+    mh_url: str,
+    get_timeline: bool = False,
+    add_names: bool = False,
+    infer_team_names: bool = True,
+    client: HttpClient = None,
+    acs: ACS = None,
+    lol_watcher: riotwatcher.LolWatcher = None,
+    timeline_frames: bool = False,
+    transform_pool: TransformPool = None,
+) -> Union[LolGame, Tuple[LolGame, "TimelineFrames"]]:
+    """Asynchronous version of get_riot_game.
+
+    Params:
+        client: the HttpClient to use for the queries, a temporary one is created if None.
+        transform_pool: the TransformPool running the transform, run in the shared transform thread if None.
+    """
+    match_dto, match_timeline_dto = await get_riot_game_payloads(
+        mh_url, get_timeline, client=client, acs=acs, lol_watcher=lol_watcher
+    )
+
+    if get_timeline and timeline_frames:
+        return await run_transform(
+            transform_pool,
+            transform_riot_game_with_frames,
+            mh_url,
+            match_dto,
+            match_timeline_dto,
+            add_names,
+            infer_team_names,
         )
+
+    return await run_transform(
+        transform_pool, transform_riot_game, mh_url, match_dto, match_timeline_dto, add_names, infer_team_names
+    )
+
+
+async def get_riot_game_payloads(
+    mh_url: str,
+    get_timeline: bool = False,
+    client: HttpClient = None,
+    acs: ACS = None,
+    lol_watcher: riotwatcher.LolWatcher = None,
+) -> Tuple[dict, Optional[dict]]:
+    """Returns the raw MatchDto and MatchTimelineDto of a match history URL, the timeline being None if not asked for.
+    """
+    platform_id, game_id, query = parse_mh_url(mh_url)
+
+    async with ensure_client(client) as client:
+        if "gameHash" in query:
+            acs = acs or default_acs
+            game_hash = query["gameHash"][0]
+            queries = [acs.get_game(client, platform_id, game_id, game_hash)]
+
+            if get_timeline:
+                queries.append(acs.get_game_timeline(client, platform_id, game_id, game_hash))
+        else:
+            # This is a live game, we just use Riotwatcher in the default executor as it is synchronous
+            lol_watcher = lol_watcher or get_default_lol_watcher()
+            loop = asyncio.get_running_loop()
+            queries = [loop.run_in_executor(None, lol_watcher.match.by_id, platform_id, game_id)]
+
+            if get_timeline:
+                queries.append(loop.run_in_executor(None, lol_watcher.match.timeline_by_match, platform_id, game_id))
+
+        match_dto, *match_timeline_dto = await asyncio.gather(*queries)
+
+    return match_dto, match_timeline_dto[0] if match_timeline_dto else None
+
+
+def transform_riot_game(
+    mh_url: str,
+    match_dto: dict,
+    match_timeline_dto: dict = None,
+    add_names: bool = False,
+    infer_team_names: bool = True,
+    timeline_snapshots: bool = True,
+) -> LolGame:
+    """Transforms the raw payloads of a Riot game into a LolGame.
+
+    Params:
+        mh_url: the match history URL of the game.
+        match_dto: the MatchDto of the game.
+        match_timeline_dto: the MatchTimelineDto of the game, merged into the LolGame if given.
+        add_names: whether or not to add champions/items/runes names next to their objects.
+        infer_team_names: whether or not to infer team names from players names in tournament games.
+        timeline_snapshots: whether or not to add the snapshots of the timeline to the players, only its events
+            being merged if False.
+    """
+    # riot_transmute imports lol_id_tools, which creates its data folder when imported, so it is only imported here
+    import riot_transmute
+
+    platform_id, game_id, query = parse_mh_url(mh_url)
+
+    # Names are added once the game is complete, from precomputed tables instead of lol_id_tools lookups
+    game = riot_transmute.match_to_game(match_dto)
+
+    if match_timeline_dto is not None:
+        if not timeline_snapshots:
+            # Snapshots come from the participant frames, so they are never built
+            match_timeline_dto = {
+                **match_timeline_dto,
+                "frames": [{**frame, "participantFrames": {}} for frame in match_timeline_dto["frames"]],
+            }
+
+        timeline_game = riot_transmute.match_timeline_to_game(match_timeline_dto, int(game_id), platform_id)
+
+        if not timeline_snapshots:
+            for team in timeline_game["teams"].values():
+                for player in team["players"]:
+                    del player["snapshots"]
+
         game = lol_dto.utilities.merge_games(game, timeline_game)
 
+    if add_names:
+        default_name_tables.add_names(game)
+
     # We cannot get team names in custom games
     if "gameHash" in query and infer_team_names:
         game = infer_and_add_team_names(game, mh_url)
@@ -107,6 +372,23 @@ def get_riot_game(
     return game
 
 
+def transform_riot_game_with_frames(
+    mh_url: str,
+    match_dto: dict,
+    match_timeline_dto: dict,
+    add_names: bool = False,
+    infer_team_names: bool = True,
+) -> Tuple[LolGame, "TimelineFrames"]:
+    """Transforms the raw payloads of a Riot game into a LolGame with the events of its timeline, and TimelineFrames.
+    """
+    # NumPy is an optional dependency only needed for this output
+    from lol_esports_parser.dto.timeline_frames import TimelineFrames
+
+    game = transform_riot_game(mh_url, match_dto, match_timeline_dto, add_names, infer_team_names, False)
+
+    return game, TimelineFrames.from_match_timeline(match_timeline_dto)
+
+
 def infer_and_add_team_names(game: LolGame, mh_url) -> LolGame:
     """Try and infer teams trigrams from player’s in game name.
     """
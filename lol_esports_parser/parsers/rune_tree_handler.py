@@ -1,29 +1,84 @@
-import warnings
-from typing import Tuple
+import json
+import logging
+import os
+import threading
+import time
+from typing import Tuple, Dict, Iterable
+
 import requests
 import lol_dto
-import lol_id_tools
+
+from lol_esports_parser.config import get_endpoints, config_folder
+from lol_esports_parser.parsers import telemetry
+from lol_esports_parser.parsers.single_flight import SingleFlight
 
 
 class RuneTreeHandler:
     """A simple class that caches data from ddragon and gets rune tree per rune ID.
+
+    ddragon data is persisted in a local static data folder, so a patch is only ever downloaded once per host.
     """
 
-    def __init__(self):
+    def __init__(self, ddragon_url: str = None, static_data_folder: str = None):
+        """
+        Params:
+            ddragon_url: base ddragon URL, read from the endpoints configuration if None.
+            static_data_folder: where to persist ddragon data, defaults to the static_data folder next to the
+                configuration files.
+
+        Versions are only loaded when the first rune tree is requested.
+        """
         self.cache = {}
         self.versions = None
-        self.reload_versions()
 
-    def reload_versions(self):
-        self.versions = requests.get("https://ddragon.leagueoflegends.com/api/versions.json").json()
+        # {MM.mm patch: ddragon version}
+        self.patch_versions: Dict[str, str] = {}
+        # {ddragon version: {rune id: (tree id, tree name)}}
+        self.trees_index: Dict[str, Dict[int, Tuple[int, str]]] = {}
+
+        self._ddragon_url = ddragon_url
+        self.static_data_folder = static_data_folder or os.path.join(config_folder, "static_data")
+
+        self._lock = threading.RLock()
+        self._runes_loads = SingleFlight()
+
+    @property
+    def ddragon_url(self) -> str:
+        return self._ddragon_url or get_endpoints()["ddragon"]["base"]
+
+    def reload_versions(self, from_disk=False):
+        """Loads the versions list, from the static data folder if asked and possible, else from ddragon.
+        """
+        versions_location = os.path.join(self.static_data_folder, "versions.json")
+
+        with self._lock:
+            if from_disk and os.path.exists(versions_location):
+                with open(versions_location) as file:
+                    self.versions = json.load(file)
+                telemetry.increment("ddragon_versions", "cache_hit")
+            else:
+                logging.info("Loading game versions from ddragon")
+                telemetry.increment("ddragon_versions", "cache_miss")
+                self.versions = self._get_json("ddragon_versions", f"{self.ddragon_url}/api/versions.json")
+                self._save(versions_location, self.versions)
+
+            # Versions are sorted from the most recent, so we keep the latest version of each patch
+            patch_versions = {}
+            for version in self.versions:
+                patch_versions.setdefault(".".join(version.split(".")[:2]), version)
+
+            # get_version reads the mapping without the lock, so it is replaced once complete
+            self.patch_versions = patch_versions
 
     def get_runes_data(self, patch):
         full_patch = self.get_version(patch)
 
         if full_patch not in self.cache:
-            self.cache[full_patch] = requests.get(
-                f"https://ddragon.leagueoflegends.com/cdn/{full_patch}/data/en_US/runesReforged.json"
-            ).json()
+            # Threads asking for the same patch share one load, while different patches load in parallel
+            _, shared = self._runes_loads.do(full_patch, lambda: self._load_runes_data(full_patch))
+
+            if shared:
+                telemetry.increment("ddragon_runes", "coalesced")
 
         return self.cache[full_patch]
 
@@ -33,14 +88,25 @@ class RuneTreeHandler:
         Params:
             patch: MM.mm format patch
         """
-        for version in self.versions:
-            if ".".join(version.split(".")[:2]) == patch:
-                return version
+        if patch not in self.patch_versions:
+            with self._lock:
+                if self.versions is None:
+                    self.reload_versions(from_disk=True)
+
+                # If we have a patch that we do not know, we reload versions from ddragon once
+                if patch not in self.patch_versions:
+                    self.reload_versions()
 
-        # If we have a patch that we do not know, we reload versions stupidly.
-        warnings.warn("Reloading game versions")
-        self.reload_versions()
-        return self.get_version(patch)
+                if patch not in self.patch_versions:
+                    raise KeyError(f"Patch {patch} was not found in ddragon versions")
+
+        return self.patch_versions[patch]
+
+    def prefetch(self, patches: Iterable[str]):
+        """Loads the rune trees of all the given patches, for example before starting a backfill.
+        """
+        for patch in set(patches):
+            self.get_runes_data(patch)
 
     def get_primary_tree(self, runes, patch) -> Tuple[int, str]:
         return self.get_tree(runes[0], patch)
@@ -49,10 +115,61 @@ class RuneTreeHandler:
         return self.get_tree(runes[4], patch)
 
     def get_tree(self, _rune: lol_dto.classes.game.LolGamePlayerRune, patch) -> Tuple[int, str]:
-        data = self.get_runes_data(patch)
+        full_patch = self.get_version(patch)
+
+        if full_patch not in self.trees_index:
+            self.get_runes_data(patch)
+
+        return self.trees_index[full_patch].get(_rune["id"])
+
+    def _load_runes_data(self, full_patch):
+        # Another load may have finished since the caller checked the cache
+        if full_patch in self.cache:
+            return
+
+        runes_data_location = os.path.join(self.static_data_folder, full_patch, "runesReforged.json")
+
+        if os.path.exists(runes_data_location):
+            with open(runes_data_location) as file:
+                data = json.load(file)
+            telemetry.increment("ddragon_runes", "cache_hit")
+        else:
+            telemetry.increment("ddragon_runes", "cache_miss")
+            data = self._get_json("ddragon_runes", f"{self.ddragon_url}/cdn/{full_patch}/data/en_US/runesReforged.json")
+            self._save(runes_data_location, data)
 
+        # runesReforged.json is in en_US, so its tree names are the ones lol_id_tools would return
+        trees_index = {}
         for tree in data:
+            tree_value = tree["id"], tree["name"]
+
             for slot in tree["slots"]:
                 for rune in slot["runes"]:
-                    if rune["id"] == _rune["id"]:
-                        return tree["id"], lol_id_tools.get_name(tree["id"])
+                    trees_index[rune["id"]] = tree_value
+
+        # The index is set first as the cache is what other threads check
+        self.trees_index[full_patch] = trees_index
+        self.cache[full_patch] = data
+
+    @staticmethod
+    def _get_json(endpoint: str, url: str):
+        start = time.perf_counter()
+
+        try:
+            response = requests.get(url, timeout=30)
+        except requests.RequestException:
+            telemetry.observe_request(endpoint, time.perf_counter() - start, None, 0)
+            raise
+
+        telemetry.observe_request(endpoint, time.perf_counter() - start, response.status_code, len(response.content))
+
+        return response.json()
+
+    @staticmethod
+    def _save(location, data):
+        os.makedirs(os.path.dirname(location), exist_ok=True)
+
+        temporary_location = f"{location}.{os.getpid()}.tmp"
+        with open(temporary_location, "w") as file:
+            json.dump(data, file)
+        os.replace(temporary_location, location)
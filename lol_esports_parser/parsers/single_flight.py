@@ -0,0 +1,104 @@
+import asyncio
+import functools
+import threading
+import weakref
+from concurrent.futures import Future
+from typing import Awaitable, Callable, Dict, Hashable, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Shares one call between the threads asking for the same key at the same time.
+
+    The first thread runs the function, and threads asking for the key while it runs wait for its result or its
+    exception instead of calling it again. Nothing is kept once the call is over, caching is left to the caller.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, Future] = {}
+
+        # Number of calls answered by a call that was already running
+        self.shared = 0
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> Tuple[T, bool]:
+        """Returns the result of fn, or of the running call for the same key.
+
+        Returns:
+            result, shared
+
+            shared is True if the result comes from a call that was already running.
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            shared = future is not None
+
+            if shared:
+                self.shared += 1
+            else:
+                future = self._calls[key] = Future()
+
+        if shared:
+            return future.result(), True
+
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+
+class AsyncSingleFlight:
+    """Shares one coroutine between the tasks of an event loop asking for the same key at the same time.
+
+    The coroutine runs in its own task, so a caller being cancelled does not cancel it for the other callers. Calls
+    are only shared within an event loop, as asyncio futures cannot be awaited from another one.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # {event loop: {key: task}}, forgetting the loops once they are closed and collected
+        self._calls = weakref.WeakKeyDictionary()
+
+        # Number of calls answered by a call that was already running
+        self.shared = 0
+
+    async def do(self, key: Hashable, coroutine_fn: Callable[[], Awaitable[T]]) -> Tuple[T, bool]:
+        """Returns the result of coroutine_fn, or of the running call for the same key.
+
+        Returns:
+            result, shared
+
+            shared is True if the result comes from a call that was already running.
+        """
+        loop = asyncio.get_running_loop()
+
+        with self._lock:
+            calls = self._calls.setdefault(loop, {})
+
+        task = calls.get(key)
+        shared = task is not None
+
+        if shared:
+            self.shared += 1
+        else:
+            task = calls[key] = asyncio.ensure_future(coroutine_fn())
+            task.add_done_callback(functools.partial(self._forget, calls, key))
+
+        return await asyncio.shield(task), shared
+
+    @staticmethod
+    def _forget(calls: Dict[Hashable, asyncio.Task], key: Hashable, task: asyncio.Task):
+        if calls.get(key) is task:
+            del calls[key]
+
+        # Retrieved so that failures nobody awaits anymore are not logged as never retrieved
+        if not task.cancelled():
+            task.exception()
@@ -0,0 +1,115 @@
+import asyncio
+import queue
+import threading
+from concurrent.futures.thread import ThreadPoolExecutor
+from typing import AsyncIterator, Awaitable, Callable, Iterable, Iterator, TypeVar, Union
+
+import lol_dto
+
+from lol_esports_parser.dto.series_dto import LolSeries, SeriesScore
+
+T = TypeVar("T")
+
+
+async def stream_games(
+    games_coroutines: Iterable[Awaitable[lol_dto.classes.game.LolGame]],
+) -> AsyncIterator[Union[lol_dto.classes.game.LolGame, LolSeries]]:
+    """Runs the games coroutines concurrently and yields each game as soon as it is parsed.
+
+    Games are yielded in order of completion. The last item is a LolSeries without games, holding the score and
+    winner of the series.
+    """
+    series_score = SeriesScore()
+    tasks = [asyncio.ensure_future(coroutine) for coroutine in games_coroutines]
+
+    try:
+        for task in asyncio.as_completed(tasks):
+            lol_game_dto = await task
+            series_score.add_game(lol_game_dto)
+            yield lol_game_dto
+
+    finally:
+        for task in tasks:
+            task.cancel()
+
+    yield series_score.summary()
+
+
+def iterate_sync(
+    async_iterator_fn: Callable[[], AsyncIterator[T]], max_size: int = 1, max_threads: int = None
+) -> Iterator[T]:
+    """Iterates over an asynchronous iterator from synchronous code.
+
+    The iterator runs in its own event loop in a background thread, and stops when the generator is closed.
+
+    Params:
+        async_iterator_fn: function creating the asynchronous iterator, called from the background event loop.
+        max_size: number of items the background loop can get ahead of the consumer.
+        max_threads: size of the thread pool used for synchronous calls, the asyncio default if None.
+    """
+    results = queue.Queue(maxsize=max_size)
+    stop = threading.Event()
+    finished = object()
+
+    # The loop and task of the producer, so the consumer can cancel it
+    running = {}
+
+    async def produce():
+        loop = asyncio.get_running_loop()
+        running["loop"], running["task"] = loop, asyncio.current_task()
+
+        if max_threads:
+            loop.set_default_executor(ThreadPoolExecutor(max_threads))
+
+        try:
+            if stop.is_set():
+                return
+
+            async for result in async_iterator_fn():
+                # Blocking on the queue in the thread pool gives us back pressure from the consumer
+                await loop.run_in_executor(None, results.put, result)
+
+                if stop.is_set():
+                    break
+
+        except asyncio.CancelledError:
+            # The generator was closed while the iterator was waiting for its next item
+            pass
+
+        except Exception as e:
+            results.put(e)
+
+        finally:
+            results.put(finished)
+
+    producer = threading.Thread(target=asyncio.run, args=(produce(),), daemon=True)
+    producer.start()
+
+    try:
+        while True:
+            result = results.get()
+
+            if result is finished:
+                break
+            if isinstance(result, Exception):
+                raise result
+
+            yield result
+
+    finally:
+        stop.set()
+
+        # The iterator can take a while to produce its next item, so it is cancelled instead of awaited
+        if running:
+            try:
+                running["loop"].call_soon_threadsafe(running["task"].cancel)
+            except RuntimeError:
+                # The loop already finished
+                pass
+
+        # Unblocking the producer if it is waiting on a full queue
+        while producer.is_alive():
+            try:
+                results.get(timeout=0.1)
+            except queue.Empty:
+                pass
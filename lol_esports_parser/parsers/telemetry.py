@@ -0,0 +1,163 @@
+import asyncio
+import logging
+import socket
+import time
+from typing import Awaitable, Optional, Sequence
+
+from lol_esports_parser.parsers.http_client import HttpResponse
+
+# Endpoints are named like their response cache namespaces:
+#   acs_auth, acs_game, acs_timeline,
+#   qq_match_list, qq_match_info, qq_battle_info, qq_runes,
+#   ddragon_versions, ddragon_runes
+# Events are retry, hedge, cache_hit, cache_miss and coalesced, plus throttled when a request waits for the rate
+# limiter, which is reported under the kind of its bucket (host, acs, riot_api or riot_api_method) instead of an endpoint
+
+default_buckets = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+
+class MetricsSink:
+    """Receives telemetry from every endpoint query, doing nothing with it by default.
+
+    Subclasses override observe_request and increment to export the measures. Both are called from the event loops
+    of all threads, so they have to be thread-safe and should not block.
+    """
+
+    def observe_request(self, endpoint: str, duration: float, status: Optional[int], size: int):
+        """Called after each HTTP request, hedged duplicates and retries included.
+
+        Params:
+            endpoint: the endpoint name.
+            duration: the request latency in seconds.
+            status: the HTTP status code, None if the request failed without a response.
+            size: the size of the response body in bytes.
+        """
+
+    def increment(self, endpoint: str, event: str):
+        """Called for retry, hedge, cache_hit, cache_miss, coalesced and throttled events.
+        """
+
+
+class StatsdSink(MetricsSink):
+    """Sends metrics to a StatsD server over UDP.
+
+    Latencies are sent as timers, which StatsD aggregates into percentiles and histograms:
+        {prefix}.{endpoint}.request:{ms}|ms
+        {prefix}.{endpoint}.status.{status}:1|c
+        {prefix}.{endpoint}.bytes:{size}|c
+        {prefix}.{endpoint}.{event}:1|c
+    """
+
+    def __init__(self, host: str = "localhost", port: int = 8125, prefix: str = "lol_esports_parser"):
+        self.address = (host, port)
+        self.prefix = prefix
+
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    def observe_request(self, endpoint: str, duration: float, status: Optional[int], size: int):
+        self._send(
+            f"{self.prefix}.{endpoint}.request:{duration * 1000:.3f}|ms",
+            f"{self.prefix}.{endpoint}.status.{status or 'error'}:1|c",
+            f"{self.prefix}.{endpoint}.bytes:{size}|c",
+        )
+
+    def increment(self, endpoint: str, event: str):
+        self._send(f"{self.prefix}.{endpoint}.{event}:1|c")
+
+    def _send(self, *lines: str):
+        try:
+            self._socket.sendto("\n".join(lines).encode(), self.address)
+        except OSError as e:
+            # Metrics are best effort and should never break a query
+            logging.debug(f"Could not send metrics to StatsD: {e}")
+
+
+class PrometheusSink(MetricsSink):
+    """Records metrics with prometheus_client, to be exposed with its start_http_server or any registry exporter.
+
+    Metrics:
+        {namespace}_request_duration_seconds{endpoint, status} histogram
+        {namespace}_response_bytes_total{endpoint} counter
+        {namespace}_events_total{endpoint, event} counter
+    """
+
+    def __init__(self, namespace: str = "lol_esports_parser", registry=None, buckets: Sequence[float] = None):
+        """
+        Params:
+            namespace: prefix of the metrics names.
+            registry: the prometheus_client registry, its default one if None.
+            buckets: upper bounds of the latency histogram buckets in seconds, default_buckets if None.
+        """
+        # prometheus_client is an optional dependency, installed with pip install lol_esports_parser[prometheus]
+        import prometheus_client
+
+        registry_kwargs = {} if registry is None else {"registry": registry}
+
+        self.request_duration = prometheus_client.Histogram(
+            f"{namespace}_request_duration_seconds",
+            "Latency of the queries to the endpoint.",
+            ["endpoint", "status"],
+            buckets=buckets or default_buckets,
+            **registry_kwargs,
+        )
+        self.response_bytes = prometheus_client.Counter(
+            f"{namespace}_response_bytes",
+            "Size of the bodies returned by the endpoint.",
+            ["endpoint"],
+            **registry_kwargs,
+        )
+        self.events = prometheus_client.Counter(
+            f"{namespace}_events",
+            "Retries, hedged requests, cache hits and misses and rate limiter waits of the endpoint.",
+            ["endpoint", "event"],
+            **registry_kwargs,
+        )
+
+    def observe_request(self, endpoint: str, duration: float, status: Optional[int], size: int):
+        self.request_duration.labels(endpoint, str(status or "error")).observe(duration)
+        self.response_bytes.labels(endpoint).inc(size)
+
+    def increment(self, endpoint: str, event: str):
+        self.events.labels(endpoint, event).inc()
+
+
+_sink = MetricsSink()
+
+
+def get_metrics_sink() -> MetricsSink:
+    return _sink
+
+
+def set_metrics_sink(sink: Optional[MetricsSink]):
+    """Sets where metrics are sent, None going back to the default sink doing nothing.
+    """
+    global _sink
+    _sink = sink or MetricsSink()
+
+
+def observe_request(endpoint: str, duration: float, status: Optional[int], size: int):
+    _sink.observe_request(endpoint, duration, status, size)
+
+
+def increment(endpoint: Optional[str], event: str):
+    if endpoint is not None:
+        _sink.increment(endpoint, event)
+
+
+async def timed_request(endpoint: str, request: Awaitable[HttpResponse]) -> HttpResponse:
+    """Awaits an HttpClient request and reports its latency, status and size.
+    """
+    start = time.perf_counter()
+
+    try:
+        response = await request
+    except asyncio.CancelledError:
+        # Hedged duplicates that lost the race are not failures
+        raise
+    except Exception:
+        observe_request(endpoint, time.perf_counter() - start, None, 0)
+        raise
+
+    observe_request(endpoint, time.perf_counter() - start, response.status, len(response.body))
+
+    return response
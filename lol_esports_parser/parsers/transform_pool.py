@@ -0,0 +1,116 @@
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures.process import ProcessPoolExecutor
+from concurrent.futures.thread import ThreadPoolExecutor
+from typing import Callable, Optional, TypeVar
+
+from lol_esports_parser import config
+from lol_esports_parser.parsers import name_tables
+
+T = TypeVar("T")
+
+# Transforms hold the GIL, so without a pool a single thread runs them for every event loop of the process
+_transform_thread: Optional[ThreadPoolExecutor] = None
+_transform_thread_lock = threading.Lock()
+
+
+class TransformPool:
+    """Worker processes running the CPU-bound transforms of raw payloads into LolGame objects.
+
+    The I/O stage keeps fetching payloads in its event loop while transforms run outside of the GIL, and at most
+    max_pending payloads are queued for the workers. When the queue is full, the I/O stage waits before handing
+    over more payloads, so fetching never gets far ahead of the transforms.
+
+    Workers are spawned, not forked, as the I/O stage usually runs threads, so scripts using a pool need an
+    if __name__ == "__main__" guard. They get the endpoints configuration and the name tables of the parent, and
+    read rune trees from the static data folder the I/O stage fills.
+
+    Name tables are built when entering the pool, so event loops should enter it with async with, which builds them
+    in a thread instead of blocking the loop.
+    """
+
+    def __init__(self, processes: int = None, max_pending: int = None, add_names: bool = True):
+        """
+        Params:
+            processes: the number of worker processes, which is the number of cores used for transforms. Defaults
+                to the number of CPUs.
+            max_pending: the maximum number of payloads queued or being transformed, defaults to twice the number
+                of processes.
+            add_names: whether or not the transforms add names, in which case name tables are sent to the workers.
+        """
+        self.processes = processes or os.cpu_count() or 1
+        self.max_pending = max_pending or 2 * self.processes
+        self.add_names = add_names
+
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._pending: Optional[asyncio.Semaphore] = None
+
+    def __enter__(self) -> "TransformPool":
+        # Name tables are built once here instead of once per worker, and sent as a plain dictionary
+        tables_state = name_tables.default_name_tables.__getstate__() if self.add_names else None
+
+        self._executor = ProcessPoolExecutor(
+            self.processes,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_initialize_worker,
+            initargs=(config._endpoints, tables_state),
+        )
+
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._executor.shutdown(wait=exc_type is None)
+        self._executor = None
+
+    async def __aenter__(self) -> "TransformPool":
+        if self.add_names:
+            await asyncio.get_running_loop().run_in_executor(None, lambda: name_tables.default_name_tables.tables)
+
+        return self.__enter__()
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        self.__exit__(exc_type, exc_val, exc_tb)
+
+    async def run(self, fn: Callable[..., T], *args) -> T:
+        """Runs a module-level function in a worker process once there is room in the queue.
+        """
+        if self._pending is None:
+            # Created here so it belongs to the running event loop
+            self._pending = asyncio.Semaphore(self.max_pending)
+
+        async with self._pending:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+
+async def run_transform(transform_pool: Optional[TransformPool], fn: Callable[..., T], *args) -> T:
+    """Runs a transform in the pool, or in the transform thread shared by the process if there is no pool.
+
+    Transforms block for a while and can go through lol_id_tools, which runs its own event loop, so they never run in
+    the event loop thread.
+    """
+    if transform_pool is None:
+        return await asyncio.get_running_loop().run_in_executor(_get_transform_thread(), lambda: fn(*args))
+
+    return await transform_pool.run(fn, *args)
+
+
+def _get_transform_thread() -> ThreadPoolExecutor:
+    global _transform_thread
+
+    if _transform_thread is None:
+        with _transform_thread_lock:
+            if _transform_thread is None:
+                _transform_thread = ThreadPoolExecutor(1, thread_name_prefix="transform")
+
+    return _transform_thread
+
+
+def _initialize_worker(endpoints: Optional[dict], tables_state: Optional[dict]):
+    if endpoints is not None:
+        config.set_endpoints(endpoints)
+
+    # Parsers import default_name_tables directly, so its tables are replaced instead of the object
+    if tables_state is not None:
+        name_tables.default_name_tables.__setstate__(tables_state)
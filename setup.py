@@ -8,15 +8,23 @@ with open(path.join(this_directory, "README.md"), encoding="utf-8") as f:
 setuptools.setup(
     name="lol_esports_parser",
     version="0.1a4",
-    packages=setuptools.find_packages(),
+    packages=setuptools.find_packages(exclude=["benchmarks", "benchmarks.*"]),
     install_requires=[
         "requests",
+        "aiohttp",
         "dateparser",
         "lol-id-tools>=1.4.0",
         "riot-transmute>=0.1a6",
         "lol-dto>=0.1a3",
         "riotwatcher",
     ],
+    extras_require={
+        "columnar": ["numpy", "pyarrow"],
+        "frames": ["numpy"],
+        "fast_json": ["orjson"],
+        "prometheus": ["prometheus_client"],
+    },
+    entry_points={"console_scripts": ["lol_esports_parser = lol_esports_parser.cli:main"]},
     url="https://github.com/mrtolkien/lol_esports_parser",
     license="MIT",
     author='Gary "Tolki" Mialaret',